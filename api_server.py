@@ -0,0 +1,288 @@
+import re
+import json
+import asyncio
+from contextlib import asynccontextmanager
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from urllib.parse import urlsplit, parse_qs
+from contact_storage import ContactJournalStorage
+from lazy_console import LazyConsole
+
+console = LazyConsole()
+
+REASONS = {200: 'OK', 201: 'Created', 204: 'No Content', 400: 'Bad Request', 404: 'Not Found',
+           405: 'Method Not Allowed', 500: 'Internal Server Error'}
+
+
+class ReadWriteLock:
+    """
+    Блокування читачів і письменників для asyncio: кілька запитів на читання виконуються
+    одночасно, запис - лише монопольно. Письменник, що чекає, блокує нових читачів,
+    тож постійний потік читань не відкладає запис назавжди.
+    """
+
+    def __init__(self):
+        self._condition = asyncio.Condition()
+        self._readers = 0
+        self._writer = False
+        self._waiting_writers = 0
+
+    @asynccontextmanager
+    async def reading(self):
+        async with self._condition:
+            await self._condition.wait_for(lambda: not self._writer and not self._waiting_writers)
+            self._readers += 1
+        try:
+            yield
+        finally:
+            async with self._condition:
+                self._readers -= 1
+                if not self._readers:
+                    self._condition.notify_all()
+
+    @asynccontextmanager
+    async def writing(self):
+        async with self._condition:
+            self._waiting_writers += 1
+            try:
+                await self._condition.wait_for(lambda: not self._writer and not self._readers)
+            finally:
+                self._waiting_writers -= 1
+            self._writer = True
+        try:
+            yield
+        finally:
+            async with self._condition:
+                self._writer = False
+                self._condition.notify_all()
+
+
+def contact_to_dict(contact):
+    return {'id': contact.id, 'name': contact.name, 'address': contact.address, 'phone': contact.phone,
+            'email': contact.email, 'birthday': ContactJournalStorage.format_birthday(contact.birthday)}
+
+
+def note_to_dict(note):
+    return {'id': note.id, 'text': note.text, 'tags': note.tags}
+
+
+class AssistantApiServer:
+    """
+    Локальний HTTP/JSON API над PersonalAssistantFacade на asyncio.
+
+    Запити розбираються в циклі подій, а виклики менеджерів виконуються в пулі потоків:
+    читання (пошук, списки, дні народження) - паралельно, зміни - по одному.
+    З'єднання підтримують keep-alive.
+
+    Маршрути:
+        GET    /contacts?query=&page=&page_size=   список або пошук контактів
+        GET    /contacts?query=&fuzzy=1            пошук за ім'ям з помилками і транслітерацією
+        GET    /contacts/<id>
+        POST   /contacts                            {name, address, phone, email, birthday}
+        PATCH  /contacts/<id>                       поля, які потрібно змінити
+        DELETE /contacts/<id>
+        GET    /birthdays?days=7
+        GET    /notes?query=&tags=a,b&mode=and|or&limit=
+        GET    /notes/<id>
+        POST   /notes                               {text, tags}
+        PATCH  /notes/<id>                          {text, tags}
+        DELETE /notes/<id>
+    """
+
+    CONTACT_FIELDS = ('name', 'address', 'phone', 'email', 'birthday')
+
+    def __init__(self, facade, host='127.0.0.1', port=8765, workers=4):
+        """
+        Args:
+            facade (PersonalAssistantFacade): Фасад з менеджерами контактів і нотаток.
+            host (str, optional): Адреса прослуховування. За замовчуванням - лише локальна.
+            port (int, optional): Порт. За замовчуванням - 8765.
+            workers (int, optional): Кількість потоків для виконання запитів.
+        """
+        self.facade = facade
+        self.host = host
+        self.port = port
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        self.lock = None
+        self.server = None
+        # Маршрути: метод, шаблон шляху, обробник, чи змінює запит дані
+        self.routes = [
+            ('GET', re.compile(r'/contacts'), self.list_contacts, False),
+            ('POST', re.compile(r'/contacts'), self.create_contact, True),
+            ('GET', re.compile(r'/contacts/(\d+)'), self.get_contact, False),
+            ('PATCH', re.compile(r'/contacts/(\d+)'), self.update_contact, True),
+            ('DELETE', re.compile(r'/contacts/(\d+)'), self.remove_contact, True),
+            ('GET', re.compile(r'/birthdays'), self.birthdays, False),
+            ('GET', re.compile(r'/notes'), self.list_notes, False),
+            ('POST', re.compile(r'/notes'), self.create_note, True),
+            ('GET', re.compile(r'/notes/(\d+)'), self.get_note, False),
+            ('PATCH', re.compile(r'/notes/(\d+)'), self.update_note, True),
+            ('DELETE', re.compile(r'/notes/(\d+)'), self.remove_note, True),
+        ]
+
+    # Обробники маршрутів виконуються в пулі потоків і повертають (статус, JSON-дані)
+    def list_contacts(self, params, body):
+        contacts, total = self.facade.find_contacts(params.get('query'), int(params.get('page', 1)),
+                                                    int(params.get('page_size', 20)),
+                                                    params.get('fuzzy') in ('1', 'true'))
+        return 200, {'total': total, 'items': [contact_to_dict(contact) for contact in contacts]}
+
+    def get_contact(self, params, body, contact_id):
+        return 200, contact_to_dict(self.facade.get_contact(int(contact_id)))
+
+    def create_contact(self, params, body):
+        missing = [field for field in self.CONTACT_FIELDS if not isinstance(body.get(field), str)]
+        if missing:
+            raise ValueError(f"Не вказано поля: {', '.join(missing)}")
+        return 201, contact_to_dict(self.facade.create_contact(*(body[field] for field in self.CONTACT_FIELDS)))
+
+    def update_contact(self, params, body, contact_id):
+        fields = {field: body[field] for field in self.CONTACT_FIELDS if field in body}
+        invalid = [field for field, value in fields.items() if not isinstance(value, str)]
+        if invalid:
+            raise ValueError(f"Поля мають бути рядками: {', '.join(invalid)}")
+        return 200, contact_to_dict(self.facade.update_contact(int(contact_id), **fields))
+
+    def remove_contact(self, params, body, contact_id):
+        self.facade.remove_contact(int(contact_id))
+        return 204, None
+
+    def birthdays(self, params, body):
+        return 200, [dict(contact_to_dict(contact), next_birthday=birthday.isoformat())
+                     for contact, birthday in self.facade.birthdays(int(params.get('days', 7)))]
+
+    def list_notes(self, params, body):
+        tags = [tag for tag in params.get('tags', '').split(',') if tag.strip()]
+        limit = int(params['limit']) if 'limit' in params else None
+        notes = self.facade.find_notes(params.get('query'), tags, params.get('mode', 'and'), limit)
+        return 200, [note_to_dict(note) for note in notes]
+
+    def get_note(self, params, body, note_id):
+        return 200, note_to_dict(self.facade.get_note(int(note_id)))
+
+    @staticmethod
+    def note_tags(body, default):
+        """
+        Повертає теги з тіла запиту: рядок замість списку інакше розбився б на окремі символи.
+        """
+        tags = body.get('tags', default)
+        if not isinstance(tags, list) or not all(isinstance(tag, str) for tag in tags):
+            raise ValueError("Поле tags має бути списком рядків.")
+        return tags
+
+    def create_note(self, params, body):
+        if not isinstance(body.get('text'), str):
+            raise ValueError("Не вказано текст нотатки.")
+        return 201, note_to_dict(self.facade.create_note(body['text'], self.note_tags(body, [])))
+
+    def update_note(self, params, body, note_id):
+        note = self.facade.get_note(int(note_id))
+        text = body.get('text', note.text)
+        if not isinstance(text, str):
+            raise ValueError("Поле text має бути рядком.")
+        return 200, note_to_dict(self.facade.update_note(int(note_id), text, self.note_tags(body, list(note.tags))))
+
+    def remove_note(self, params, body, note_id):
+        self.facade.remove_note(int(note_id))
+        return 204, None
+
+    async def dispatch(self, method, target, body):
+        """
+        Знаходить маршрут і виконує обробник під відповідним блокуванням.
+        Returns:
+            tuple: (HTTP-статус, дані відповіді).
+        """
+        url = urlsplit(target)
+        allowed = False
+        for route_method, pattern, handler, writes in self.routes:
+            match = pattern.fullmatch(url.path)
+            if match is None:
+                continue
+            allowed = True
+            if route_method != method:
+                continue
+            try:
+                params = {name: values[-1] for name, values in parse_qs(url.query).items()}
+                data = json.loads(body) if body else {}
+                if not isinstance(data, dict):
+                    raise ValueError("Тіло запиту має бути JSON-об'єктом.")
+                call = partial(handler, params, data, *match.groups())
+                loop = asyncio.get_running_loop()
+                async with (self.lock.writing() if writes else self.lock.reading()):
+                    return await loop.run_in_executor(self.executor, call)
+            except LookupError as error:
+                return 404, {'error': str(error)}
+            except (ValueError, TypeError) as error:
+                return 400, {'error': str(error)}
+            except Exception as error:
+                console.print(f"[bold red]Помилка:[/bold red] {method} {target}: {error!r}")
+                return 500, {'error': 'internal error'}
+        if allowed:
+            return 405, {'error': f"Метод {method} не підтримується для {url.path}"}
+        return 404, {'error': f"Невідомий шлях: {url.path}"}
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                # Деякі клієнти надсилають не закодовані кириличні символи в шляху - приймаємо їх як UTF-8
+                try:
+                    parts = request_line.decode('UTF-8').split()
+                except UnicodeDecodeError:
+                    parts = request_line.decode('latin-1').split()
+                if len(parts) != 3:
+                    break
+                method, target, version = parts
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                length = int(headers.get('content-length') or 0)
+                body = await reader.readexactly(length) if length else b''
+
+                status, payload = await self.dispatch(method.upper(), target, body)
+                data = b'' if payload is None else json.dumps(payload, ensure_ascii=False).encode('UTF-8')
+                keep_alive = headers.get('connection', '').lower() != 'close' and version == 'HTTP/1.1'
+                head = (f'HTTP/1.1 {status} {REASONS[status]}\r\n'
+                        f'Content-Type: application/json; charset=utf-8\r\n'
+                        f'Content-Length: {len(data)}\r\n'
+                        f'Connection: {"keep-alive" if keep_alive else "close"}\r\n\r\n')
+                writer.write(head.encode('latin-1') + data)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self):
+        self.lock = ReadWriteLock()
+        self.server = await asyncio.start_server(self.handle_connection, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self.server
+
+    async def serve_forever(self):
+        await self.start()
+        console.print(f"[cyan]API помічника слухає http://{self.host}:{self.port} (Ctrl+C - зупинити)[/cyan]")
+        async with self.server:
+            await self.server.serve_forever()
+
+    def run(self):
+        """
+        Запускає сервер до Ctrl+C або сигналу завершення, після чого зберігає дані.
+        """
+        try:
+            asyncio.run(self.serve_forever())
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.executor.shutdown(wait=True)
+            self.facade.contact_manager.dump()
+            self.facade.notes_manager.dump_notes()
+            console.print("[cyan]API зупинено, дані збережено.[/cyan]")
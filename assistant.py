@@ -1,25 +1,144 @@
-from rich.console import Console
-from prompt_toolkit import prompt
-from prompt_toolkit.completion import WordCompleter
-from rich.table import Table
-from rich.live import Live
-from contact_manager import ContactManager
-from notes_manager import NotesManager
+import os
+import sys
+import signal
+import argparse
+from datetime import datetime
+from lazy_console import LazyConsole
+from command_registry import CommandRegistry
+from table_view import PagedTable
+from contact_manager import ContactManager, SqliteContactManager
+from notes_manager import NotesManager, SqliteNotesManager
 from sorter_manager import FolderOrganizer
+from metrics import metrics, start_from_env
+from undo_history import UndoHistory
 
-console = Console()
+console = LazyConsole()
 
 class PersonalAssistantFacade:
     def __init__(self):
-        self.contact_manager = ContactManager()
-        self.notes_manager = NotesManager()
+        # Спільна історія змін контактів і нотаток: команда 'скасувати' відміняє останню зміну будь-якого з них
+        self.history = UndoHistory()
+        # ASSISTANT_STORAGE=sqlite перемикає контакти й нотатки на базу SQLite (assistant.db):
+        # книга і нотатки тоді не завантажуються в пам'ять, а читаються запитами
+        if os.environ.get('ASSISTANT_STORAGE') == 'sqlite':
+            self.contact_manager = SqliteContactManager(history=self.history)
+            self.notes_manager = SqliteNotesManager(history=self.history)
+        else:
+            self.contact_manager = ContactManager(history=self.history)
+            self.notes_manager = NotesManager(history=self.history)
         self.sorter_manager = FolderOrganizer()
-        self.commands = ['додати контакт', 'список контактів', 'пошук контактів', 'дні народження', 
-                         'редагувати контакт', 'видалити контакт', 'сортувати файли',
-                         'додати нотатку', 'пошук нотаток', 'видалити нотатку', 'список нотаток', 
-                         'редагувати нотатку', 'сортувати нотатки', 'допомога', 'вихід']
-        # Встановлення автодоповнення на основі доступних команд
-        self.command_completer = WordCompleter(self.commands)
+        self.instrument()
+        # Реєстр команд будується один раз; з нього ж береться список команд для довідки й автодоповнення
+        self.registry = self.build_registry()
+        self.commands = self.registry.names()
+        self._command_completer = None
+
+    # Операції, тривалість яких записується при ASSISTANT_METRICS=1. Інтерактивні команди
+    # не вимірюються цілком, бо їх час залежить від введення користувача, - лише операції всередині
+    API_METHODS = ('find_contacts', 'get_contact', 'create_contact', 'update_contact', 'remove_contact', 'birthdays',
+                   'find_notes', 'get_note', 'create_note', 'update_note', 'remove_note')
+    CONTACT_OPERATIONS = ('load', '_finish_load', 'dump', 'flush', '_ensure_search_index', 'fuzzy_contacts',
+                          'birthdays_within', 'create_contact', 'update_contact', 'remove_contact', 'import_file',
+                          'export_file')
+    NOTE_OPERATIONS = ('dump_notes', 'search_text', 'notes_by_tags', 'create_note', 'update_note', 'remove_note')
+    FOLDER_OPERATIONS = ('plan_folder', 'sort_folder', 'undo_last_sort')
+
+    def instrument(self):
+        """
+        Обгортає методи фасаду та операції менеджерів вимірюванням тривалості (лише якщо збір статистики увімкнено).
+        """
+        if not metrics.enabled:
+            return
+        metrics.instrument(self, self.API_METHODS, 'api')
+        metrics.instrument(self.contact_manager, self.CONTACT_OPERATIONS, 'contacts')
+        metrics.instrument(self.notes_manager, self.NOTE_OPERATIONS, 'notes')
+        metrics.instrument(self.sorter_manager, self.FOLDER_OPERATIONS, 'folder')
+        # Фонові збереження виконує Autosaver, тож вимірюється його функція збереження
+        for manager, operation in ((self.contact_manager, 'contacts.autosave'), (self.notes_manager, 'notes.autosave')):
+            manager._autosave.save = metrics.wrap(manager._autosave.save, operation)
+
+    def show_statistics(self):
+        """
+        Виводить зібрану статистику і, якщо задано ASSISTANT_METRICS_FILE, оновлює файл експорту.
+        """
+        metrics.show()
+        path = os.environ.get('ASSISTANT_METRICS_FILE')
+        if path and metrics.enabled:
+            metrics.export(path)
+            console.print(f"[cyan]Статистику записано у '{path}'.[/cyan]")
+
+    def build_registry(self):
+        """
+        Створює реєстр команд: назва, підказка, обробник для інтерактивного режиму
+        та обробник для пакетного режиму (None - команда лише інтерактивна).
+        Returns:
+            CommandRegistry: Реєстр команд помічника.
+        """
+        registry = CommandRegistry()
+        add = registry.register
+        add('додати контакт', lambda args: self.add_contact_from_console(),
+            "Пропоную вам додати новий контакт.", self.batch_add_contact)
+        add('список контактів', lambda args: self.list_contacts(),
+            "Ваш список контактів.", lambda args: self.list_contacts())
+        add('пошук контактів', lambda args: self.search_contacts(args or None),
+            "Для пошуку контактів введіть ім'я.", lambda args: self.search_contacts(self._require(args)))
+        add('дні народження', lambda args: self.upcoming_birthdays(int(args) if args else 7),
+            "Перегляньте список контактів у кого День народження впродовж наступного тижня.",
+            lambda args: self.upcoming_birthdays(int(args) if args else 7))
+        add('нагадування', lambda args: self.show_reminders(),
+            "Найближчі нагадування про дні народження:", lambda args: self.show_reminders())
+        add('редагувати контакт', lambda args: self.edit_contact(self.search_contacts(args or None, choose=True)),
+            "Для редагування контакту.", self.batch_edit_contact)
+        add('видалити контакт', lambda args: self.delete_contact(),
+            "Для видалення контакту.", self.batch_delete_contact)
+        add('імпорт контактів',
+            lambda args: self.import_contacts(args or input("Введіть шлях до файлу CSV, vCard (.vcf) або JSON Lines (.jsonl): ")),
+            "Імпорт контактів з файлу:", lambda args: self.import_contacts(self._require(args)))
+        add('експорт контактів',
+            lambda args: self.export_contacts(args or input("Введіть шлях до файлу CSV, vCard (.vcf) або JSON Lines (.jsonl): ")),
+            "Експорт контактів у файл:", lambda args: self.export_contacts(self._require(args)))
+        add('сортувати файли',
+            lambda args: self.organize_folder(args or input("Введіть назву папки або шлях до папки для сортування: ")),
+            "Для сортування файлів: ", self.batch_organize_folder)
+        add('план сортування',
+            lambda args: self.preview_folder(args or input("Введіть назву папки або шлях до папки для сортування: ")),
+            "План сортування (файли не змінюються): ", self.batch_preview_folder)
+        add('скасувати сортування',
+            lambda args: self.undo_sort(args or input("Введіть назву папки або шлях до відсортованої папки: ")),
+            "Скасування останнього сортування: ", lambda args: self.undo_sort(self._require(args)))
+        add('стежити за папкою',
+            lambda args: self.watch_folder(args or input("Введіть назву папки або шлях до папки для спостереження: ")),
+            "Нові файли в папці сортуватимуться автоматично.")
+        add('додати нотатку', lambda args: self.add_note(),
+            "Додавання нових нотаток:", self.batch_add_note)
+        add('пошук нотаток', lambda args: self.search_notes(),
+            "Для пошуку нотаток: ", self.batch_search_notes)
+        add('видалити нотатку', lambda args: self.delete_note(),
+            "Для видалення нотатки.", self.batch_delete_note)
+        add('список нотаток', lambda args: self.list_notes(),
+            "Ваш список нотаток.", lambda args: self.list_notes())
+        add('редагувати нотатку', self.edit_note_from_console,
+            "Для редагування нотатки:", self.batch_edit_note)
+        add('сортувати нотатки', lambda args: self.sort_notes_by_tags(),
+            "Відсортовані нотатки: ", lambda args: self.sort_notes_by_tags())
+        add('скасувати', lambda args: self.undo(),
+            batch=lambda args: self.undo())
+        add('повторити', lambda args: self.redo(),
+            batch=lambda args: self.redo())
+        add('статистика', lambda args: self.show_statistics(),
+            "Статистика роботи помічника:", lambda args: self.show_statistics())
+        add('допомога', lambda args: self.display_commands_table(),
+            batch=lambda args: console.print(', '.join(self.commands)))
+        add('вихід', self.exit, "До нових зустрічей!", lambda args: False)
+        return registry
+
+    @property
+    def command_completer(self):
+        # Автодоповнення на основі доступних команд; prompt_toolkit імпортується лише при першому зверненні
+        if self._command_completer is None:
+            from prompt_toolkit.completion import WordCompleter
+            self._command_completer = WordCompleter(self.commands)
+        return self._command_completer
     
     # Додавання контакту через консоль
     def add_contact_from_console(self):
@@ -34,8 +153,8 @@ class PersonalAssistantFacade:
         self.contact_manager.list_contacts()
     
     # Покшук контактів
-    def search_contacts(self):
-        self.contact_manager.search_contacts()
+    def search_contacts(self, query=None, choose=False):
+        return self.contact_manager.search_contacts(query, choose=choose)
 
     # Редагування контактів
     def edit_contact(self, contact):
@@ -45,6 +164,32 @@ class PersonalAssistantFacade:
     def upcoming_birthdays(self, days):
         self.contact_manager.upcoming_birthdays(days)
     
+    # Скасування та повторення змін контактів і нотаток
+    def undo(self):
+        step = self.history.undo()
+        if step is None:
+            console.print("[yellow]Немає змін, які можна скасувати.[/yellow]")
+        else:
+            label, count = step
+            console.print(f"[green]Скасовано: {label or 'зміна'} (записів: {count}).[/green]")
+
+    def redo(self):
+        step = self.history.redo()
+        if step is None:
+            console.print("[yellow]Немає скасованих змін, які можна повторити.[/yellow]")
+        else:
+            label, count = step
+            console.print(f"[green]Повторено: {label or 'зміна'} (записів: {count}).[/green]")
+
+    def show_reminders(self):
+        self.contact_manager.show_reminders()
+
+    def import_contacts(self, path):
+        self.contact_manager.import_from_console(path.strip())
+
+    def export_contacts(self, path):
+        self.contact_manager.export_from_console(path.strip())
+
     # Додавання нотатки
     def add_note(self):
         self.notes_manager.add_note()
@@ -71,49 +216,318 @@ class PersonalAssistantFacade:
 
     def organize_folder(self, local_path):
         self.sorter_manager.organize_folder(local_path)
+
+    # Пробний запуск сортування
+    def preview_folder(self, local_path, recursive=None):
+        self.sorter_manager.preview_folder_from_console(local_path, recursive)
+
+    # Скасування останнього сортування
+    def undo_sort(self, local_path):
+        self.sorter_manager.undo_from_console(local_path)
+
+    # Спостереження за папкою та сортування нових файлів
+    def watch_folder(self, local_path):
+        self.sorter_manager.watch_folder_from_console(local_path)
     
+    # API без діалогу з користувачем: приймає аргументи і повертає дані (для HTTP-сервера)
+    def find_contacts(self, query=None, page=1, page_size=20, fuzzy=False):
+        """
+        Args:
+            fuzzy (bool, optional): Шукати за ім'ям з урахуванням помилок і транслітерації.
+                Нечіткий пошук рахує лише найближчі збіги до кінця запитаної сторінки.
+        Returns:
+            tuple: Контакти сторінки та загальна кількість (усіх контактів або збігів запиту).
+        """
+        if query and fuzzy:
+            start = (page - 1) * page_size
+            matches = self.contact_manager.fuzzy_contacts(query, start + page_size)
+            return [contact for contact, _ in matches[start:]], len(matches)
+        if query:
+            return self.contact_manager.query_contacts(query, page, page_size)
+        self.contact_manager.wait_loaded()
+        contacts = self.contact_manager.contacts
+        start = (page - 1) * page_size
+        return contacts[start:start + page_size], len(contacts)
+
+    def get_contact(self, contact_id):
+        contact = self.contact_manager.get_contact(contact_id)
+        if contact is None:
+            raise LookupError(f"Контакт {contact_id} не знайдено.")
+        return contact
+
+    def create_contact(self, name, address, phone, email, birthday):
+        manager = self.contact_manager
+        return manager.create_contact(name, address, phone, email, manager.parse_birthday(birthday))
+
+    def update_contact(self, contact_id, **fields):
+        contact = self.get_contact(contact_id)
+        if fields.get('birthday') is not None:
+            fields['birthday'] = self.contact_manager.parse_birthday(fields['birthday'])
+        self.contact_manager.update_contact(contact, **fields)
+        return contact
+
+    def remove_contact(self, contact_id):
+        self.contact_manager.remove_contact(self.get_contact(contact_id))
+
+    def birthdays(self, days=7):
+        return self.contact_manager.birthdays_within(days)
+
+    def find_notes(self, query=None, tags=None, mode='and', limit=None):
+        """
+        Шукає нотатки за текстом і (або) тегами; без умов повертає всі нотатки.
+        """
+        manager = self.notes_manager
+        if query and tags:
+            found = {note.id for note in manager.notes_by_tags(tags, mode, substring=True)}
+            notes = [note for note in manager.search_text(query) if note.id in found]
+        elif query:
+            notes = manager.search_text(query)
+        elif tags:
+            notes = manager.notes_by_tags(tags, mode, substring=True)
+        else:
+            notes = manager.notes
+        return notes[:limit] if limit else list(notes)
+
+    def get_note(self, note_id):
+        note = self.notes_manager.get_note(note_id)
+        if note is None:
+            raise LookupError(f"Нотатку {note_id} не знайдено.")
+        return note
+
+    def create_note(self, text, tags=()):
+        return self.notes_manager.create_note(text, list(tags))
+
+    def update_note(self, note_id, text, tags=()):
+        note = self.get_note(note_id)
+        self.notes_manager.update_note(self.notes_manager.notes.index(note), text, list(tags))
+        return self.get_note(note_id)
+
+    def remove_note(self, note_id):
+        note = self.get_note(note_id)
+        self.notes_manager.remove_note(self.notes_manager.notes.index(note))
+
     # Псевдо-штучний інтелект відображення доступних команд
     def analyze_user_input(self, user_input):
-        normalized_input = user_input.lower()
-        if "допомога" in normalized_input:
-            self.display_commands_table()
-        elif "додати контакт" in normalized_input:
-            console.print("[green]Пропоную вам додати новий контакт.[/green]")
-        elif "видалити контакт" in normalized_input:
-            console.print("[green]Для видалення контакту.[/green]")
-        elif "список контактів" in normalized_input:
-            console.print("[green]Ваш список контактів.[/green]")
-        elif "пошук контактів" in normalized_input:
-            console.print("[green]Для пошуку контактів введіть ім'я.[/green]")  
-        elif "редагувати контакт" in normalized_input:
-            console.print("[green]Для редагування контакту.[/green]")
-        elif "дні народження" in normalized_input:
-            console.print("[green]Перегляньте список контактів у кого День народження впродовж наступного тижня.[/green]")
-        elif "додати нотатку" in normalized_input:
-            console.print("[green]Додавання нових нотаток:[/green]")
-        elif "видалити нотатку" in normalized_input:
-            console.print("[green]Для видалення нотатки.[/green]") 
-        elif "пошук нотаток" in normalized_input:
-            console.print("[green]Для пошуку нотаток: [/green]")
-        elif "список нотаток" in normalized_input:
-            console.print("[green]Ваш список нотаток.[/green]")
-        elif "редагувати нотатку" in normalized_input:
-            console.print("[green]Для редагування нотатки:[/green]")
-        elif "сортувати нотатки" in normalized_input:
-            console.print("[green]Відсортовані нотатки: [/green]")
-        elif "сортувати файли" in normalized_input:
-            console.print("[green]Для сортування файлів: [/green]")
-        elif "вихід" in normalized_input:
-            console.print("[green]До нових зустрічей![/green]")
-            exit()
-        elif "допомога" in normalized_input:
+        """
+        Розпізнає команду у введеному рядку та виводить підказку до неї.
+        Args:
+            user_input (str): Введений рядок.
+        Returns:
+            tuple: (Command, аргументи) або (None, user_input), якщо команду не розпізнано.
+        """
+        command, args = self.registry.match(user_input)
+        if command is None:
+            console.print("[red]Не можу розпізнати вашу команду. Пропоную Вам список доступних команд.[/red]")
             self.display_commands_table()
+        elif command.hint:
+            console.print(f"[green]{command.hint}[/green]")
+        return command, args
+
+    def execute(self, user_input):
+        """
+        Виконує одну команду інтерактивного режиму.
+        Returns:
+            bool: False, якщо користувач завершив роботу.
+        """
+        command, args = self.analyze_user_input(user_input)
+        if command is None:
+            return True
+        metrics.add('commands', command.name)
+        # Усі зміни однієї команди - один крок історії
+        with self.history.step(command.name):
+            return command.handler(args) is not False
+
+    def edit_note_from_console(self, args):
+        while True:
+            try:
+                note_index = int(args or input("Введіть номер нотатки, яку ви хочете відредагувати: "))
+                self.edit_note(note_index)
+                break
+            except ValueError:
+                args = None
+                console.print("[red]Не вказано номер нотатки![/red]")
+
+    def exit(self, args=None):
+        self.contact_manager.dump()
+        self.notes_manager.dump_notes()
+        return False
+
+    # Пакетний режим: команди з аргументами, розділеними ';'
+    @staticmethod
+    def _require(args):
+        if not args:
+            raise ValueError("Команда потребує аргументу.")
+        return args
+
+    @staticmethod
+    def _split_args(args, count):
+        parts = [part.strip() for part in args.split(';')] if args else []
+        if len(parts) < count:
+            raise ValueError(f"Очікується аргументів: {count}, отримано: {len(parts)}.")
+        return parts
+
+    @staticmethod
+    def _text_and_tags(args):
+        # Текст може містити ';', тому теги відділяються останньою крапкою з комою
+        text, separator, tags = args.rpartition(';')
+        if not separator:
+            text, tags = args, ''
+        return text.strip(), [tag for tag in tags.split(',') if tag.strip()]
+
+    def batch_add_contact(self, args):
+        """
+        додати контакт ім'я; адреса; телефон; пошта; день-місяць-рік
+        """
+        name, address, phone, email, birthday = self._split_args(args, 5)[:5]
+        manager = self.contact_manager
+        manager.create_contact(name, address, phone, email, manager.parse_birthday(birthday))
+        console.print(f"[green]Контакт {name} успішно доданий до книги контактів.[/green]")
+
+    CONTACT_FIELDS = {"ім'я": 'name', 'name': 'name', 'адреса': 'address', 'address': 'address',
+                      'телефон': 'phone', 'phone': 'phone', 'пошта': 'email', 'email': 'email',
+                      'день народження': 'birthday', 'birthday': 'birthday'}
+
+    def batch_edit_contact(self, args):
+        """
+        редагувати контакт телефон, пошта або ім'я; поле=значення; ...
+        """
+        key, *fields = self._split_args(args, 2)
+        contact = self._find_contact(key)
+        changes = {}
+        for field in fields:
+            name, separator, value = field.partition('=')
+            attribute = self.CONTACT_FIELDS.get(name.strip().lower())
+            if not separator or attribute is None:
+                raise ValueError(f"Невідоме поле контакту: {field}")
+            value = value.strip()
+            changes[attribute] = self.contact_manager.parse_birthday(value) if attribute == 'birthday' else value
+        self.contact_manager.update_contact(contact, **changes)
+        console.print(f"[green]Контакт {contact.name} успішно відредаговано.[/green]")
+
+    def batch_delete_contact(self, args):
+        """
+        видалити контакт телефон, пошта або ім'я
+        """
+        contact = self._find_contact(self._require(args))
+        if not self.contact_manager.remove_contact(contact):
+            raise ValueError(f"Контакт '{args}' не вдалося видалити.")
+        console.print(f"[green]Контакт {contact.name} успішно видалено.[/green]")
+
+    def _find_contact(self, key):
+        contact = self.contact_manager.find_contact(key)
+        if contact is None:
+            raise ValueError(f"Контакт '{key}' не знайдено.")
+        return contact
+
+    def batch_add_note(self, args):
+        """
+        додати нотатку текст; тег1, тег2
+        """
+        text, tags = self._text_and_tags(self._require(args))
+        self.notes_manager.create_note(text, tags)
+        console.print("[green]Нотатка успішно додана.[/green]")
+
+    def batch_edit_note(self, args):
+        """
+        редагувати нотатку номер; текст; тег1, тег2
+        """
+        note_index, separator, rest = self._require(args).partition(';')
+        if not separator:
+            raise ValueError("Очікується: номер; текст; теги.")
+        text, tags = self._text_and_tags(rest)
+        self.notes_manager.update_note(int(note_index), text, tags)
+        console.print(f"[green]Нотатка {int(note_index)} успішно відредагована.[/green]")
+
+    def batch_delete_note(self, args):
+        """
+        видалити нотатку номер
+        """
+        note = self.notes_manager.remove_note(int(self._require(args)))
+        console.print(f"[bold green]Нотатка успішно видалена:[/bold green] {note.text}")
+
+    def batch_search_notes(self, args):
+        """
+        пошук нотаток текст або #тег (кілька тегів через кому - усі одразу, через '|' - будь-який)
+        """
+        query = self._require(args)
+        if query.startswith('#'):
+            self.notes_manager.search_notes(tag_query=query)
         else:
-            console.print("[red]Не можу розпізнати вашу команду. Пропоную Вам список доступних команд.[/red]")
-            self.display_commands_table()  
+            self.notes_manager.search_notes(text_query=query)
+
+    def _folder_and_recursive(self, args):
+        folder, _, recursive = self._require(args).partition(';')
+        folder = folder.strip()
+        if not os.path.isdir(folder):
+            raise ValueError(f'Папка "{folder}" не існує.')
+        return folder, recursive.strip().lower() in ('так', 'т', 'yes', 'y')
+
+    def batch_organize_folder(self, args):
+        """
+        сортувати файли шлях; так - разом із вкладеними папками
+        """
+        folder, recursive = self._folder_and_recursive(args)
+        self.sorter_manager.organize_folder(folder, recursive=recursive)
+
+    def batch_preview_folder(self, args):
+        """
+        план сортування шлях; так - разом із вкладеними папками
+        """
+        self.preview_folder(*self._folder_and_recursive(args))
+
+    def run_batch(self, lines):
+        """
+        Виконує команди з файлу або stdin, по одній на рядок. Порожні рядки та рядки з '#'
+        на початку пропускаються. Зміни контактів групуються і зберігаються один раз
+        наприкінці, нотатки також зберігаються один раз.
+        Args:
+            lines (iterable): Рядки з командами.
+        Returns:
+            int: Кількість рядків з помилками.
+        """
+        executed = errors = 0
+        # Таблиці виводяться простим текстом: посторінковий перегляд читав би наступні рядки сценарію
+        PagedTable.interactive = False
+        with self.contact_manager.batch():
+            try:
+                for line_number, line in enumerate(lines, start=1):
+                    line = line.strip()
+                    if not line or line.startswith('#'):
+                        continue
+                    command, args = self.registry.match(line)
+                    if command is None or command.batch is None:
+                        reason = "невідома команда" if command is None else f"команда '{command.name}' недоступна в пакетному режимі"
+                        console.print(f"[red]Рядок {line_number}: {reason}.[/red]")
+                        errors += 1
+                        continue
+                    metrics.add('commands', command.name)
+                    try:
+                        with self.history.step(command.name):
+                            if command.batch(args) is False:
+                                break
+                    except (ValueError, IndexError) as error:
+                        console.print(f"[red]Рядок {line_number} ({command.name}): {error}[/red]")
+                        errors += 1
+                        continue
+                    except Exception as error:
+                        # Непередбачена помилка однієї команди не перериває весь сценарій
+                        console.print(f"[red]Рядок {line_number} ({command.name}): непередбачена помилка "
+                                      f"{type(error).__name__}: {error}[/red]")
+                        errors += 1
+                        continue
+                    executed += 1
+            finally:
+                PagedTable.interactive = True
+                self.notes_manager.dump_notes()
+        console.print(f"[cyan]Виконано команд: {executed}, помилок: {errors}.[/cyan]")
+        return errors
 
     def display_commands_table(self):
         """Створює таблицю зі списком доступних команд і виводить її в консолі"""
+        from rich.console import Console
+        from rich.table import Table
+        from rich.live import Live
+
         # Створення об'єкта Console
         console = Console()
 
@@ -141,13 +555,15 @@ class PersonalAssistantFacade:
 class PersonalAssistant:
     def __init__(self):
         self.facade = PersonalAssistantFacade()
-        self.commands = ['додати контакт', 'список контактів', 'пошук контактів', 'дні народження', 
-                         'редагувати контакт', 'видалити контакт', 'сортувати файли',
-                         'додати нотатку', 'пошук нотаток', 'видалити нотатку', 'список нотаток', 
-                         'редагувати нотатку', 'сортувати нотатки', 'допомога', 'вихід']
+        self.commands = self.facade.commands
     
 
     def run(self):
+        from rich.console import Console
+        from prompt_toolkit import prompt
+        from prompt_toolkit.patch_stdout import patch_stdout
+        from prompt_toolkit.completion import WordCompleter
+
         completer = WordCompleter(self.facade.commands, ignore_case=True)
         """ Основний цикл виконання програми. Полягає в тому, 
             що він виводить вітання та список команд, а потім 
@@ -163,58 +579,74 @@ class PersonalAssistant:
         self.facade.run()
         
         while True:
-            user_input = prompt("Введіть команду: ", completer=completer).lower()
-            self.facade.analyze_user_input(user_input)             # self. instead of assistant.
-            # Перевірка команд і виклик відповідного методу
-            
-            if "допомога" in user_input.lower() :
-                self.facade.display_commands_table()               # # self. instead of assistant.
-            elif "додати контакт" in user_input.lower():
-                self.facade.add_contact_from_console()
-            elif 'видалити контакт' in user_input.lower():
-                self.facade.delete_contact()
-            elif "список контактів" in user_input.lower():
-                self.facade.list_contacts()
-            elif "пошук контактів" in user_input.lower():
-                self.facade.search_contacts()
-            elif "дні народження" in user_input.lower():
-                self.facade.upcoming_birthdays(7)
-            elif 'редагувати контакт' in user_input.lower():
-                contact_to_edit = self.facade.search_contacts() 
-                self.facade.edit_contact(contact=contact_to_edit)
-            elif "додати нотатку" in user_input.lower():
-                self.facade.add_note()
-            elif "видалити нотатку" in user_input.lower():
-                self.facade.delete_note()
-            elif "список нотаток" in user_input.lower():
-                self.facade.list_notes()
-            elif "редагувати нотатку" in user_input.lower():
-                if "редагувати нотатку" in user_input.lower():
-                    while True:
-                        try:
-                            note_index = int(input("Введіть номер нотатки, яку ви хочете відредагувати: "))
-                            if note_index == "":
-                                raise ValueError
-                            else:
-                                self.facade.edit_note(note_index)
-                                break
-                        except ValueError: ("Не вказано номер нотатки!")
-            elif "пошук нотаток" in user_input.lower():
-                self.facade.search_notes()   
-            elif "сортувати нотатки" in user_input.lower():
-                self.facade.sort_notes_by_tags()
-            elif "сортувати файли" in user_input.lower():
-                local_path = input("Введіть назву папки або шлях до папки для сортування: ")
-                self.facade.organize_folder(local_path)
-            elif "вихід" in user_input.lower():
-                self.facade.contact_manager.dump()
-                self.facade.notes_manager.dump_notes()
+            # Фонові повідомлення (нагадування про дні народження) під час очікування команди
+            # виводяться над рядком введення, не перериваючи його
+            with patch_stdout():
+                user_input = prompt("Введіть команду: ", completer=completer)
+            # Команда розпізнається один раз за реєстром і одразу виконується
+            if not self.facade.execute(user_input):
                 break
+
+    def run_batch(self, source):
+        """
+        Пакетний режим: виконує команди з файлу або зі stdin ('-').
+        Args:
+            source (str): Шлях до файлу з командами або '-'.
+        Returns:
+            int: Кількість рядків з помилками.
+        """
+        if source == '-':
+            return self.facade.run_batch(sys.stdin)
+        with open(source, encoding='UTF-8') as fh:
+            return self.facade.run_batch(fh)
         
-def main():
+def _parse_time(value):
+    try:
+        return datetime.strptime(value, '%H:%M').time()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Очікується час у форматі ГГ:ХХ, отримано '{value}'")
+
+
+def _exit_on_signal(signum, frame):
+    sys.exit(128 + signum)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Особистий помічник: контакти, нотатки та сортування файлів.")
+    parser.add_argument('--batch', metavar='FILE',
+                        help="виконати команди з файлу ('-' - зі stdin) без інтерактивного режиму")
+    parser.add_argument('--serve', action='store_true', help="запустити локальний HTTP/JSON API")
+    parser.add_argument('--host', default='127.0.0.1', help="адреса API (за замовчуванням 127.0.0.1)")
+    parser.add_argument('--port', type=int, default=8765, help="порт API (за замовчуванням 8765)")
+    parser.add_argument('--remind-days', type=int, default=0, metavar='DAYS',
+                        help="за скільки днів нагадувати про дні народження (за замовчуванням - у сам день)")
+    parser.add_argument('--remind-at', type=_parse_time, default='09:00', metavar='HH:MM',
+                        help="час нагадувань (за замовчуванням 09:00)")
+    parser.add_argument('--no-reminders', action='store_true', help="вимкнути нагадування про дні народження")
+    args = parser.parse_args(argv)
+
+    # SIGTERM/SIGHUP завершують програму звичайним виходом, тож незбережені зміни записуються через atexit
+    for signal_name in ('SIGTERM', 'SIGHUP'):
+        if hasattr(signal, signal_name):
+            signal.signal(getattr(signal, signal_name), _exit_on_signal)
+    # ASSISTANT_METRICS_FILE - експорт статистики для Prometheus, ASSISTANT_PROFILE - профіль сеансу
+    start_from_env()
+
+    # Нотатки завантажуються в конструкторі NotesManager, контакти - тут; кожне сховище читається один раз
     assistant = PersonalAssistant()
+    if args.batch:
+        assistant.facade.contact_manager.load(background=False)
+        sys.exit(1 if assistant.run_batch(args.batch) else 0)
+    if args.serve:
+        from api_server import AssistantApiServer
+
+        assistant.facade.contact_manager.load()
+        AssistantApiServer(assistant.facade, args.host, args.port).run()
+        sys.exit(0)
     assistant.facade.contact_manager.load()
-    assistant.facade.notes_manager.load_notes()
+    if not args.no_reminders:
+        # Нагадування плануються у фоні й виводяться між командами, не перериваючи введення
+        assistant.facade.contact_manager.start_reminders(days_before=args.remind_days, at=args.remind_at)
     assistant.run()
     return assistant
 
@@ -0,0 +1,110 @@
+import atexit
+import threading
+import time
+from lazy_console import LazyConsole
+
+console = LazyConsole()
+
+
+class Autosaver:
+    """
+    Відкладене збереження (write-behind). Зміни лише позначають сховище як змінене,
+    а фоновий потік викликає save один раз, коли після останньої зміни минув період
+    тиші. Серія швидких змін (наприклад, введення багатьох нотаток поспіль)
+    зберігається одним записом, а запис на диск не затримує відповідь на команду.
+    Під час завершення програми незбережені зміни записуються через atexit.
+    """
+
+    def __init__(self, save, delay=1.0, name='autosave'):
+        """
+        Args:
+            save (callable): Функція без аргументів, яка записує поточний стан на диск.
+            delay (float, optional): Період тиші перед збереженням, секунди. За замовчуванням - 1.
+            name (str, optional): Назва фонового потоку.
+        """
+        self.save = save
+        self.delay = delay
+        self.name = name
+        # Стан змін захищено окремо від запису, тож позначення змін не чекає на повільний запис
+        self._state = threading.Condition()
+        self.lock = threading.RLock()
+        self._dirty = False
+        self._last_change = 0.0
+        self._closed = False
+        self._thread = None
+        atexit.register(self.flush)
+
+    @property
+    def dirty(self):
+        return self._dirty
+
+    def mark_dirty(self):
+        """
+        Позначає сховище як змінене і відкладає збереження на період тиші.
+        """
+        with self._state:
+            self._dirty = True
+            self._last_change = time.monotonic()
+            # Потік запускається заново, якщо попередній завершився через непередбачену помилку
+            if (self._thread is None or not self._thread.is_alive()) and not self._closed:
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+            self._state.notify()
+
+    def _run(self):
+        try:
+            while True:
+                with self._state:
+                    while not self._dirty and not self._closed:
+                        self._state.wait()
+                    if self._closed:
+                        return
+                    # Чекаємо, доки зміни не припиняться на delay секунд
+                    while True:
+                        remaining = self._last_change + self.delay - time.monotonic()
+                        if remaining <= 0 or self._closed:
+                            break
+                        self._state.wait(remaining)
+                self.flush()
+        finally:
+            # Якщо потік зупинився через помилку, наступна зміна (mark_dirty) запустить новий
+            with self._state:
+                if self._thread is threading.current_thread():
+                    self._thread = None
+
+    def flush(self):
+        """
+        Одразу зберігає незбережені зміни, якщо вони є.
+        """
+        with self.lock:
+            with self._state:
+                if not self._dirty:
+                    return
+                self._dirty = False
+            try:
+                self.save()
+            except Exception as error:
+                # Будь-яка помилка збереження (не лише OSError) лишає зміни незбереженими до наступної спроби
+                with self._state:
+                    self._dirty = True
+                    # Повтор - після ще одного періоду тиші, а не одразу в циклі
+                    self._last_change = time.monotonic()
+                console.print(f"[bold red]Помилка:[/bold red] Не вдалося зберегти зміни: {error}")
+
+    def mark_clean(self):
+        """
+        Знімає позначку змін після того, як стан збережено поза Autosaver (повним записом).
+        Викликається під self.lock.
+        """
+        with self._state:
+            self._dirty = False
+
+    def close(self):
+        """
+        Зберігає незбережені зміни і зупиняє фоновий потік.
+        """
+        with self._state:
+            self._closed = True
+            self._state.notify()
+        self.flush()
+        atexit.unregister(self.flush)
@@ -0,0 +1,160 @@
+"""
+Навантажувальний тест локального HTTP/JSON API помічника.
+
+Скрипт створює тимчасову книгу контактів, запускає сервер (python assistant.py --serve)
+в окремому процесі та відкриває кілька keep-alive з'єднань, кожне з яких надсилає
+суміш запитів: пошук контактів, сторінки списку, дні народження і додавання контактів.
+Виводить пропускну здатність і затримки p50/p99 для кожного типу запитів.
+
+Запуск: python benchmarks/bench_api.py [--contacts 20000] [--connections 16]
+        [--requests 500] [--write-ratio 0.05]
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date
+from types import SimpleNamespace
+from urllib.parse import quote
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from contact_storage import ContactJournalStorage
+
+FIRST_NAMES = ['Олександр', 'Іван', 'Марія', 'Олена', 'Андрій', 'Наталія', 'Юрій', 'Софія']
+LAST_NAMES = ['Шевченко', 'Коваленко', 'Бондаренко', 'Ткаченко', 'Мельник', 'Кравченко']
+
+
+def make_contacts(folder, count):
+    contacts = [SimpleNamespace(id=i, name=f'{random.choice(FIRST_NAMES)} {random.choice(LAST_NAMES)} {i}',
+                                address='Київ', phone=f'050{i:07d}', email=f'user{i}@example.com',
+                                birthday=date(1990, 1 + i % 12, 1 + i % 28))
+                for i in range(1, count + 1)]
+    storage = ContactJournalStorage(os.path.join(folder, 'addressbook.csv'))
+    storage.compact(contacts)
+    storage.close()
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+async def wait_for_port(port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            _, writer = await asyncio.open_connection('127.0.0.1', port)
+            writer.close()
+            return
+        except OSError:
+            await asyncio.sleep(0.1)
+    raise RuntimeError('Сервер не запустився.')
+
+
+async def request(reader, writer, method, path, body=None):
+    data = b'' if body is None else json.dumps(body).encode('UTF-8')
+    writer.write(f'{method} {path} HTTP/1.1\r\nHost: localhost\r\nContent-Length: {len(data)}\r\n\r\n'.encode() + data)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        if name.lower() == 'content-length':
+            length = int(value)
+    await reader.readexactly(length)
+    return status
+
+
+def next_request(write_ratio, counter):
+    roll = random.random()
+    if roll < write_ratio:
+        number = next(counter)
+        return 'add', 'POST', '/contacts', {
+            'name': f'Навантаження {number}', 'address': 'Львів', 'phone': f'067{number:07d}',
+            'email': f'load{number}@example.com', 'birthday': '01-02-1990'}
+    roll = random.random()
+    if roll < 0.7:
+        query = random.choice(FIRST_NAMES + LAST_NAMES)[:random.randint(3, 6)]
+        return 'search', 'GET', f'/contacts?query={quote(query)}&page_size=20', None
+    if roll < 0.85:
+        return 'list', 'GET', f'/contacts?page={random.randint(1, 100)}', None
+    return 'birthdays', 'GET', '/birthdays?days=7', None
+
+
+async def client(port, requests, write_ratio, counter, latencies, errors):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    try:
+        for _ in range(requests):
+            kind, method, path, body = next_request(write_ratio, counter)
+            started = time.perf_counter()
+            status = await request(reader, writer, method, path, body)
+            latencies.setdefault(kind, []).append(time.perf_counter() - started)
+            if status >= 400:
+                errors.append((kind, status))
+    finally:
+        writer.close()
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+async def run_load(port, connections, requests, write_ratio):
+    counter = iter(range(1, 10 ** 9))
+    latencies, errors = {}, []
+    await wait_for_port(port)
+    # Прогрів: перший пошук будує пошуковий індекс
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    await request(reader, writer, 'GET', '/contacts?query=' + quote('Іван'))
+    writer.close()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client(port, requests, write_ratio, counter, latencies, errors)
+                           for _ in range(connections)))
+    return time.perf_counter() - started, latencies, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--contacts', type=int, default=20_000)
+    parser.add_argument('--connections', type=int, default=16)
+    parser.add_argument('--requests', type=int, default=500, help='запитів на одне з\'єднання')
+    parser.add_argument('--write-ratio', type=float, default=0.05)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as folder:
+        make_contacts(folder, args.contacts)
+        port = free_port()
+        server = subprocess.Popen([sys.executable, os.path.join(ROOT, 'assistant.py'), '--serve', '--port', str(port)],
+                                  cwd=folder, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            elapsed, latencies, errors = asyncio.run(
+                run_load(port, args.connections, args.requests, args.write_ratio))
+        finally:
+            server.terminate()
+            server.wait()
+
+    total = sum(len(values) for values in latencies.values())
+    print(f'contacts: {args.contacts}, connections: {args.connections}, requests: {total}, '
+          f'errors: {len(errors)}, throughput: {total / elapsed:.0f} req/s')
+    print(f"{'request':>10} {'count':>7} {'p50, ms':>9} {'p99, ms':>9}")
+    everything = [value for values in latencies.values() for value in values]
+    for kind, values in sorted(latencies.items()) + [('all', everything)]:
+        print(f'{kind:>10} {len(values):>7} {percentile(values, 0.5) * 1e3:>9.2f} {percentile(values, 0.99) * 1e3:>9.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+"""
+Порівняння вартості однієї зміни книги контактів: дописування в журнал
+проти повного перезапису CSV (як робив ContactManager.dump після кожної зміни).
+
+Запуск: python benchmarks/bench_journal.py
+"""
+import os
+import sys
+import tempfile
+import time
+from datetime import date
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from contact_storage import ContactJournalStorage
+
+
+def make_contacts(count):
+    return [SimpleNamespace(id=i, name=f'Контакт {i}', address='Київ', phone=f'050{i:07d}',
+                            email=f'user{i}@example.com', birthday=date(1990, 1 + i % 12, 1 + i % 28))
+            for i in range(count)]
+
+
+def bench(count, mutations=200):
+    contacts = make_contacts(count)
+    with tempfile.TemporaryDirectory() as tmp:
+        storage = ContactJournalStorage(os.path.join(tmp, 'addressbook.csv'),
+                                        compact_min_records=10 ** 9)
+        storage.compact(contacts)
+
+        start = time.perf_counter()
+        for i in range(mutations):
+            storage.append('edit', contacts[i % count])
+        journal_cost = (time.perf_counter() - start) / mutations
+
+        rewrites = max(1, mutations // 20)
+        start = time.perf_counter()
+        for _ in range(rewrites):
+            storage.compact(contacts)
+        rewrite_cost = (time.perf_counter() - start) / rewrites
+        storage.close()
+    return journal_cost, rewrite_cost
+
+
+def main():
+    print(f"{'contacts':>10} {'journal, us':>14} {'full rewrite, us':>18}")
+    for count in (1_000, 10_000, 100_000, 200_000):
+        journal_cost, rewrite_cost = bench(count)
+        print(f'{count:>10} {journal_cost * 1e6:>14.1f} {rewrite_cost * 1e6:>18.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+"""
+Порівняння пам'яті, яку займають контакти: попередній клас з __dict__ та datetime.date
+проти поточного Contact з __slots__, порядковою датою та інтернованими адресами.
+
+Запуск: python benchmarks/bench_memory.py
+"""
+import os
+import sys
+import gc
+import tracemalloc
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from contact_manager import Contact
+
+CITIES = ['Київ', 'Харків', 'Одеса', 'Дніпро', 'Львів', 'Запоріжжя', 'Рівне']
+
+
+class LegacyContact:
+    def __init__(self, name, address, phone, email, birthday, id=None):
+        self.id = id
+        self.name = name
+        self.address = address
+        self.phone = phone
+        self.email = email
+        self.birthday = birthday
+
+
+def measure(contact_class, count):
+    gc.collect()
+    tracemalloc.start()
+    # ''.join створює окрему копію назви міста, як це відбувається при читанні з CSV
+    contacts = [contact_class(f'Контакт {i}', ''.join(CITIES[i % len(CITIES)]), f'050{i:07d}',
+                              f'user{i}@example.com', date(1950 + i % 60, 1 + i % 12, 1 + i % 28), id=i)
+                for i in range(count)]
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del contacts
+    return current
+
+
+def main():
+    print(f"{'contacts':>10} {'legacy, MB':>12} {'slots, MB':>12} {'bytes saved/row':>16}")
+    for count in (10 ** 5, 10 ** 6):
+        legacy = measure(LegacyContact, count)
+        compact = measure(Contact, count)
+        print(f'{count:>10} {legacy / 2 ** 20:>12.1f} {compact / 2 ** 20:>12.1f} {(legacy - compact) / count:>16.1f}')
+
+
+if __name__ == '__main__':
+    main()
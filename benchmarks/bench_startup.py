@@ -0,0 +1,114 @@
+"""
+Час запуску помічника: від старту інтерпретатора до повністю завантажених контактів
+і нотаток. Холодний запуск - без двійкових кешів і збереженого індексу нотаток,
+теплий - з кешами, створеними попереднім запуском.
+
+Кожен запуск виконується в окремому процесі. Якщо медіана перевищує бюджет,
+скрипт завершується з кодом 1, тож його можна додати до збірки як перевірку регресій.
+
+Запуск: python benchmarks/bench_startup.py [--contacts 50000] [--notes 5000]
+        [--cold-budget-ms 1500] [--warm-budget-ms 1000]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date
+from types import SimpleNamespace
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from contact_storage import ContactJournalStorage
+from notes_storage import CsvNotesStorage
+
+# Код, який виконується в дочірньому процесі: той самий шлях запуску, що й у main()
+CHILD = """
+import contextlib, io, json, sys, time
+started = time.perf_counter()
+sys.path.insert(0, {root!r})
+with contextlib.redirect_stdout(io.StringIO()):
+    import assistant
+    imported = time.perf_counter()
+    facade = assistant.PersonalAssistantFacade()
+    facade.contact_manager.load()
+    interactive = time.perf_counter()
+    facade.contact_manager.wait_loaded()
+    ready = time.perf_counter()
+print(json.dumps({{'import': imported - started, 'interactive': interactive - started,
+                  'ready': ready - started, 'contacts': len(facade.contact_manager.contacts),
+                  'notes': len(facade.notes_manager.notes)}}))
+"""
+
+
+def make_data(folder, contacts_count, notes_count):
+    contacts = [SimpleNamespace(id=i, name=f'Контакт {i}', address='Київ', phone=f'050{i:07d}',
+                                email=f'user{i}@example.com', birthday=date(1990, 1 + i % 12, 1 + i % 28))
+                for i in range(1, contacts_count + 1)]
+    storage = ContactJournalStorage(os.path.join(folder, 'addressbook.csv'))
+    storage.compact(contacts)
+    storage.close()
+    notes = [SimpleNamespace(text=f'Нотатка {i} про зустріч і покупки', tags=[f'#тег{i % 50}', '#робота'])
+             for i in range(notes_count)]
+    CsvNotesStorage(os.path.join(folder, 'notes.csv')).save(notes)
+
+
+def drop_caches(folder):
+    for name in ('addressbook.csv.cache', 'notes.csv.cache', 'notes.csv.idx'):
+        path = os.path.join(folder, name)
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def run_once(folder):
+    started = time.perf_counter()
+    result = subprocess.run([sys.executable, '-c', CHILD.format(root=ROOT)], cwd=folder,
+                            capture_output=True, text=True, check=True)
+    timings = json.loads(result.stdout.strip().splitlines()[-1])
+    timings['wall'] = time.perf_counter() - started
+    return timings
+
+
+def measure(folder, runs, cold):
+    samples = []
+    for _ in range(runs):
+        if cold:
+            drop_caches(folder)
+        samples.append(run_once(folder))
+    return {key: statistics.median(sample[key] for sample in samples) for key in samples[0]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--contacts', type=int, default=50_000)
+    parser.add_argument('--notes', type=int, default=5_000)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--cold-budget-ms', type=float, default=1500)
+    parser.add_argument('--warm-budget-ms', type=float, default=1000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as folder:
+        make_data(folder, args.contacts, args.notes)
+        cold = measure(folder, args.runs, cold=True)
+        # Останній холодний запуск залишив кеші - наступні запуски теплі
+        warm = measure(folder, args.runs, cold=False)
+
+    print(f"{'run':>6} {'import, ms':>11} {'interactive, ms':>16} {'ready, ms':>10} {'wall, ms':>9} {'budget, ms':>11}")
+    failed = False
+    for name, timings, budget in (('cold', cold, args.cold_budget_ms), ('warm', warm, args.warm_budget_ms)):
+        print(f"{name:>6} {timings['import'] * 1e3:>11.1f} {timings['interactive'] * 1e3:>16.1f} "
+              f"{timings['ready'] * 1e3:>10.1f} {timings['wall'] * 1e3:>9.1f} {budget:>11.0f}")
+        if timings['wall'] * 1e3 > budget:
+            failed = True
+    print(f"contacts: {cold['contacts']:.0f}, notes: {cold['notes']:.0f}")
+    if failed:
+        print('Час запуску перевищує бюджет.', file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
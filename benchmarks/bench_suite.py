@@ -0,0 +1,244 @@
+"""
+Набір бенчмарків гарячих шляхів менеджерів на синтетичних даних (див. datagen.py).
+
+Вимірюються:
+    ContactManager: load (без кешу та з кешем), dump, search_contacts, fuzzy_contacts, add_contact,
+                    upcoming_birthdays
+    NotesManager: load_notes, search_notes (за текстом і тегами), sort_notes_by_tags
+    FolderOrganizer: organize_folder (рекурсивне сортування дерева папок)
+
+Результати виводяться таблицею і записуються в JSON. Якщо вказати --compare з результатами
+попереднього запуску, скрипт позначає вимірювання, що сповільнились більше ніж на --threshold,
+і завершується з кодом 1 - так регресії можна ловити під час збірки.
+
+Запуск: python benchmarks/bench_suite.py [--sizes 1000,10000,100000] [--tree-sizes 1000,10000]
+        [--output results.json] [--compare baseline.json] [--threshold 0.25]
+Масштаб 10^6: --sizes 1000000 (потребує кількох ГБ пам'яті і кількох хвилин).
+"""
+import argparse
+import contextlib
+import gc
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from datagen import ROOT, TAGS, FIRST_NAMES, LAST_NAMES, contact_records, write_contacts, write_notes, make_tree
+
+from contact_manager import ContactManager
+from notes_manager import NotesManager
+from sorter_manager import FolderOrganizer
+
+SEARCH_QUERIES = [name[:4] for name in FIRST_NAMES[:6]] + LAST_NAMES[:6] + ['Київ', 'ukr.net', '067', 'Окс Бойк']
+# Імена з помилками та латиницею для нечіткого пошуку
+FUZZY_QUERIES = ['Mykola', 'Oleksandr Shevchenko', 'Iryna Polishchuk', 'Олксандр Ковленко', 'Yizhakevych',
+                 'Bohdan Kravchuk', 'Катирина', 'Zorjana Gudzenko']
+
+
+class Terminal(io.StringIO):
+    """
+    Вивід, який видає себе за термінал: таблиці показуються так само, як користувачу
+    (перша сторінка з підказкою), а не повним текстовим дампом для перенаправленого виводу.
+    """
+
+    def isatty(self):
+        return True
+
+
+@contextlib.contextmanager
+def quiet():
+    """
+    Приховує вивід команд: бенчмарк вимірює роботу менеджерів, а не термінал.
+    Таблиці rich усе одно будуються й рендеряться, але в пам'ять; на запити
+    посторінкового перегляду відповідає Enter (вихід після першої сторінки).
+    """
+    stdin = sys.stdin
+    sys.stdin = io.StringIO('\n' * 1000)
+    try:
+        with contextlib.redirect_stdout(Terminal()):
+            yield
+    finally:
+        sys.stdin = stdin
+
+
+def timed(func, min_time=0.2, max_repeat=50):
+    """
+    Виконує func кілька разів, доки сумарний час не перевищить min_time.
+    Returns:
+        tuple: (найкращий час одного виклику, кількість викликів), секунди.
+    """
+    best, repeat, total = float('inf'), 0, 0.0
+    while repeat < max_repeat and (repeat == 0 or total < min_time):
+        gc.collect()
+        started = time.perf_counter()
+        with quiet():
+            func()
+        elapsed = time.perf_counter() - started
+        best = min(best, elapsed)
+        total += elapsed
+        repeat += 1
+    return best, repeat
+
+
+class Suite:
+    def __init__(self):
+        self.results = []
+
+    def record(self, name, size, seconds, ops=1, repeat=1):
+        self.results.append({'name': name, 'size': size, 'seconds': seconds, 'ops': ops, 'repeat': repeat,
+                             'per_op_us': seconds / ops * 1e6})
+        print(f'{name:>28} {size:>9} {seconds * 1e3:>11.2f} {ops:>7} {seconds / ops * 1e6:>13.1f}', flush=True)
+
+    def measure(self, name, size, func, ops=1, **kwargs):
+        seconds, repeat = timed(func, **kwargs)
+        self.record(name, size, seconds, ops, repeat)
+
+    def once(self, name, size, func, ops=1):
+        gc.collect()
+        started = time.perf_counter()
+        with quiet():
+            func()
+        self.record(name, size, time.perf_counter() - started, ops)
+
+
+def bench_contacts(suite, folder, size, adds=1000):
+    file_path = os.path.join(folder, 'addressbook.csv')
+    write_contacts(file_path, size)
+    # Великий період тиші: фонове збереження не повинно втручатися у вимірювання
+    manager = ContactManager(file_path, autosave_delay=3600)
+
+    def load_cold():
+        os.remove(file_path + '.cache')
+        manager.load(background=False)
+
+    # Перший load створює двійковий кеш, тож холодне завантаження щоразу його видаляє
+    with quiet():
+        manager.load(background=False)
+    suite.measure('contacts.load', size, load_cold, max_repeat=5)
+    suite.measure('contacts.load_cached', size, lambda: manager.load(background=False), max_repeat=5)
+    suite.measure('contacts.dump', size, manager.dump, max_repeat=5)
+    suite.once('contacts.search_index_build', size, manager._ensure_search_index)
+    suite.measure('contacts.search_contacts', size,
+                  lambda: [manager.search_contacts(query) for query in SEARCH_QUERIES], ops=len(SEARCH_QUERIES))
+    suite.measure('contacts.fuzzy_contacts', size,
+                  lambda: [manager.fuzzy_contacts(query) for query in FUZZY_QUERIES], ops=len(FUZZY_QUERIES))
+    suite.measure('contacts.upcoming_birthdays', size, lambda: manager.upcoming_birthdays(7), max_repeat=10)
+
+    new_contacts = list(contact_records(size + adds, seed=1))[size:]
+
+    def add_contacts():
+        for contact in new_contacts:
+            manager.add_contact(contact.name, contact.address, contact.phone, contact.email, contact.birthday)
+    suite.once('contacts.add_contact', size, add_contacts, ops=adds)
+    suite.once('contacts.flush', size, manager.flush)
+    manager._autosave.close()
+
+
+def bench_notes(suite, folder, size):
+    file_path = os.path.join(folder, 'notes.csv')
+    write_notes(file_path, size)
+    with quiet():
+        manager = NotesManager(file_path, autosave_delay=3600)
+    suite.measure('notes.load_notes', size, manager.load_notes, max_repeat=5)
+    suite.measure('notes.build_indexes', size, manager._rebuild_indexes, max_repeat=5)
+
+    text_queries = ['молоко', 'звіт нарада', 'квитки відпустка', 'подарунок']
+    suite.measure('notes.search_notes.text', size,
+                  lambda: [manager.search_notes(text_query=query) for query in text_queries], ops=len(text_queries))
+    tag_queries = [TAGS[-1], f'{TAGS[0]},{TAGS[2]}', f'{TAGS[5]}|{TAGS[8]}', '#под']
+    suite.measure('notes.search_notes.tags', size,
+                  lambda: [manager.search_notes(tag_query=query) for query in tag_queries], ops=len(tag_queries))
+    suite.measure('notes.sort_notes_by_tags', size, manager.sort_notes_by_tags, max_repeat=10)
+    manager._autosave.close()
+
+
+def bench_folder(suite, folder, size):
+    tree = os.path.join(folder, 'tree')
+    make_tree(tree, size)
+    organizer = FolderOrganizer()
+    suite.once('folder.organize_folder', size, lambda: organizer.organize_folder(tree, recursive=True), ops=size)
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline_path, threshold):
+    """
+    Порівнює результати з попереднім запуском.
+    Returns:
+        list: Вимірювання, які сповільнились більше ніж на threshold.
+    """
+    with open(baseline_path, encoding='UTF-8') as file:
+        baseline = {(item['name'], item['size']): item for item in json.load(file)['results']}
+    regressions = []
+    print(f"\n{'benchmark':>28} {'size':>9} {'baseline, us':>13} {'current, us':>13} {'change':>8}")
+    for item in results:
+        previous = baseline.get((item['name'], item['size']))
+        if previous is None:
+            continue
+        change = item['per_op_us'] / previous['per_op_us'] - 1
+        marker = ' !' if change > threshold else ''
+        print(f"{item['name']:>28} {item['size']:>9} {previous['per_op_us']:>13.1f} {item['per_op_us']:>13.1f} "
+              f"{change:>+8.0%}{marker}")
+        if change > threshold:
+            regressions.append(item)
+    return regressions
+
+
+def parse_sizes(text):
+    return [int(float(size)) for size in text.split(',') if size.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', default='1000,10000,100000', help='розміри книги контактів і нотаток')
+    parser.add_argument('--tree-sizes', default='1000,10000', help='кількість файлів для сортування')
+    parser.add_argument('--only', choices=['contacts', 'notes', 'folder'], action='append',
+                        help='запустити лише вказані групи')
+    parser.add_argument('--output', default=f'bench-{datetime.now():%Y%m%d-%H%M%S}.json')
+    parser.add_argument('--compare', help='JSON попереднього запуску для порівняння')
+    parser.add_argument('--threshold', type=float, default=0.25, help='допустиме сповільнення, частка')
+    args = parser.parse_args()
+    groups = set(args.only or ['contacts', 'notes', 'folder'])
+
+    suite = Suite()
+    print(f"{'benchmark':>28} {'size':>9} {'total, ms':>11} {'ops':>7} {'per op, us':>13}")
+    for size in parse_sizes(args.sizes):
+        with tempfile.TemporaryDirectory() as folder:
+            if 'contacts' in groups:
+                bench_contacts(suite, folder, size)
+            if 'notes' in groups:
+                bench_notes(suite, folder, size)
+    if 'folder' in groups:
+        for size in parse_sizes(args.tree_sizes):
+            with tempfile.TemporaryDirectory() as folder:
+                bench_folder(suite, folder, size)
+
+    report = {
+        'meta': {'timestamp': datetime.now().isoformat(timespec='seconds'), 'revision': git_revision(),
+                 'python': platform.python_version(), 'platform': platform.platform(), 'cpus': os.cpu_count()},
+        'results': suite.results,
+    }
+    with open(args.output, 'w', encoding='UTF-8') as file:
+        json.dump(report, file, ensure_ascii=False, indent=2)
+    print(f'\nРезультати збережено у {args.output}')
+
+    if args.compare:
+        regressions = compare(suite.results, args.compare, args.threshold)
+        if regressions:
+            print(f'Сповільнення понад {args.threshold:.0%}: {len(regressions)}', file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
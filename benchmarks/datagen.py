@@ -0,0 +1,155 @@
+"""
+Генератори синтетичних даних для бенчмарків: книга контактів з кириличними іменами
+та телефонами в різних форматах, нотатки з тегами і дерево папок з файлами різних типів.
+
+Усі генератори детерміновані: однакові count і seed дають однакові дані,
+тож результати різних запусків можна порівнювати.
+"""
+import os
+import random
+import sys
+from datetime import date, timedelta
+from types import SimpleNamespace
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from contact_storage import ContactJournalStorage
+from notes_storage import CsvNotesStorage
+from sorter_manager import FolderOrganizer
+
+FIRST_NAMES = ['Олександр', 'Іван', 'Марія', 'Олена', 'Андрій', 'Наталія', 'Юрій', 'Софія', 'Богдан',
+               'Катерина', 'Дмитро', 'Ірина', 'Тарас', 'Оксана', 'Василь', 'Галина', 'Євген', 'Ярослава',
+               'Микола', 'Людмила', 'Сергій', 'Тетяна', 'Остап', 'Зоряна']
+LAST_NAMES = ['Шевченко', 'Коваленко', 'Бондаренко', 'Ткаченко', 'Мельник', 'Кравченко', 'Олійник',
+              'Шевчук', 'Поліщук', 'Бойко', 'Коваль', 'Лисенко', 'Руденко', 'Савченко', 'Петренко',
+              'Мороз', 'Гончаренко', 'Кравчук', 'Їжакевич', 'Ґудзенко']
+CITIES = ['Київ', 'Харків', 'Одеса', 'Дніпро', 'Львів', 'Запоріжжя', 'Вінниця', 'Полтава', 'Чернігів',
+          'Івано-Франківськ', 'Ужгород', 'Рівне']
+STREETS = ['Шевченка', 'Франка', 'Лесі Українки', 'Соборна', 'Грушевського', 'Садова', 'Миру']
+DOMAINS = ['example.com', 'ukr.net', 'i.ua', 'gmail.com', 'meta.ua']
+OPERATORS = ['050', '063', '066', '067', '068', '073', '093', '095', '096', '097', '098', '099']
+# Формати, які приймає ContactManager.is_valid_phone
+PHONE_FORMATS = [
+    lambda code, number: f'{code}{number}',
+    lambda code, number: f'+38{code}{number}',
+    lambda code, number: f'{code}-{number[:3]}-{number[3:5]}-{number[5:]}',
+    lambda code, number: f'{code} {number[:3]} {number[3:5]} {number[5:]}',
+    lambda code, number: f'+380 {code[1:]} {number[:3]} {number[3:]}',
+    lambda code, number: f'{code}.{number[:3]}.{number[3:]}',
+]
+NOTE_WORDS = ['зустріч', 'купити', 'молоко', 'хліб', 'подзвонити', 'лікар', 'проєкт', 'звіт', 'квитки',
+              'відпустка', 'ремонт', 'рахунок', 'день', 'народження', 'подарунок', 'книга', 'тренування',
+              'нарада', 'документи', 'паспорт', 'машина', 'сервіс', 'оплатити', 'інтернет', 'школа']
+TAGS = ['#робота', '#дім', '#покупки', '#здоров\'я', '#сім\'я', '#фінанси', '#подорожі', '#навчання',
+        '#спорт', '#ідеї', '#терміново', '#авто']
+KNOWN_EXTENSIONS = ['jpg', 'jpeg', 'png', 'svg', 'avi', 'mp4', 'mov', 'mkv', 'doc', 'docx', 'txt', 'pdf',
+                    'xlsx', 'pptx', 'mp3', 'ogg', 'wav', 'amr']
+OTHER_EXTENSIONS = ['py', 'csv', 'json', 'log', 'ini', 'bin', 'dat', '']
+FILE_STEMS = ['фото', 'звіт', 'договір', 'відео', 'пісня', 'рахунок', 'скан', 'нотатки', 'презентація',
+              'photo', 'report', 'IMG', 'backup', 'Копія документа']
+
+
+def phone_number(index, rng):
+    """
+    Телефон у випадковому з допустимих форматів. Номер однозначно визначається index,
+    тож телефони не повторюються (без урахування формату) до 10^7 контактів.
+    """
+    code = OPERATORS[index % len(OPERATORS)]
+    number = f'{index // len(OPERATORS):07d}'
+    return rng.choice(PHONE_FORMATS)(code, number)
+
+
+def contact_records(count, seed=0):
+    """
+    Генерує контакти з кириличними іменами, адресами та днями народження.
+    Args:
+        count (int): Кількість контактів.
+        seed (int, optional): Зерно генератора випадкових чисел.
+    Yields:
+        SimpleNamespace: Запис з полями id, name, address, phone, email, birthday.
+    """
+    rng = random.Random(seed)
+    trans = FolderOrganizer().TRANS
+    first_day = date(1950, 1, 1).toordinal()
+    days = date(2010, 12, 31).toordinal() - first_day
+    for index in range(count):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        yield SimpleNamespace(
+            id=index + 1,
+            name=f'{first} {last}',
+            address=f'м. {rng.choice(CITIES)}, вул. {rng.choice(STREETS)}, {rng.randint(1, 200)}',
+            phone=phone_number(index, rng),
+            email=f"{last.translate(trans).lower()}.{first.translate(trans).lower()}{index}@{rng.choice(DOMAINS)}",
+            birthday=date.fromordinal(first_day + rng.randrange(days)),
+        )
+
+
+def write_contacts(file_path, count, seed=0):
+    """
+    Записує книгу контактів одним знімком, як її зберігає ContactManager.dump.
+    """
+    storage = ContactJournalStorage(file_path)
+    # compact проходить список двічі (знімок і двійковий кеш), тож генератор не підходить
+    storage.compact(list(contact_records(count, seed)))
+    storage.close()
+
+
+def note_records(count, seed=0):
+    """
+    Генерує нотатки з 4-12 слів та 0-4 тегами. Частота тегів нерівномірна
+    (перші теги трапляються значно частіше), як у реальних нотатках.
+    Yields:
+        SimpleNamespace: Запис з полями text і tags.
+    """
+    rng = random.Random(seed)
+    weights = [1 / (rank + 1) for rank in range(len(TAGS))]
+    for index in range(count):
+        words = rng.choices(NOTE_WORDS, k=rng.randint(4, 12))
+        tags = sorted(set(rng.choices(TAGS, weights, k=rng.randint(0, 4))))
+        yield SimpleNamespace(text=f"{' '.join(words).capitalize()} {index}", tags=tags)
+
+
+def write_notes(file_path, count, seed=0):
+    CsvNotesStorage(file_path).save(list(note_records(count, seed)))
+
+
+def make_tree(root, files, seed=0, depth=3, fanout=4, duplicate_ratio=0.05):
+    """
+    Створює дерево папок з файлами різних розширень (відомих сортувальнику та інших),
+    кириличними і латинськими назвами та частиною однакових за вмістом файлів.
+    Args:
+        root (str): Папка, в якій створюється дерево.
+        files (int): Кількість файлів.
+        seed (int, optional): Зерно генератора випадкових чисел.
+        depth (int, optional): Глибина вкладених папок.
+        fanout (int, optional): Кількість вкладених папок на кожному рівні.
+        duplicate_ratio (float, optional): Частка файлів, що повторюють вміст іншого файлу.
+    Returns:
+        int: Загальний розмір створених файлів, байти.
+    """
+    rng = random.Random(seed)
+    folders = [root]
+    level = [root]
+    for _ in range(depth):
+        level = [os.path.join(parent, f'папка_{index}') for parent in level for index in range(fanout)]
+        folders.extend(level)
+    for folder in folders:
+        os.makedirs(folder, exist_ok=True)
+
+    total = 0
+    contents = []
+    for index in range(files):
+        extension = rng.choice(KNOWN_EXTENSIONS if rng.random() < 0.8 else OTHER_EXTENSIONS)
+        name = f'{rng.choice(FILE_STEMS)} {index}' + (f'.{extension}' if extension else '')
+        if contents and rng.random() < duplicate_ratio:
+            data = rng.choice(contents)
+        else:
+            data = rng.randbytes(rng.randint(16, 4096))
+            if len(contents) < 1000:
+                contents.append(data)
+        with open(os.path.join(rng.choice(folders), name), 'wb') as file:
+            file.write(data)
+        total += len(data)
+    return total
@@ -0,0 +1,182 @@
+import heapq
+import itertools
+import threading
+import time
+from datetime import date, datetime, timedelta, time as day_time
+from lazy_console import LazyConsole
+from metrics import metrics
+
+console = LazyConsole()
+
+
+class BirthdayReminder:
+    """
+    Фонові нагадування про дні народження.
+
+    Найближче нагадування кожного контакту зберігається в мінімальній купі за часом спрацювання.
+    Додавання, редагування і видалення контакту коштують O(log n): старий запис купи лише
+    позначається скасованим, а новий додається. Фоновий потік спить до найближчого нагадування
+    (або до зміни, яка його випереджає) і не переглядає книгу, поки нічого не сталося.
+    Після спрацювання контакт планується на наступний рік.
+    """
+
+    # Потік прокидається щонайменше раз на годину: очікування рахується за монотонним годинником,
+    # а нагадування прив'язані до календаря, тож переведення системного годинника не загубить їх
+    MAX_WAIT = 3600.0
+
+    def __init__(self, next_birthday, on_remind=None, days_before=0, at=day_time(9, 0), name='birthday-reminder'):
+        """
+        Args:
+            next_birthday (callable): Функція (контакт, дата) -> дата найближчого дня народження
+                не раніше вказаної дати, наприклад ContactManager.get_next_birthday.
+            on_remind (callable, optional): Обробник (контакт, дата дня народження). Викликається
+                у фоновому потоці. За замовчуванням - повідомлення в консоль.
+            days_before (int, optional): За скільки днів нагадувати. За замовчуванням - у сам день.
+            at (datetime.time, optional): Час нагадування. За замовчуванням - 9:00.
+            name (str, optional): Назва фонового потоку.
+        """
+        self.next_birthday = next_birthday
+        self.on_remind = on_remind or self.print_reminder
+        self.days_before = days_before
+        self.at = at
+        self.name = name
+        # Записи купи: [час спрацювання, порядковий номер, контакт, дата дня народження, активний]
+        self._heap = []
+        self._entries = {}
+        self._cancelled = 0
+        self._counter = itertools.count()
+        self._timestamps = {}
+        self._state = threading.Condition()
+        self._closed = False
+        self._thread = None
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _entry(self, contact, today):
+        birthday = self.next_birthday(contact, today)
+        # Різних дат у книзі не більше кількох сотень, тож час нагадування рахується раз на дату
+        remind_at = self._timestamps.get(birthday)
+        if remind_at is None:
+            remind_at = datetime.combine(birthday - timedelta(days=self.days_before), self.at).timestamp()
+            self._timestamps[birthday] = remind_at
+        return [remind_at, next(self._counter), contact, birthday, True]
+
+    def rebuild(self, contacts, today=None):
+        """
+        Планує нагадування для всієї книги контактів заново за O(n).
+        Args:
+            contacts (iterable): Контакти.
+            today (datetime.date, optional): Поточна дата. За замовчуванням - сьогодні.
+        """
+        today = today or date.today()
+        entries = {contact.id: self._entry(contact, today) for contact in contacts}
+        heap = list(entries.values())
+        heapq.heapify(heap)
+        with self._state:
+            self._entries = entries
+            self._heap = heap
+            self._cancelled = 0
+            self._state.notify()
+
+    def schedule(self, contact, today=None):
+        """
+        Планує (або переплановує після редагування) нагадування для контакту.
+        """
+        entry = self._entry(contact, today or date.today())
+        with self._state:
+            self._cancel(contact.id)
+            self._entries[contact.id] = entry
+            heapq.heappush(self._heap, entry)
+            # Потік будиться, лише якщо нове нагадування стало найближчим
+            if self._heap[0] is entry:
+                self._state.notify()
+
+    def cancel(self, contact_id):
+        """
+        Скасовує нагадування для контакту (наприклад, після видалення).
+        """
+        with self._state:
+            self._cancel(contact_id)
+
+    def _cancel(self, contact_id):
+        entry = self._entries.pop(contact_id, None)
+        if entry is None:
+            return
+        entry[-1] = False
+        self._cancelled += 1
+        # Скасовані записи видаляються з купи разом, коли їх стає більше половини
+        if self._cancelled > 1024 and self._cancelled * 2 > len(self._heap):
+            self._heap = [item for item in self._heap if item[-1]]
+            heapq.heapify(self._heap)
+            self._cancelled = 0
+
+    def upcoming(self, limit=10):
+        """
+        Returns:
+            list: Пари (контакт, дата дня народження) для найближчих limit нагадувань.
+        """
+        with self._state:
+            entries = heapq.nsmallest(limit, self._entries.values())
+        return [(contact, birthday) for _, _, contact, birthday, _ in entries]
+
+    def _due(self, now):
+        """
+        Знімає з купи нагадування, час яких настав, і планує ці контакти на наступний рік.
+        Викликається під self._state.
+        """
+        due = []
+        while self._heap and (not self._heap[0][-1] or self._heap[0][0] <= now):
+            entry = heapq.heappop(self._heap)
+            if not entry[-1]:
+                self._cancelled -= 1
+                continue
+            _, _, contact, birthday, _ = entry
+            due.append((contact, birthday))
+            following = self._entry(contact, birthday + timedelta(days=1))
+            self._entries[contact.id] = following
+            heapq.heappush(self._heap, following)
+        return due
+
+    def start(self):
+        """
+        Запускає фоновий потік нагадувань.
+        """
+        with self._state:
+            if self._thread is None and not self._closed:
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._state:
+                if self._closed:
+                    return
+                due = self._due(time.time())
+                if not due:
+                    timeout = self._heap[0][0] - time.time() if self._heap else None
+                    self._state.wait(self.MAX_WAIT if timeout is None else min(timeout, self.MAX_WAIT))
+                    continue
+            # Обробники викликаються поза блокуванням: зміни книги під час нагадування не чекають
+            for contact, birthday in due:
+                metrics.add('reminders', 'birthday')
+                try:
+                    self.on_remind(contact, birthday)
+                except Exception as error:
+                    console.print(f"[bold red]Помилка:[/bold red] Нагадування для {contact.name} не виконано: {error}")
+
+    def close(self):
+        """
+        Зупиняє фоновий потік.
+        """
+        with self._state:
+            self._closed = True
+            self._state.notify()
+
+    @staticmethod
+    def print_reminder(contact, birthday):
+        days = (birthday - date.today()).days
+        when = 'сьогодні' if days == 0 else 'завтра' if days == 1 else f"через {days} дн. ({birthday.strftime('%d-%m')})"
+        age = birthday.year - contact.birthday.year
+        console.print(f"\n[bold magenta]Нагадування:[/bold magenta] {contact.name} святкує день народження "
+                      f"{when} - виповнюється {age}.")
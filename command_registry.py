@@ -0,0 +1,80 @@
+import re
+
+# Слова команди: літери, цифри та апостроф (у командах на кшталт "ім'я")
+WORD = re.compile(r"[\w'’]+")
+
+
+class Command:
+    """
+    Зареєстрована команда помічника.
+    """
+
+    __slots__ = ('name', 'handler', 'hint', 'batch')
+
+    def __init__(self, name, handler, hint=None, batch=None):
+        """
+        Args:
+            name (str): Назва команди, наприклад 'додати контакт'.
+            handler (callable): handler(args) для інтерактивного режиму.
+            hint (str, optional): Підказка, яка виводиться перед виконанням команди.
+            batch (callable, optional): batch(args) для пакетного режиму; None - команда лише інтерактивна.
+        """
+        self.name = name
+        self.handler = handler
+        self.hint = hint
+        self.batch = batch
+
+
+class CommandRegistry:
+    """
+    Реєстр команд у вигляді префіксного дерева за словами. Дерево будується один раз,
+    а розпізнавання введеного рядка проходить його слова один раз, замість перевірки
+    кожної команди ланцюжком if/elif.
+    """
+
+    def __init__(self):
+        self._trie = {}
+        self.commands = {}
+
+    def register(self, name, handler, hint=None, batch=None):
+        """
+        Додає команду до реєстру.
+        Returns:
+            Command: Зареєстрована команда.
+        """
+        command = Command(name, handler, hint, batch)
+        node = self._trie
+        for word in name.lower().split():
+            node = node.setdefault(word, {})
+        node[None] = command
+        self.commands[name] = command
+        return command
+
+    def names(self):
+        return list(self.commands)
+
+    def match(self, text):
+        """
+        Знаходить першу команду, що міститься у введеному рядку (як і раніше, команду можна
+        оточити іншими словами), та повертає текст після неї як аргументи.
+        Args:
+            text (str): Введений рядок.
+        Returns:
+            tuple: (Command, аргументи) або (None, text), якщо команду не розпізнано.
+        """
+        words = list(WORD.finditer(text))
+        lowered = [word.group().lower() for word in words]
+        for start in range(len(words)):
+            node = self._trie
+            found = None
+            for position in range(start, len(words)):
+                node = node.get(lowered[position])
+                if node is None:
+                    break
+                if None in node:
+                    # Найдовша команда з цього слова виграє
+                    found = (node[None], words[position].end())
+            if found:
+                command, end = found
+                return command, text[end:].lstrip(" \t:,").rstrip()
+        return None, text
@@ -0,0 +1,518 @@
+import re
+import bisect
+import calendar
+import heapq
+import operator
+from array import array
+from datetime import date, timedelta
+from metrics import metrics
+from transliteration import transliterate
+
+_NON_DIGITS = re.compile(r'\D')
+
+
+def normalize_phone(phone):
+    """
+    Нормалізує номер телефону до формату, близького до E.164: лише цифри з '+' на початку.
+    Національні номери (0501234567) доповнюються кодом країни 38.
+    Args:
+        phone (str): Номер телефону у будь-якому з допустимих форматів.
+    Returns:
+        str: Нормалізований номер або порожній рядок, якщо цифр немає.
+    """
+    digits = _NON_DIGITS.sub('', phone)
+    if not digits:
+        return ''
+    if len(digits) == 10 and digits.startswith('0'):
+        digits = '38' + digits
+    return '+' + digits
+
+
+def normalize_email(email):
+    """
+    Нормалізує адресу електронної пошти для порівняння.
+    Args:
+        email (str): Адреса електронної пошти.
+    Returns:
+        str: Адреса без пробілів по краях у нижньому регістрі.
+    """
+    return email.strip().lower()
+
+
+_TOKEN = re.compile(r'\w+')
+_PHONE_QUERY = re.compile(r'[\d\s()+.-]*\d[\d\s()+.-]*')
+
+
+# Латиниця після таблиці транслітерації сортувальника і латиниця, якою люди пишуть українські імена,
+# розходяться (и - i, а не y; ж - j, а не zh; г - g, а не h), тож обидві зводяться до спільного
+# грубого написання. Сполучення sh, ch, sch лишаються як є, щоб h з них не стала g.
+_LATIN_FOLD = re.compile(r'shch|sch|sh|ch|kh|zh|h|y|j')
+_LATIN_FOLDS = {'shch': 'sch', 'sch': 'sch', 'sh': 'sh', 'ch': 'ch', 'kh': 'g', 'zh': 'i', 'h': 'g', 'y': 'i', 'j': 'i'}
+
+
+def latin_key(token):
+    """
+    Зводить слово кирилицею або латиницею до спільного латинського написання:
+    'Миколай' і 'Mykolai' дають 'mikolai', 'Поліщук' - 'polieschuk', 'Polishchuk' - 'polischuk'.
+    Args:
+        token (str): Слово у нижньому регістрі (casefold).
+    Returns:
+        str: Транслітероване та спрощене написання.
+    """
+    return _LATIN_FOLD.sub(lambda match: _LATIN_FOLDS[match.group()], transliterate(token))
+
+
+def edit_distance(first, second, limit):
+    """
+    Відстань Дамерау-Левенштейна (з перестановкою сусідніх літер), обмежена limit:
+    обчислення зупиняється, щойно відстань гарантовано більша.
+    Returns:
+        int: Відстань або limit + 1, якщо вона більша за limit.
+    """
+    if abs(len(first) - len(second)) > limit:
+        return limit + 1
+    before_previous, previous = None, list(range(len(second) + 1))
+    for i in range(1, len(first) + 1):
+        row = [i] + [0] * len(second)
+        for j in range(1, len(second) + 1):
+            row[j] = min(previous[j] + 1, row[j - 1] + 1, previous[j - 1] + (first[i - 1] != second[j - 1]))
+            if i > 1 and j > 1 and first[i - 1] == second[j - 2] and first[i - 2] == second[j - 1]:
+                row[j] = min(row[j], before_previous[j - 2] + 1)
+        if min(row) > limit:
+            return limit + 1
+        before_previous, previous = previous, row
+    return previous[-1] if previous[-1] <= limit else limit + 1
+
+
+class FuzzyNameIndex:
+    """
+    Нечіткий пошук контактів за словами імені з урахуванням помилок і транслітерації.
+
+    Кожне слово імені індексується у двох написаннях: як є (кирилицею) і латиницею (latin_key),
+    тож 'Mykola' знаходить 'Миколай', а 'Шевченко' - 'Shevchenko'. Помилки до MAX_DISTANCE
+    правок шукаються за схемою SymSpell: для кожного слова словника заздалегідь зберігаються
+    всі варіанти з видаленими літерами (лише з перших PREFIX_LENGTH літер), і запит перевіряє
+    тільки слова зі спільними варіантами, а не весь словник.
+    """
+
+    MAX_DISTANCE = 2
+    PREFIX_LENGTH = 7
+
+    def __init__(self):
+        # слово -> ідентифікатори контактів; варіант з видаленими літерами -> слова
+        self._postings = {}
+        self._deletes = {}
+        self._names = {}
+
+    @staticmethod
+    def _forms(name):
+        forms = set()
+        for token in _TOKEN.findall(name):
+            forms.add(token)
+            forms.add(latin_key(token))
+        forms.discard('')
+        return forms
+
+    @classmethod
+    def _variants(cls, term):
+        """
+        Returns:
+            set: Префікс слова та всі його варіанти з видаленими до MAX_DISTANCE літерами.
+        """
+        level = {term[:cls.PREFIX_LENGTH]}
+        variants = set(level)
+        for _ in range(cls.MAX_DISTANCE):
+            level = {word[:i] + word[i + 1:] for word in level if len(word) > 1 for i in range(len(word))}
+            variants |= level
+        return variants
+
+    @staticmethod
+    def max_distance(term):
+        # Короткі слова з двома помилками збігаються майже з чим завгодно
+        return 0 if len(term) <= 2 else 1 if len(term) <= 4 else 2
+
+    def build(self, contacts):
+        self._postings = {}
+        self._deletes = {}
+        self._names = {}
+        for contact in contacts:
+            self.add(contact)
+
+    def add(self, contact):
+        name = contact.name.casefold()
+        self._names[contact.id] = name
+        for term in self._forms(name):
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = set()
+                for variant in self._variants(term):
+                    self._deletes.setdefault(variant, set()).add(term)
+            postings.add(contact.id)
+
+    def remove(self, contact_id):
+        name = self._names.pop(contact_id, None)
+        if name is None:
+            return
+        for term in self._forms(name):
+            postings = self._postings.get(term)
+            if postings is None:
+                continue
+            postings.discard(contact_id)
+            if not postings:
+                del self._postings[term]
+                for variant in self._variants(term):
+                    terms = self._deletes.get(variant)
+                    if terms is not None:
+                        terms.discard(term)
+                        if not terms:
+                            del self._deletes[variant]
+
+    def _matches(self, token):
+        """
+        Returns:
+            dict: Слова словника, близькі до слова запиту в будь-якому з написань, -> відстань.
+        """
+        matches = {}
+        for form in {token, latin_key(token)} - {''}:
+            limit = self.max_distance(form)
+            candidates = set()
+            prefix = form[:self.PREFIX_LENGTH]
+            for variant in self._variants(form):
+                # Варіанти, коротші за префікс більш ніж на limit, до слова запиту не ведуть
+                if len(prefix) - len(variant) <= limit:
+                    candidates |= self._deletes.get(variant, set())
+            for term in candidates:
+                distance = edit_distance(form, term, limit)
+                if distance <= limit and distance < matches.get(term, limit + 1):
+                    matches[term] = distance
+        return matches
+
+    def search(self, query, limit=10):
+        """
+        Шукає контакти, слова імені яких близькі до слів запиту.
+        Args:
+            query (str): Пошуковий запит кирилицею або латиницею, можливо з помилками.
+            limit (int, optional): Кількість результатів. За замовчуванням - 10.
+        Returns:
+            list: Пари (ідентифікатор контакту, сумарна кількість правок), найкращі спершу:
+            більше збіглих слів запиту, менше правок, потім за ім'ям.
+        """
+        scores = {}
+        for token in set(_TOKEN.findall(query.casefold())):
+            best = {}
+            for term, distance in self._matches(token).items():
+                for contact_id in self._postings[term]:
+                    if distance < best.get(contact_id, self.MAX_DISTANCE + 1):
+                        best[contact_id] = distance
+            for contact_id, distance in best.items():
+                score = scores.get(contact_id)
+                scores[contact_id] = (score[0] - 1, score[1] + distance) if score else (-1, distance)
+        metrics.records_scanned('contacts.fuzzy_search', len(scores))
+        ranked = heapq.nsmallest(limit, scores.items(), key=lambda item: (item[1], self._names[item[0]]))
+        return [(contact_id, distance) for contact_id, (_, distance) in ranked]
+
+
+def search_fields(name, address, phone, email):
+    """
+    Returns:
+        tuple: Поля контакту для пошуку за підрядком: без регістру, телефон ще й лише цифрами.
+    """
+    # Ім'я завжди перше - за ним рахується рейтинг результатів
+    return name.casefold(), address.casefold(), phone.casefold(), _NON_DIGITS.sub('', phone), email.casefold()
+
+
+def normalize_query(query):
+    """
+    Готує пошуковий запит: без пробілів по краях, без регістру; номер телефону - лише цифри,
+    щоб шукати його незалежно від роздільників.
+    """
+    query = query.strip().casefold()
+    if _PHONE_QUERY.fullmatch(query):
+        query = _NON_DIGITS.sub('', query)
+    return query
+
+
+def rank_contacts(query, contacts):
+    """
+    Впорядковує контакти-кандидати за релевантністю так само, як ContactSearchIndex.search,
+    і відкидає ті, що не відповідають запиту. Використовується, коли кандидатів відібрала база.
+    Args:
+        query (str): Запит, підготовлений normalize_query.
+        contacts (iterable): Контакти-кандидати.
+    Returns:
+        list: Контакти, найрелевантніші спершу.
+    """
+    ranked = []
+    for contact in contacts:
+        texts = ContactSearchIndex.fields(contact)
+        rank = ContactSearchIndex.rank(query, texts)
+        if rank is not None:
+            ranked.append((rank, texts[0], contact.id, contact))
+    ranked.sort(key=lambda item: item[:3])
+    return [contact for *_, contact in ranked]
+
+
+class ContactSearchIndex:
+    """
+    Пошуковий індекс книги контактів за ім'ям, адресою, телефоном та поштою.
+
+    Складається з полів контактів без регістру та двох інвертованих індексів. Запит від трьох
+    символів перетинає множини контактів своїх триграм. Запит з одного-двох символів бере
+    готовий список контактів з таким підрядком (одиночні символи та пари символів). Цей індекс
+    будується при першому короткому запиті, а не разом з книгою. Різних коротких n-грам мало,
+    а списки в них довгі, тож вони зберігаються відсортованими масивами id, а не множинами.
+    Перевіряються лише кандидати, а не вся книга. Нечіткий пошук за ім'ям (з помилками
+    та латиницею) - FuzzyNameIndex.
+    """
+
+    def __init__(self):
+        self._texts = {}
+        self._trigrams = {}
+        # Індекс коротких n-грам: None, доки не було короткого запиту
+        self._short = None
+        self._fuzzy = FuzzyNameIndex()
+
+    def __len__(self):
+        return len(self._texts)
+
+    @staticmethod
+    def fields(contact):
+        return search_fields(contact.name, contact.address, contact.phone, contact.email)
+
+    @staticmethod
+    def _field_trigrams(texts):
+        return {text[i:i + 3] for text in texts for i in range(len(text) - 2)}
+
+    @staticmethod
+    def _field_short_grams(texts):
+        grams = set()
+        for text in texts:
+            grams.update(text)
+            grams.update(map(operator.add, text, text[1:]))
+        return grams
+
+    def _build_short(self):
+        short = {}
+        for contact_id, texts in self._texts.items():
+            for gram in self._field_short_grams(texts):
+                short.setdefault(gram, []).append(contact_id)
+        # Контакти не обов'язково йдуть за зростанням id (журнал, імпорт), тож масиви сортуються один раз
+        self._short = {gram: array('I', sorted(ids)) for gram, ids in short.items()}
+
+    def build(self, contacts):
+        """
+        Будує індекс заново для всієї книги контактів одним проходом.
+        Args:
+            contacts (iterable): Контакти з атрибутом id.
+        """
+        self._texts = {}
+        self._trigrams = {}
+        self._short = None
+        self._fuzzy = FuzzyNameIndex()
+        for contact in contacts:
+            texts = self.fields(contact)
+            self._texts[contact.id] = texts
+            for trigram in self._field_trigrams(texts):
+                self._trigrams.setdefault(trigram, set()).add(contact.id)
+            self._fuzzy.add(contact)
+
+    def add(self, contact):
+        texts = self.fields(contact)
+        self._texts[contact.id] = texts
+        for trigram in self._field_trigrams(texts):
+            self._trigrams.setdefault(trigram, set()).add(contact.id)
+        for gram in self._field_short_grams(texts) if self._short is not None else ():
+            ids = self._short.get(gram)
+            if ids is None:
+                self._short[gram] = array('I', (contact.id,))
+            elif ids[-1] < contact.id:
+                # Новий контакт має найбільший id: дописування в кінець
+                ids.append(contact.id)
+            else:
+                bisect.insort(ids, contact.id)
+        self._fuzzy.add(contact)
+
+    def remove(self, contact_id):
+        texts = self._texts.pop(contact_id, None)
+        if texts is None:
+            return
+        for trigram in self._field_trigrams(texts):
+            postings = self._trigrams.get(trigram)
+            if postings is not None:
+                postings.discard(contact_id)
+                if not postings:
+                    del self._trigrams[trigram]
+        for gram in self._field_short_grams(texts) if self._short is not None else ():
+            ids = self._short.get(gram)
+            if ids is None:
+                continue
+            position = bisect.bisect_left(ids, contact_id)
+            if position < len(ids) and ids[position] == contact_id:
+                del ids[position]
+                if not ids:
+                    del self._short[gram]
+        self._fuzzy.remove(contact_id)
+
+    def _substring_candidates(self, query):
+        if len(query) < 3:
+            if self._short is None:
+                self._build_short()
+            # Список короткої n-грами і є точним переліком контактів з цим підрядком
+            ids = self._short.get(query)
+            return ids.tolist() if ids is not None else []
+        postings = []
+        for trigram in {query[i:i + 3] for i in range(len(query) - 2)}:
+            posting = self._trigrams.get(trigram)
+            if not posting:
+                return set()
+            postings.append(posting)
+        postings.sort(key=len)
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            candidates &= posting
+            if not candidates:
+                break
+        return candidates
+
+    @staticmethod
+    def rank(query, texts):
+        """
+        Оцінює збіг запиту з полями контакту (менше - краще) або повертає None.
+        """
+        name = texts[0]
+        if name == query:
+            return 0
+        if name.startswith(query):
+            return 1
+        if any(token.startswith(query) for token in _TOKEN.findall(name)):
+            return 2
+        if query in name:
+            return 3
+        if any(text.startswith(query) for text in texts[1:]):
+            return 4
+        if any(query in text for text in texts[1:]):
+            return 5
+        return None
+
+    def search(self, query):
+        """
+        Шукає контакти за підрядком у імені, адресі, телефоні чи пошті.
+        Args:
+            query (str): Пошуковий запит.
+        Returns:
+            list: Ідентифікатори знайдених контактів, впорядковані за релевантністю та ім'ям.
+        """
+        query = normalize_query(query)
+        if not query:
+            return []
+        candidates = self._substring_candidates(query)
+        metrics.records_scanned('contacts.search', len(candidates))
+        ranked = []
+        for contact_id in candidates:
+            texts = self._texts[contact_id]
+            rank = self.rank(query, texts)
+            if rank is not None:
+                ranked.append((rank, texts[0], contact_id))
+        ranked.sort()
+        return [contact_id for _, _, contact_id in ranked]
+
+    def fuzzy_search(self, query, limit=10):
+        """
+        Нечіткий пошук за ім'ям, див. FuzzyNameIndex.search.
+        """
+        return self._fuzzy.search(query, limit)
+
+
+def birthday_in_year(birthday, year):
+    """
+    Повертає дату дня народження у вказаному році.
+    Народжені 29 лютого у невисокосні роки святкують 28 лютого.
+    Args:
+        birthday (datetime.date): Дата народження.
+        year (int): Рік.
+    Returns:
+        datetime.date: Дата дня народження у цьому році.
+    """
+    if birthday.month == 2 and birthday.day == 29 and not calendar.isleap(year):
+        return date(year, 2, 28)
+    return birthday.replace(year=year)
+
+
+def next_birthday(birthday, today):
+    """
+    Повертає дату найближчого дня народження, починаючи з сьогоднішнього дня.
+    Args:
+        birthday (datetime.date): Дата народження.
+        today (datetime.date): Поточна дата.
+    Returns:
+        datetime.date: Дата наступного дня народження.
+    """
+    candidate = birthday_in_year(birthday, today.year)
+    if candidate < today:
+        candidate = birthday_in_year(birthday, today.year + 1)
+    return candidate
+
+
+class BirthdayIndex:
+    """
+    Календарний індекс днів народження: 366 кошиків за днем року (рахуючи 29 лютого).
+    Запит на наступні N днів переглядає не більше N кошиків, незалежно від розміру книги.
+    """
+
+    DAYS = 366
+
+    def __init__(self):
+        self._buckets = [set() for _ in range(self.DAYS)]
+        self._days = {}
+
+    @staticmethod
+    def _day_of_year(month, day):
+        # 2000 - високосний рік, тож 29 лютого має власний кошик
+        return date(2000, month, day).timetuple().tm_yday - 1
+
+    def build(self, contacts):
+        self._buckets = [set() for _ in range(self.DAYS)]
+        self._days = {}
+        for contact in contacts:
+            self.add(contact)
+
+    def add(self, contact):
+        day = self._day_of_year(contact.birthday.month, contact.birthday.day)
+        self._buckets[day].add(contact.id)
+        self._days[contact.id] = day
+
+    def remove(self, contact_id):
+        day = self._days.pop(contact_id, None)
+        if day is not None:
+            self._buckets[day].discard(contact_id)
+
+    def upcoming(self, today, days):
+        """
+        Знаходить дні народження у вікні (today, today + days].
+        Args:
+            today (datetime.date): Поточна дата.
+            days (int): Розмір вікна в днях.
+        Returns:
+            list: Пари (дата дня народження, id контакту), впорядковані за датою.
+        """
+        # Сьогоднішні дні народження не входять у вікно, як і раніше
+        seen = set(self._buckets_for(today))
+        result = []
+        for offset in range(1, min(days, self.DAYS) + 1):
+            current = today + timedelta(days=offset)
+            for day in self._buckets_for(current):
+                if day in seen:
+                    continue
+                seen.add(day)
+                result.extend((current, contact_id) for contact_id in self._buckets[day])
+        metrics.records_scanned('contacts.birthdays', len(result))
+        return result
+
+    def _buckets_for(self, current):
+        """
+        Повертає кошики, чиї дні народження святкуються у вказану дату.
+        """
+        buckets = [self._day_of_year(current.month, current.day)]
+        if current.month == 2 and current.day == 28 and not calendar.isleap(current.year):
+            buckets.append(self._day_of_year(2, 29))
+        return buckets
@@ -1,67 +1,460 @@
 import os
 import csv
 import re
-from rich.console import Console
+import sys
+import bisect
+import threading
+from collections import namedtuple
+from contextlib import contextmanager, nullcontext
+from itertools import islice
 from datetime import datetime, date, timedelta
-from rich.table import Table
-from rich.text import Text
-from dateutil import parser
+from contact_storage import ContactJournalStorage, SqliteContactStorage
+from autosave import Autosaver
+from lazy_console import LazyConsole
+from table_view import PagedTable
+from metrics import metrics
+from contact_index import (normalize_phone, normalize_email, normalize_query, rank_contacts, next_birthday,
+                           ContactSearchIndex, FuzzyNameIndex, BirthdayIndex)
 
-console = Console()
+console = LazyConsole()
+
+# Допустимі формати телефону: +380501234567, 050-123-45-67, 0501234567, 050 123 45 67, 0989898989
+PHONE_PATTERN = re.compile(r'^\+?\d{1,3}?[-.\s]?\(?\d{1,4}\)?[-.\s]?\d{1,4}[-.\s]?\d{1,9}$')
+EMAIL_PATTERN = re.compile(r'^[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+$')
 
 class Contact:
-    def __init__(self, name, address, phone, email, birthday):
+    # Без __dict__ на кожен екземпляр: для великих книг контактів це суттєва економія пам'яті
+    __slots__ = ('id', 'name', 'address', 'phone', 'email', '_birthday')
+
+    def __init__(self, name, address, phone, email, birthday, id=None):
+        self.id = id
         self.name = name
-        self.address = address
+        # Адреси (міста) часто повторюються, тому зберігаємо один спільний рядок
+        self.address = sys.intern(address)
         self.phone = phone
         self.email = email
         self.birthday = birthday
 
+    @property
+    def birthday(self):
+        return date.fromordinal(self._birthday)
+
+    @birthday.setter
+    def birthday(self, value):
+        # Дата народження зберігається як порядковий номер дня (int), а не об'єкт datetime.date
+        self._birthday = value.toordinal()
+
+
+# Незмінна копія полів контакту на момент зміни: її записує в журнал фоновий потік
+ContactRecord = namedtuple('ContactRecord', 'id name address phone email birthday')
+
 
 class ContactManager:
-    def __init__(self):
+    def __init__(self, file_path='addressbook.csv', storage=None, autosave_delay=1.0, history=None):
+        """
+        Args:
+            file_path (str, optional): Шлях до файлу книги контактів. За замовчуванням - 'addressbook.csv'.
+            storage (ContactStorage, optional): Сховище контактів. За замовчуванням - журнал поруч з file_path.
+            autosave_delay (float, optional): Період тиші перед фоновим збереженням змін, секунди.
+            history (UndoHistory, optional): Історія змін для скасування. За замовчуванням - без історії.
+        """
         self.contacts = []
+        self._by_id = {}
+        self._next_id = 1
+        # Індекси для перевірки дублікатів і точного пошуку за сталий час
+        self._phone_index = {}
+        self._email_index = {}
+        self._search_index = ContactSearchIndex()
+        self._search_index_ready = True
+        self._search_index_lock = threading.Lock()
+        self._birthday_index = BirthdayIndex()
+        # Фонові нагадування про дні народження (start_reminders), оновлюються разом з індексами
+        self.reminder = None
+        self.history = history
+        self.storage = storage or ContactJournalStorage(file_path)
+        self._loaded = threading.Event()
+        self._loaded.set()
+        # Після помилки завантаження книга лише для читання, щоб не перезаписати файл частковою книгою
+        self.read_only = False
+        self._batch_depth = 0
+        # Зміни, які ще не записані в журнал: їх записує фоновий потік після періоду тиші
+        self._pending = []
+        self._autosave = Autosaver(self._flush_pending, autosave_delay, name='contacts-autosave')
     
     def dump(self):
         """
-        Зберігає книгу контактів у файл CSV.
+        Зберігає повний знімок книги контактів у файл CSV та очищує журнал змін.
         """
-        with open('addressbook.csv', 'w', newline='\n', encoding='UTF-8') as fh:
-            field_names = ['name', 'address', 'phone', 'email', 'birthday']
-            writer = csv.DictWriter(fh, fieldnames=field_names)
-            writer.writeheader()
-            for contact in self.contacts:
-                writer.writerow({'name': contact.name, 'address': contact.address,
-                                 'phone': contact.phone, 'email': contact.email, 'birthday': contact.birthday.strftime('%d-%m-%Y')})
+        self.wait_loaded()
+        if self.read_only:
+            console.print("[yellow]Книга контактів відкрита лише для читання, знімок не збережено.[/yellow]")
+            return
+        with self._autosave.lock:
+            # Знімок містить усі зміни, тож незаписані зміни журналу більше не потрібні
+            self._pending = []
+            self._autosave.mark_clean()
+            self.storage.compact(self.contacts)
+
+    def flush(self):
+        """
+        Одразу записує зміни, які очікують на фонове збереження.
+        """
+        self._autosave.flush()
+
+    def _flush_pending(self):
+        """
+        Записує накопичені зміни в журнал одним записом і за потреби ущільнює журнал.
+        Викликається фоновим потоком Autosaver.
+        """
+        # Підміна списку атомарна: зміни, додані після неї, потраплять у наступне збереження
+        pending, self._pending = self._pending, []
+        if self.read_only:
+            return
+        if pending:
+            try:
+                self.storage.append_many(pending)
+            except BaseException:
+                # Незаписані зміни повертаються в чергу перед новішими: Autosaver повторить збереження
+                self._pending[:0] = pending
+                raise
+        if self.storage.needs_compaction(len(self.contacts)):
+            self.storage.compact(list(self.contacts))
 
-    def load(self):
+    def load(self, background=True, batch_size=5000):
         """
-        Завантажує книгу контактів з файлу CSV.
+        Завантажує книгу контактів зі знімка CSV і відтворює поверх нього журнал змін.
+        Перша порція записів читається одразу, решта файлу - у фоновому потоці, тож
+        програма стає інтерактивною, не чекаючи на розбір усієї книги.
+        Якщо книгу не вдалося дочитати, вона відкривається лише для читання: часткова книга
+        не зберігається і не перезаписує файл.
+        Args:
+            background (bool, optional): Дозавантажувати великі файли у фоні. За замовчуванням - True.
+            batch_size (int, optional): Кількість записів в одній порції. За замовчуванням - 5000.
         """
-        file_path = 'addressbook.csv'
-        if os.path.exists(file_path):
-            with open(file_path, newline='\n', encoding='UTF-8') as fh:
-                reader = csv.DictReader(fh)
-                for row in reader:
-                    name = row['name']
-                    address = row['address']
-                    phone = row['phone']
-                    email = row['email']
+        # Повторне завантаження замінює книгу, а не дописує ті самі контакти вдруге
+        self.wait_loaded()
+        self.flush()
+        self.read_only = False
+        self.contacts = []
+        self._by_id = {}
+        self._next_id = 1
+        self._snapshot_rows = 0
+        self._rebuild_indexes()
+        file_path = self.storage.file_path
+        if not self.storage.exists():
+            print(f"Файл '{file_path}' не знайдено. Спробуйте створити файл або перевірити шлях.")
+            return
 
-                    # Перетворення рядка дати у об'єкт datetime.date
-                    birthday_str = row['birthday']
-                    birthday = datetime.strptime(birthday_str, '%d-%m-%Y').date()
+        self._loaded.clear()
+        try:
+            journal = self._read_journal_state()
+            records = self.storage.read_snapshot()
+            more = self._load_batch(records, batch_size, journal)
+        except (OSError, ValueError, KeyError) as error:
+            self._load_failed(error)
+            self._loaded.set()
+            return
+        if background and more:
+            # Перша порція вже остаточна (журнал застосовано), тож її можна переглядати одразу
+            print(f"Завантажено перші {len(self.contacts)} контактів, решта книги завантажується у фоні.")
+            threading.Thread(target=self._finish_load, args=(records, batch_size, journal, True),
+                             daemon=True).start()
+            return
+        self._finish_load(records, batch_size, journal, False)
 
-                    new_contact = Contact(
-                        name, address, phone, email, birthday)
-                    self.contacts.append(new_contact)
+    def _read_journal_state(self):
+        """
+        Читає журнал змін і залишає для кожного контакту лише останню зміну: кожен запис
+        журналу містить усі поля контакту, тож це рівносильно послідовному відтворенню.
+        Returns:
+            dict: id контакту -> поля контакту або None, якщо контакт видалено.
+        """
+        journal = {}
+        for op, record in self.storage.read_journal():
+            contact_id = record['id']
+            self._next_id = max(self._next_id, contact_id + 1)
+            if op == 'delete':
+                journal[contact_id] = None
+            else:
+                journal[contact_id] = (record['name'], record['address'], record['phone'], record['email'],
+                                       self.storage.parse_birthday(record['birthday']))
+        return journal
+
+    def _load_batch(self, records, batch_size, journal):
+        """
+        Додає до книги одну порцію знімка з уже застосованими змінами журналу.
+        Returns:
+            bool: True, якщо у знімку, можливо, залишилися записи.
+        """
+        batch = list(islice(records, batch_size))
+        for contact_id, name, address, phone, email, birthday in batch:
+            self._snapshot_rows += 1
+            if contact_id is None:
+                # Старий знімок без колонки id: рядки нумеруються за порядком з 1, як і в сеансі,
+                # що писав журнал, а не після найбільшого id журналу
+                contact_id = self._snapshot_rows
+            self._next_id = max(self._next_id, contact_id + 1)
+            if contact_id in journal:
+                fields = journal.pop(contact_id)
+                if fields is None:
+                    continue
+                name, address, phone, email, birthday = fields
+            contact = Contact(name, address, phone, email, birthday, id=contact_id)
+            self._by_id[contact_id] = contact
+            self.contacts.append(contact)
+        return len(batch) == batch_size
 
+    def _finish_load(self, records, batch_size, journal, background):
+        """
+        Дочитує знімок порціями, додає контакти, створені після знімка, і будує індекси.
+        """
+        try:
+            while self._load_batch(records, batch_size, journal):
+                pass
+            # У журналі залишилися лише контакти, яких ще немає у знімку
+            for contact_id, fields in journal.items():
+                if fields is not None:
+                    contact = Contact(*fields, id=contact_id)
+                    self._by_id[contact_id] = contact
+                    self.contacts.append(contact)
+            self._rebuild_indexes()
+        except (OSError, ValueError, KeyError) as error:
+            self._load_failed(error)
+        else:
             if self.contacts:
-                print("Контакти успішно завантажені.")
+                print(f"Контакти успішно завантажені ({len(self.contacts)})." if background
+                      else "Контакти успішно завантажені.")
             else:
                 print("Не вдалося завантажити контакти або файл порожній.")
-        else:
-            print(f"Файл '{file_path}' не знайдено. Спробуйте створити файл або перевірити шлях.")
+        finally:
+            self._loaded.set()
+
+    def _load_failed(self, error):
+        """
+        Переводить книгу в режим лише для читання: збереження часткової книги
+        перезаписало б файл і знищило контакти, які не вдалося прочитати.
+        """
+        self.read_only = True
+        self._rebuild_indexes()
+        console.print(f"[bold red]Помилка:[/bold red] Не вдалося завантажити контакти: {error}")
+        console.print(f"[yellow]Книгу відкрито лише для читання, зміни не зберігатимуться, "
+                      f"щоб не перезаписати '{self.storage.file_path}'.[/yellow]")
+
+    def _check_writable(self):
+        """
+        Raises:
+            ValueError: Якщо книгу завантажено з помилкою і вона доступна лише для читання.
+        """
+        if self.read_only:
+            raise ValueError("Книга контактів відкрита лише для читання через помилку завантаження.")
+
+    def start_reminders(self, on_remind=None, days_before=0, at=None):
+        """
+        Запускає фонові нагадування про дні народження. Нагадування плануються за
+        get_next_birthday і оновлюються під час кожної зміни книги контактів.
+        Args:
+            on_remind (callable, optional): Обробник (контакт, дата дня народження). За замовчуванням - консоль.
+            days_before (int, optional): За скільки днів нагадувати. За замовчуванням - у сам день.
+            at (datetime.time, optional): Час нагадування. За замовчуванням - 9:00.
+        Returns:
+            BirthdayReminder: Планувальник нагадувань.
+        """
+        from birthday_reminder import BirthdayReminder
+
+        self.stop_reminders()
+        kwargs = {'at': at} if at is not None else {}
+        reminder = BirthdayReminder(self.get_next_birthday, on_remind, days_before, **kwargs)
+        self.reminder = reminder
+        # Під час фонового завантаження нагадування сплануються разом з індексами в _finish_load
+        if self._loaded.is_set():
+            reminder.rebuild(self.contacts)
+        reminder.start()
+        return reminder
+
+    def stop_reminders(self):
+        if self.reminder is not None:
+            self.reminder.close()
+            self.reminder = None
+
+    @staticmethod
+    def contact_state(contact):
+        """
+        Returns:
+            tuple: Незмінний знімок полів контакту для історії змін.
+        """
+        return (contact.name, contact.address, contact.phone, contact.email, contact._birthday)
+
+    def _record(self, contact_id, before, after):
+        if self.history is not None:
+            self.history.record(self, contact_id, before, after)
+
+    def _history_step(self, label):
+        return self.history.step(label) if self.history is not None else nullcontext()
+
+    def restore(self, changes):
+        """
+        Відновлює контакти до знімків з історії змін (скасування або повторення):
+        змінює поля, повертає видалені контакти на їхні місця і видаляє додані.
+        Список контактів перебудовується один раз на весь крок, тож скасування великого
+        імпорту коштує O(n), а не O(n) на кожен контакт.
+        Args:
+            changes (list): Пари (ідентифікатор контакту, знімок полів або None - контакту не має бути).
+        """
+        self.wait_loaded()
+        if len(changes) > self.INCREMENTAL_SEARCH_INDEX_LIMIT and self._search_index_ready:
+            # Як після великого імпорту: пошуковий індекс перебудується при першому пошуку
+            self._search_index = ContactSearchIndex()
+            self._search_index_ready = False
+        removed = set()
+        added = []
+        for contact_id, state in changes:
+            contact = self._by_id.get(contact_id)
+            if state is None:
+                if contact is not None:
+                    del self._by_id[contact_id]
+                    self._unindex_contact(contact)
+                    self._commit('delete', contact)
+                    removed.add(contact_id)
+                continue
+            name, address, phone, email, birthday = state
+            if contact is None:
+                contact = Contact(name, address, phone, email, date.fromordinal(birthday), id=contact_id)
+                self._by_id[contact_id] = contact
+                self._index_contact(contact)
+                self._commit('add', contact)
+                added.append(contact)
+                continue
+            self._unindex_contact(contact)
+            contact.name, contact.address, contact.phone, contact.email = name, sys.intern(address), phone, email
+            contact.birthday = date.fromordinal(birthday)
+            self._index_contact(contact)
+            self._commit('edit', contact)
+        if removed:
+            self.contacts = [contact for contact in self.contacts if contact.id not in removed]
+        if added:
+            # Контакти впорядковані за id, тож повернені контакти стають на свої місця
+            self.contacts.extend(added)
+            self.contacts.sort(key=lambda contact: contact.id)
+
+    def wait_loaded(self):
+        """
+        Чекає, доки фонове завантаження книги контактів завершиться.
+        """
+        self._loaded.wait()
+
+    def _rebuild_indexes(self):
+        """
+        Будує всі індекси книги контактів заново одним проходом.
+        """
+        self._phone_index = {}
+        self._email_index = {}
+        for contact in self.contacts:
+            phone_key = normalize_phone(contact.phone)
+            if phone_key:
+                self._phone_index[phone_key] = contact
+            email_key = normalize_email(contact.email)
+            if email_key:
+                self._email_index[email_key] = contact
+        # Пошуковий індекс найдорожчий у побудові, тому будується при першому пошуку, а не під час запуску
+        self._search_index = ContactSearchIndex()
+        self._search_index_ready = False
+        self._birthday_index.build(self.contacts)
+        if self.reminder is not None:
+            self.reminder.rebuild(self.contacts)
+
+    def _ensure_search_index(self):
+        """
+        Будує пошуковий індекс, якщо його ще не побудовано після завантаження книги.
+        """
+        if not self._search_index_ready:
+            # Пошук може виконуватись з кількох потоків (HTTP-сервер), індекс будується один раз
+            with self._search_index_lock:
+                if not self._search_index_ready:
+                    self._search_index.build(self.contacts)
+                    self._search_index_ready = True
+
+    def _index_contact(self, contact):
+        """
+        Додає контакт до всіх індексів книги контактів.
+        """
+        phone_key = normalize_phone(contact.phone)
+        if phone_key:
+            self._phone_index[phone_key] = contact
+        email_key = normalize_email(contact.email)
+        if email_key:
+            self._email_index[email_key] = contact
+        if self._search_index_ready:
+            self._search_index.add(contact)
+        self._birthday_index.add(contact)
+        if self.reminder is not None:
+            self.reminder.schedule(contact)
+
+    def _unindex_contact(self, contact):
+        """
+        Видаляє контакт з усіх індексів книги контактів.
+        """
+        phone_key = normalize_phone(contact.phone)
+        if self._phone_index.get(phone_key) is contact:
+            del self._phone_index[phone_key]
+        email_key = normalize_email(contact.email)
+        if self._email_index.get(email_key) is contact:
+            del self._email_index[email_key]
+        if self._search_index_ready:
+            self._search_index.remove(contact.id)
+        self._birthday_index.remove(contact.id)
+        if self.reminder is not None:
+            self.reminder.cancel(contact.id)
+
+    def find_by_phone(self, phone):
+        """
+        Шукає контакт за номером телефону незалежно від формату запису.
+        Args:
+            phone (str): Номер телефону.
+        Returns:
+            Contact or None: Знайдений контакт або None.
+        """
+        self.wait_loaded()
+        return self._phone_index.get(normalize_phone(phone))
+
+    def find_by_email(self, email):
+        """
+        Шукає контакт за адресою електронної пошти без урахування регістру.
+        Args:
+            email (str): Адреса електронної пошти.
+        Returns:
+            Contact or None: Знайдений контакт або None.
+        """
+        self.wait_loaded()
+        return self._email_index.get(normalize_email(email))
+
+    def _commit(self, op, contact):
+        """
+        Ставить зміну в чергу на запис у журнал; сам запис (і ущільнення журналу)
+        виконує фоновий потік після періоду тиші, не затримуючи команду.
+        Args:
+            op (str): Тип зміни: 'add', 'edit' або 'delete'.
+            contact (Contact): Контакт, якого стосується зміна.
+        """
+        if self._batch_depth:
+            return
+        # У чергу йде копія: контакт можуть змінити (або відкотити зміну) до фонового запису
+        self._pending.append((op, ContactRecord(contact.id, contact.name, contact.address, contact.phone,
+                                                contact.email, contact.birthday)))
+        self._autosave.mark_dirty()
+
+    @contextmanager
+    def batch(self):
+        """
+        Групує багато змін: усередині блоку зміни не пишуться в журнал по одній,
+        а книга зберігається одним знімком після виходу з блоку.
+        """
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if not self._batch_depth:
+                self.dump()
 
     def is_valid_phone(self, phone):
         """
@@ -71,10 +464,8 @@ class ContactManager:
         Returns:
             bool: True, якщо номер телефону відповідає формату, False - інакше.
         """
-        # Перевірка правильності формату номера телефону
-        # Допустимі формати: +380501234567, 050-123-45-67, 0501234567, (050)123-45-67, 0989898989
-        phone_pattern = re.compile(r'^\+?\d{1,3}?[-.\s]?\(?\d{1,4}\)?[-.\s]?\d{1,4}[-.\s]?\d{1,9}$')
-        return bool(re.fullmatch(phone_pattern, phone))
+        # Перевірка правильності формату номера телефону (шаблон компілюється один раз, див. PHONE_PATTERN)
+        return bool(PHONE_PATTERN.fullmatch(phone))
 
 
     def is_valid_email(self, email):
@@ -86,8 +477,7 @@ class ContactManager:
             bool: True, якщо адреса електронної пошти відповідає формату, False - інакше.
         """
         # Перевірка правильності формату електронної пошти
-        email_pattern = re.compile(r'^[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+$')
-        return bool(re.match(email_pattern, email))
+        return bool(EMAIL_PATTERN.match(email))
         
     def add_contact_from_console(self):
         console.print("[bold]Додавання нового контакту:[/bold]")
@@ -114,6 +504,7 @@ class ContactManager:
             except ValueError:
                 console.print("[bold red]Помилка:[/bold red] Некоректна електронна пошта. Спробуйте ще раз.")
         # Додатково: питаємо користувача про день народження і дозволяємо різні формати
+        from dateutil import parser
         while True:
             try:
                 birthday = input("Дата народження (день-місяць-рік): ")
@@ -122,138 +513,492 @@ class ContactManager:
             except ValueError:
                 console.print("[bold red]Помилка:[/bold red] Некоректний формат дати. Спробуйте ще раз.")
         self.add_contact(name, address, phone, email, birthday_date)
-        self.dump()
 
     # Додавання контакту
     def add_contact(self, name, address, phone, email, birthday):
-        # Перевірка наявності контакту з такими номерами телефонів в книзі контактів
-        existing_contact = next((contact for contact in self.contacts if set(contact.phone) == set(phone)), None)
-        if existing_contact:
-            console.print(f"[bold red]Помилка:[/bold red] Контакт з такими номерами телефонів вже існує.")
-            return
-        # Додавання нового контакту до книги контактів
-        new_contact = Contact(name, address, phone, email, birthday)
-        self.contacts.append(new_contact)
+        try:
+            new_contact = self.create_contact(name, address, phone, email, birthday)
+        except ValueError as error:
+            console.print(f"[bold red]Помилка:[/bold red] {error}")
+            return None
         console.print(f"[green]Контакт {name} успішно доданий до книги контактів.[/green]")
-        self.dump()
+        return new_contact
+
+    def create_contact(self, name, address, phone, email, birthday):
+        """
+        Додає контакт без діалогу з користувачем і без виводу в консоль.
+        Args:
+            name, address, phone, email (str): Поля контакту.
+            birthday (datetime.date): Дата народження.
+        Returns:
+            Contact: Створений контакт.
+        Raises:
+            ValueError: Якщо телефон чи пошта некоректні або вже є в книзі контактів.
+        """
+        self.wait_loaded()
+        self._check_writable()
+        if not self.is_valid_phone(phone):
+            raise ValueError(f"Некоректний формат номера телефону: {phone}")
+        if not self.is_valid_email(email):
+            raise ValueError(f"Некоректна електронна пошта: {email}")
+        # Перевірка наявності контакту з таким номером телефону або поштою в книзі контактів
+        if self.find_by_phone(phone):
+            raise ValueError("Контакт з такими номерами телефонів вже існує.")
+        if self.find_by_email(email):
+            raise ValueError("Контакт з такою електронною поштою вже існує.")
+        # Додавання нового контакту до книги контактів
+        new_contact = Contact(name, address, phone, email, birthday, id=self._next_id)
+        self._next_id += 1
+        self._attach(new_contact)
+        self._index_contact(new_contact)
+        self._record(new_contact.id, None, self.contact_state(new_contact))
+        self._commit('add', new_contact)
+        return new_contact
+
+    # Більший імпорт дешевше проіндексувати для пошуку заново, ніж додавати контакти по одному
+    INCREMENTAL_SEARCH_INDEX_LIMIT = 10_000
+
+    def import_records(self, records):
+        """
+        Додає перевірені записи одним проходом: дублікати (за нормалізованим телефоном або поштою,
+        як у книзі, так і всередині файлу) пропускаються, а книга зберігається одним записом.
+        Імпорт атомарний: якщо читання записів перервалося помилкою, уже додані контакти
+        прибираються, а помилка передається далі.
+        Args:
+            records (iterable): Трійки (номер рядка, запис або None, помилка або None),
+                див. contact_transfer.validate_chunk.
+        Returns:
+            tuple: (кількість доданих контактів, список пар (номер рядка, помилка)).
+        """
+        self.wait_loaded()
+        self._check_writable()
+        imported = []
+        errors = []
+        # Пошуковий індекс не оновлюється по одному контакту: після імпорту невелика кількість
+        # контактів додається до нього, а після великого імпорту він перебудовується при першому пошуку
+        search_index_ready, self._search_index_ready = self._search_index_ready, False
+        # Як у batch(): зміни не пишуться в журнал по одній, а книга зберігається одним знімком,
+        # але лише якщо щось додано (і не всередині зовнішнього batch, який збереже книгу сам)
+        self._batch_depth += 1
+        try:
+            # Увесь імпорт - один крок історії: його можна скасувати однією командою
+            with self._history_step('імпорт контактів'):
+                try:
+                    for row_number, record, error in records:
+                        if error is not None:
+                            errors.append((row_number, error))
+                            continue
+                        name, address, phone, email, birthday, phone_key, email_key = record
+                        if phone_key in self._phone_index:
+                            errors.append((row_number, f"Контакт з телефоном {phone} вже існує."))
+                            continue
+                        if email_key in self._email_index:
+                            errors.append((row_number, f"Контакт з електронною поштою {email} вже існує."))
+                            continue
+                        contact = Contact(name, address, phone, email, date.fromordinal(birthday), id=self._next_id)
+                        self._next_id += 1
+                        self.contacts.append(contact)
+                        self._by_id[contact.id] = contact
+                        # Ключі телефону й пошти вже нормалізовані під час перевірки
+                        self._phone_index[phone_key] = contact
+                        self._email_index[email_key] = contact
+                        self._birthday_index.add(contact)
+                        if self.reminder is not None:
+                            self.reminder.schedule(contact)
+                        self._record(contact.id, None, (name, address, phone, email, birthday))
+                        imported.append(contact)
+                except BaseException:
+                    # Частковий імпорт не зберігається: у межах того ж кроку історії записи
+                    # "додано, потім прибрано" взаємно знищуються
+                    self._rollback_import(imported)
+                    imported.clear()
+                    raise
+        finally:
+            self._batch_depth -= 1
+            if search_index_ready and len(imported) <= self.INCREMENTAL_SEARCH_INDEX_LIMIT:
+                for contact in imported:
+                    self._search_index.add(contact)
+                self._search_index_ready = True
+            elif search_index_ready:
+                self._search_index = ContactSearchIndex()
+            if imported and not self._batch_depth:
+                self.dump()
+        return len(imported), errors
+
+    def _rollback_import(self, imported):
+        """
+        Прибирає з книги та індексів контакти, додані перерваним імпортом.
+        Пошуковий індекс не чіпається: import_records оновлює його лише після завершення.
+        """
+        removed = {contact.id for contact in imported}
+        if not removed:
+            return
+        self.contacts = [contact for contact in self.contacts if contact.id not in removed]
+        for contact in imported:
+            del self._by_id[contact.id]
+            if self._phone_index.get(normalize_phone(contact.phone)) is contact:
+                del self._phone_index[normalize_phone(contact.phone)]
+            if self._email_index.get(normalize_email(contact.email)) is contact:
+                del self._email_index[normalize_email(contact.email)]
+            self._birthday_index.remove(contact.id)
+            if self.reminder is not None:
+                self.reminder.cancel(contact.id)
+            self._record(contact.id, self.contact_state(contact), None)
+
+    def import_file(self, path, fmt=None, workers=None, chunk_size=5000):
+        """
+        Імпортує контакти з файлу CSV, vCard або JSON Lines. Файл читається потоково порціями,
+        порції перевіряються та нормалізуються в пулі процесів.
+        Args:
+            path (str): Шлях до файлу.
+            fmt (str, optional): 'csv', 'vcard' або 'jsonl'. За замовчуванням - за розширенням файлу.
+            workers (int, optional): Кількість процесів перевірки. За замовчуванням - кількість ядер.
+            chunk_size (int, optional): Кількість рядків у порції.
+        Returns:
+            tuple: (кількість доданих контактів, список пар (номер рядка, помилка)).
+        Raises:
+            ValueError: Якщо формат файлу невідомий або в CSV немає потрібних колонок.
+            OSError: Якщо файл не вдалося прочитати.
+            csv.Error: Якщо CSV-файл пошкоджений (наприклад, поле довше за csv.field_size_limit()).
+            У разі помилки жодного контакту не додано.
+        """
+        from contact_transfer import read_contacts
+
+        result = self.import_records(read_contacts(path, fmt, workers, chunk_size))
+        metrics.bytes_read(os.path.basename(path), os.path.getsize(path))
+        return result
+
+    def import_from_console(self, path, show_errors=20):
+        """
+        Імпортує контакти з файлу та виводить підсумок. Повний звіт про помилки
+        записується у файл '<path>.errors.csv'.
+        """
+        from contact_transfer import write_error_report
+
+        try:
+            with console.status(f'Імпорт контактів з "{path}"...'):
+                imported, errors = self.import_file(path)
+        except (OSError, ValueError, csv.Error) as error:
+            console.print(f"[bold red]Помилка:[/bold red] Не вдалося імпортувати контакти: {error}. "
+                          f"Жодного контакту не додано.")
+            return
+        console.print(f"[green]Імпортовано контактів: {imported}.[/green]")
+        if errors:
+            report_path = f'{path}.errors.csv'
+            write_error_report(report_path, errors)
+            console.print(f"[yellow]Пропущено рядків: {len(errors)}. Звіт: {report_path}[/yellow]")
+            for row_number, error in errors[:show_errors]:
+                console.print(f"[red]Рядок {row_number}: {error}[/red]")
+            if len(errors) > show_errors:
+                console.print(f"[yellow]... та ще {len(errors) - show_errors}.[/yellow]")
+
+    def export_file(self, path, fmt=None):
+        """
+        Експортує книгу контактів у файл CSV, vCard або JSON Lines потоково.
+        Returns:
+            int: Кількість експортованих контактів.
+        Raises:
+            ValueError: Якщо формат файлу невідомий.
+            OSError: Якщо файл не вдалося записати.
+        """
+        from contact_transfer import write_contacts
+
+        self.wait_loaded()
+        metrics.bytes_written(os.path.basename(path), write_contacts(path, self.contacts, fmt))
+        return len(self.contacts)
+
+    def export_from_console(self, path):
+        try:
+            count = self.export_file(path)
+        except (OSError, ValueError) as error:
+            console.print(f"[bold red]Помилка:[/bold red] Не вдалося експортувати контакти: {error}")
+            return
+        console.print(f'[green]Експортовано контактів: {count} у "{path}".[/green]')
+
+    def get_contact(self, contact_id):
+        """
+        Returns:
+            Contact or None: Контакт з указаним id або None.
+        """
+        self.wait_loaded()
+        return self._by_id.get(contact_id)
+
+    @staticmethod
+    def parse_birthday(birthday):
+        """
+        Розбирає дату народження: спершу швидко у форматі 'день-місяць-рік', інакше через dateutil.
+        Args:
+            birthday (str): Дата народження.
+        Returns:
+            datetime.date: Дата народження.
+        Raises:
+            ValueError: Якщо дату не вдалося розібрати.
+        """
+        try:
+            return ContactJournalStorage.parse_birthday(birthday.strip().replace('.', '-').replace('/', '-'))
+        except ValueError:
+            from dateutil import parser
+            return parser.parse(birthday, dayfirst=True).date()
+
+    def find_contact(self, key):
+        """
+        Знаходить один контакт за телефоном, електронною поштою або точним ім'ям.
+        Args:
+            key (str): Телефон, пошта або ім'я контакту.
+        Returns:
+            Contact or None: Знайдений контакт або None.
+        """
+        contact = self.find_by_phone(key) or self.find_by_email(key)
+        if contact is None:
+            name = key.strip().casefold()
+            contact = next((found for found in self.query_contacts(key, page_size=50)[0]
+                            if found.name.casefold() == name), None)
+        return contact
+
+    def update_contact(self, contact, name=None, address=None, phone=None, email=None, birthday=None):
+        """
+        Змінює поля контакту без діалогу з користувачем (поля зі значенням None не змінюються).
+        Args:
+            contact (Contact): Контакт для редагування.
+            name, address, phone, email (str, optional): Нові значення полів.
+            birthday (datetime.date, optional): Нова дата народження.
+        Raises:
+            ValueError: Якщо телефон чи пошта некоректні або вже належать іншому контакту.
+        """
+        self._check_writable()
+        if phone is not None:
+            if not self.is_valid_phone(phone):
+                raise ValueError("Некоректний номер телефону.")
+            if getattr(self.find_by_phone(phone), 'id', contact.id) != contact.id:
+                raise ValueError("Контакт з такими номерами телефонів вже існує.")
+        if email is not None:
+            if not self.is_valid_email(email):
+                raise ValueError("Некоректна електронна пошта.")
+            if getattr(self.find_by_email(email), 'id', contact.id) != contact.id:
+                raise ValueError("Контакт з такою електронною поштою вже існує.")
+
+        before = self.contact_state(contact)
+        self._unindex_contact(contact)
+        for field, value in (('name', name), ('address', address), ('phone', phone),
+                             ('email', email), ('birthday', birthday)):
+            if value is not None:
+                setattr(contact, field, value)
+        self._index_contact(contact)
+        self._commit('edit', contact)
+        self._record(contact.id, before, self.contact_state(contact))
+
+    CONTACT_COLUMNS = [("Ім'я", "blue"), ("Адреса", "green"), ("Телефон", "yellow"),
+                       ("Електронна пошта", "cyan"), ("День народження", "magenta")]
+
+    @staticmethod
+    def contact_row(contact):
+        return (contact.name, contact.address, contact.phone, contact.email,
+                ContactJournalStorage.format_birthday(contact.birthday))
+
+    def contacts_page(self, offset, limit):
+        """
+        Повертає рядки таблиці контактів для однієї сторінки.
+        Args:
+            offset (int): Номер першого контакту.
+            limit (int): Кількість контактів.
+        Returns:
+            list: Кортежі рядків (ім'я, адреса, телефон, пошта, день народження).
+        """
+        return [self.contact_row(contact) for contact in self.contacts[offset:offset + limit]]
 
     #Список контактів 
-    def list_contacts(self):
+    def list_contacts(self, page_size=20):
         """
-        Виводить список контактів у вигляді таблиці.
+        Виводить список контактів у вигляді посторінкової таблиці.
+        Args:
+            page_size (int, optional): Кількість контактів на сторінці. За замовчуванням - 20.
         """
-        if not self.contacts:
+        # Під час фонового завантаження показуються вже прочитані контакти, не чекаючи на решту книги
+        loading = not self._loaded.is_set()
+        total = len(self.contacts)
+        if not total:
+            self.wait_loaded()
+            total = len(self.contacts)
+            loading = False
+        if not total:
             console.print("[red]У вас немає жодних контактів в книзі.[/red]")
         else:
-            table = Table(title="Список контактів")
-            table.add_column("[blue]Ім'я[/blue]")
-            table.add_column("[green]Адреса[/green]")
-            table.add_column("[yellow]Телефон[/yellow]")
-            table.add_column("[cyan]Електронна пошта[/cyan]")
-            table.add_column("[magenta]День народження[/magenta]")
-
-            for contact in self.contacts:
-                birthday_str = contact.birthday.strftime('%d-%m-%Y')
-                table.add_row(
-                    Text(contact.name, style="blue"),
-                    Text(contact.address, style="green"),
-                    Text(contact.phone, style="yellow"), 
-                    Text(contact.email, style="cyan"),
-                    Text(birthday_str, style="magenta")
-                )
-
             # Встановлення відстані від верхнього краю екрану
             console.print("\n" * 2)
-            console.print(table, justify="center") 
+            title = f"Список контактів (завантажено {total}, решта завантажується)" if loading else "Список контактів"
+            PagedTable(title, self.CONTACT_COLUMNS, self.contacts_page, total, page_size).show()
                        
-    def search_contacts(self, query=None):
+    def query_contacts(self, query, page=1, page_size=20):
+        """
+        Шукає контакти за ім'ям, адресою, телефоном або поштою через пошуковий індекс.
+        Args:
+            query (str): Запит для пошуку контактів.
+            page (int, optional): Номер сторінки результатів, починаючи з 1. За замовчуванням - 1.
+            page_size (int, optional): Кількість результатів на сторінці. За замовчуванням - 20.
+        Returns:
+            tuple: Список контактів на сторінці, впорядкований за релевантністю, та загальна кількість збігів.
+        """
+        contact_ids = self._search(query)
+        start = (page - 1) * page_size
+        return self._contacts_by_ids(contact_ids[start:start + page_size]), len(contact_ids)
+
+    def _search(self, query):
+        """
+        Returns:
+            list: Ідентифікатори контактів, що відповідають запиту, найрелевантніші спершу.
         """
-        Шукає контакти, які відповідають введеному запиту.
+        self.wait_loaded()
+        self._ensure_search_index()
+        with metrics.timer('contacts.search'):
+            return self._search_index.search(query)
+
+    def _contacts_by_ids(self, contact_ids):
+        return [self._by_id[contact_id] for contact_id in contact_ids]
+
+    def fuzzy_contacts(self, query, limit=10):
+        """
+        Шукає контакти за ім'ям з урахуванням помилок і транслітерації ('Mykola' знаходить 'Миколай').
+        Args:
+            query (str): Ім'я або його частина кирилицею чи латиницею.
+            limit (int, optional): Кількість результатів. За замовчуванням - 10.
+        Returns:
+            list: Пари (контакт, кількість правок), найближчі спершу.
+        """
+        matches = self._fuzzy_search(query, limit)
+        contacts = self._contacts_by_ids([contact_id for contact_id, _ in matches])
+        return [(contact, distance) for contact, (_, distance) in zip(contacts, matches)]
+
+    def _fuzzy_search(self, query, limit):
+        """
+        Returns:
+            list: Пари (ідентифікатор контакту, кількість правок), найближчі спершу.
+        """
+        self.wait_loaded()
+        self._ensure_search_index()
+        with metrics.timer('contacts.fuzzy_search'):
+            return self._search_index.fuzzy_search(query, limit)
+
+    def search_contacts(self, query=None, page_size=20, choose=False):
+        """
+        Шукає контакти, які відповідають введеному запиту, та виводить результати посторінково.
+        Схожі (нечіткі) збіги лише показуються: щоб отримати такий контакт для редагування
+        чи видалення, користувач має явно вибрати його зі списку (choose=True).
         Args:
             query (str, optional): Запит для пошуку контактів. За замовчуванням - None.
+            page_size (int, optional): Кількість результатів на сторінці. За замовчуванням - 20.
+            choose (bool, optional): Запропонувати вибрати один зі схожих контактів. За замовчуванням - False.
         Returns:
-            Contact or None: Знайдений контакт або None, якщо нічого не знайдено.
+            Contact or None: Найрелевантніший знайдений контакт, вибраний схожий контакт
+                або None, якщо точних збігів немає.
         """
 
         if query is None:
             query = input("Введіть запит для пошуку контактів: ")
 
-        matching_contacts = [contact for contact in self.contacts if query.lower() in contact.name.lower()]
+        contact_ids = self._search(query)
 
-        if matching_contacts:
+        if contact_ids:
             console.print(f"[bold green]Результати пошуку:[/bold green]")
 
-            # Виведення знайдених контактів в таблицю
-            table = Table(title="Знайдені контакти")
-            table.add_column("[blue]Ім'я[/blue]", justify="center")
-            table.add_column("[green]Адреса[/green]", justify="center")
-            table.add_column("[yellow]Телефон[/yellow]", justify="center")
-            table.add_column("[cyan]Електронна пошта[/cyan]", justify="center")
-            table.add_column("[magenta]День народження[/magenta]", justify="center")
+            # Виведення знайдених контактів посторінково, рядки будуються лише для видимої сторінки
+            def fetch_page(offset, limit):
+                return [self.contact_row(contact) for contact in self._contacts_by_ids(contact_ids[offset:offset + limit])]
 
-            for contact in matching_contacts:
-                table.add_row(
-                    Text(contact.name, style="blue"),
-                    Text(contact.address, style="green"),
-                    Text(contact.phone, style="yellow"),
-                    Text(contact.email, style="cyan"),
-                    Text(contact.birthday.strftime('%d-%m-%Y'), style="magenta")
-                )
+            PagedTable("Знайдені контакти", self.CONTACT_COLUMNS, fetch_page, len(contact_ids),
+                       page_size, justify="center").show()
 
-            # Центрування таблиці
-            console.print(table, justify="center")
+            # Повернення найрелевантнішого контакту
+            return self._contacts_by_ids(contact_ids[:1])[0]
 
-            # Повернення першого знайденого контакту
-            return matching_contacts[0] if matching_contacts else None
-        else:
-            console.print(f"[red]Немає результатів пошуку для запиту: {query}[/red]")
-            return None
+        # Точних збігів немає: можливо, ім'я введено з помилкою або латиницею
+        matches = self.fuzzy_contacts(query, page_size)
+        if matches:
+            console.print(f"[yellow]Точних збігів для запиту '{query}' немає. Схожі контакти:[/yellow]")
+            # Номери рядків потрібні, щоб явно вибрати контакт для редагування чи видалення
+            PagedTable("Схожі контакти", [("№", "white")] + self.CONTACT_COLUMNS,
+                       lambda offset, limit: [(str(number),) + self.contact_row(contact)
+                                              for number, (contact, _) in
+                                              enumerate(matches[offset:offset + limit], offset + 1)],
+                       len(matches), page_size, justify="center").show()
+            return self._choose_match(matches) if choose else None
+        console.print(f"[red]Немає результатів пошуку для запиту: {query}[/red]")
+        return None
 
 
+    def _choose_match(self, matches):
+        """
+        Просить користувача явно вибрати один зі схожих контактів за номером у списку.
+        Returns:
+            Contact or None: Вибраний контакт або None, якщо вибір скасовано.
+        """
+        answer = input(f"Введіть номер контакту зі списку (1-{len(matches)}) або Enter, щоб скасувати: ").strip()
+        if not answer.isdigit() or not 1 <= int(answer) <= len(matches):
+            console.print("[yellow]Контакт не вибрано.[/yellow]")
+            return None
+        return matches[int(answer) - 1][0]
+
     def edit_contact(self, contact):
         if contact is None:
             console.print("[bold red]Помилка:[/bold red] Контакт не знайдено.")
             return
+        if self.read_only:
+            console.print("[bold red]Помилка:[/bold red] Книга контактів відкрита лише для читання.")
+            return
 
         console.print(f"[bold]Редагування контакту: {contact.name}[/bold]")
+        before = self.contact_state(contact)
+        self._unindex_contact(contact)
+        try:
+            # Редагування імені
+            new_name = input(f"Теперішнє ім'я: {contact.name}\nВведіть нове ім'я (або Enter, щоб залишити без змін): ")
+            if new_name:
+                contact.name = new_name
 
-        # Редагування імені
-        new_name = input(f"Теперішнє ім'я: {contact.name}\nВведіть нове ім'я (або Enter, щоб залишити без змін): ")
-        if new_name:
-            contact.name = new_name
-
-        # Редагування адреси
-        new_address = input(f"Теперішня адреса: {contact.address}\nВведіть нову адресу (або Enter, щоб залишити без змін): ")
-        if new_address:
-            contact.address = new_address
-
-        # Редагування номеру телефону
-        new_phone = input(f"Теперішній телефон: {contact.phone}\nВведіть новий телефон (або Enter, щоб залишити без змін): ")
-        if new_phone:
-            if self.is_valid_phone(new_phone):
-                contact.phone = new_phone   
-            else:
-                console.print("[bold red]Помилка:[/bold red] Некоректний номер телефону.")
+            # Редагування адреси
+            new_address = input(f"Теперішня адреса: {contact.address}\nВведіть нову адресу (або Enter, щоб залишити без змін): ")
+            if new_address:
+                contact.address = new_address
 
-        # Редагування пошти
-        new_email = input(f"Теперішня електронна пошта: {contact.email}\nВведіть нову пошту (або Enter, щоб залишити без змін): ")
-        if new_email:
-            if self.is_valid_email(new_email):
-                contact.email = new_email
-            else:
-                console.print("[bold red]Помилка:[/bold red] Некоректна електронна пошта.")
+            # Редагування номеру телефону
+            new_phone = input(f"Теперішній телефон: {contact.phone}\nВведіть новий телефон (або Enter, щоб залишити без змін): ")
+            if new_phone:
+                if not self.is_valid_phone(new_phone):
+                    console.print("[bold red]Помилка:[/bold red] Некоректний номер телефону.")
+                elif self.find_by_phone(new_phone):
+                    console.print("[bold red]Помилка:[/bold red] Контакт з такими номерами телефонів вже існує.")
+                else:
+                    contact.phone = new_phone
 
-        # Редагування дня народження
-        new_birthday = input(
-            f"Теперішній день народження: {contact.birthday.strftime('%d-%m-%Y')}\nВведіть новий день народження (або Enter, щоб залишити без змін): ")
-        if new_birthday:     
-            try:
-                new_birthday_date = parser.parse(new_birthday).date()   
-                contact.birthday = new_birthday_date
-            except ValueError:
-                console.print("[bold red]Помилка:[/bold red] Некоректний формат дати. Залишено попередню дату.")
+            # Редагування пошти
+            new_email = input(f"Теперішня електронна пошта: {contact.email}\nВведіть нову пошту (або Enter, щоб залишити без змін): ")
+            if new_email:
+                if not self.is_valid_email(new_email):
+                    console.print("[bold red]Помилка:[/bold red] Некоректна електронна пошта.")
+                elif self.find_by_email(new_email):
+                    console.print("[bold red]Помилка:[/bold red] Контакт з такою електронною поштою вже існує.")
+                else:
+                    contact.email = new_email
+
+            # Редагування дня народження
+            new_birthday = input(
+                f"Теперішній день народження: {contact.birthday.strftime('%d-%m-%Y')}\nВведіть новий день народження (або Enter, щоб залишити без змін): ")
+            if new_birthday:     
+                from dateutil import parser
+                try:
+                    new_birthday_date = parser.parse(new_birthday).date()   
+                    contact.birthday = new_birthday_date
+                except (ValueError, OverflowError):
+                    console.print("[bold red]Помилка:[/bold red] Некоректний формат дати. Залишено попередню дату.")
+        except BaseException:
+            # Перерване редагування (Ctrl+C, EOF, непередбачена помилка) не лишає контакт напівзміненим
+            contact.name, contact.address, contact.phone, contact.email, contact._birthday = before
+            raise
+        finally:
+            # Контакт повертається в індекси за будь-якого результату
+            self._index_contact(contact)
         console.print(f"[green]Контакт {contact.name} успішно відредаговано.[/green]")
-        self.dump()
+        self._commit('edit', contact)
+        self._record(contact.id, before, self.contact_state(contact))
 
 
     # Видалення контакту
@@ -263,17 +1008,66 @@ class ContactManager:
         Args:
             contact (Contact, optional): Контакт для видалення. За замовчуванням - None.
         """
+        if self.read_only:
+            console.print("[bold red]Помилка:[/bold red] Книга контактів відкрита лише для читання.")
+            return
         if contact is None:
             # Якщо contact не передано, спробуйте викликати search_contacts для вибору контакту
-            contact = self.search_contacts()
+            contact = self.search_contacts(choose=True)
 
-        if contact in self.contacts:
-            contact_name = contact.name
-            self.contacts.remove(contact)
-            console.print(f"[green]Контакт {contact_name} успішно видалено.[/green]")
+        if self.remove_contact(contact):
+            console.print(f"[green]Контакт {contact.name} успішно видалено.[/green]")
         else:
             console.print("[red]Помилка: Контакт не знайдено або не вибрано для видалення.[/red]")
-        self.dump()
+
+    def remove_contact(self, contact):
+        """
+        Видаляє контакт без діалогу з користувачем.
+        Returns:
+            bool: True, якщо контакт був у книзі та його видалено.
+        """
+        self.wait_loaded()
+        self._check_writable()
+        contact = self._detach(contact) if contact is not None else None
+        if contact is None:
+            return False
+        self._unindex_contact(contact)
+        self._commit('delete', contact)
+        self._record(contact.id, self.contact_state(contact), None)
+        return True
+
+    def _attach(self, contact):
+        """
+        Додає новий контакт до книги (до індексів його додає _index_contact).
+        """
+        self.contacts.append(contact)
+        self._by_id[contact.id] = contact
+
+    def _detach(self, contact):
+        """
+        Прибирає контакт з книги.
+        Returns:
+            Contact or None: Прибраний контакт або None, якщо його немає в книзі.
+        """
+        if self._by_id.get(contact.id) is not contact:
+            return None
+        self.contacts.remove(contact)
+        del self._by_id[contact.id]
+        return contact
+
+    def birthdays_within(self, days, today=None):
+        """
+        Знаходить контакти, у яких день народження у наступні days днів (без сьогоднішнього).
+        Args:
+            days (int): Розмір вікна в днях.
+            today (datetime.date, optional): Поточна дата. За замовчуванням - сьогодні.
+        Returns:
+            list: Пари (контакт, дата найближчого дня народження), впорядковані за датою.
+        """
+        self.wait_loaded()
+        today = today or datetime.today().date()
+        return [(self._by_id[contact_id], birthday_date)
+                for birthday_date, contact_id in self._birthday_index.upcoming(today, days)]
 
     def upcoming_birthdays(self, days):
         """
@@ -282,21 +1076,24 @@ class ContactManager:
             days (int): Кількість днів для виводу інформації про найближчі дні народження.
         """
         today = datetime.today().date()
-        upcoming_birthdays = [contact for contact in self.contacts if today < self.get_next_birthday(contact) <= today + timedelta(days)]
+        upcoming_birthdays = self.birthdays_within(days, today)
         if not upcoming_birthdays:
             console.print(f'[yellow]У {days} днів немає найближчих днів народження.[/yellow]')
         else:
+            from rich.table import Table
+            from rich.text import Text
+
             table = Table(title=f'Дні народження у наступні {days} днів')
             table.add_column("[blue]Ім'я[/blue]")
             table.add_column("[magenta]Дата народження[/magenta]")
             table.add_column("[yellow]Залишилося днів[/yellow]")
             table.add_column("[green]Вік[/green]")
 
-            for contact in upcoming_birthdays:
-                remaining_days = (self.get_next_birthday(contact) - today).days
+            for contact, birthday_date in upcoming_birthdays:
+                remaining_days = (birthday_date - today).days
                 birthday_str = contact.birthday.strftime('%d-%m-%Y')
 
-                age = today.year - contact.birthday.year + 1 - ((today.month, today.day) < (contact.birthday.month, contact.birthday.day))
+                age = birthday_date.year - contact.birthday.year
 
                 table.add_row(
                 Text(contact.name, style="blue"),
@@ -309,24 +1106,258 @@ class ContactManager:
             console.print(table, justify="center")
             
             
-    def get_next_birthday(self, contact):
+    def show_reminders(self, limit=10):
+        """
+        Виводить найближчі заплановані нагадування про дні народження.
+        Args:
+            limit (int, optional): Кількість нагадувань. За замовчуванням - 10.
+        """
+        if self.reminder is None:
+            console.print("[yellow]Нагадування про дні народження вимкнено.[/yellow]")
+            return
+        upcoming = self.reminder.upcoming(limit)
+        if not upcoming:
+            console.print("[yellow]Немає запланованих нагадувань.[/yellow]")
+            return
+        from rich.table import Table
+
+        days_before = self.reminder.days_before
+        table = Table(title="Найближчі нагадування")
+        table.add_column("[blue]Ім'я[/blue]")
+        table.add_column("[magenta]День народження[/magenta]")
+        table.add_column("[yellow]Нагадування[/yellow]")
+        for contact, birthday_date in upcoming:
+            remind_date = birthday_date - timedelta(days=days_before)
+            table.add_row(contact.name, birthday_date.strftime('%d-%m-%Y'),
+                          f"{remind_date.strftime('%d-%m-%Y')} {self.reminder.at.strftime('%H:%M')}")
+        console.print(table, justify="center")
+
+    def get_next_birthday(self, contact, today=None):
         """
         Отримує дату наступного дня народження для вказаного контакту.
         Args:
             contact (Contact): Контакт, для якого потрібно отримати наступний день народження.
+            today (datetime.date, optional): Поточна дата. За замовчуванням - сьогодні.
         Returns:
             datetime.date: Дата наступного дня народження.
         """
-        today = datetime.today().date()
+        if today is None:
+            today = datetime.today().date()
 
         # Перевірка, чи birthday є рядком, і якщо так, конвертувати його у datetime.date
         if isinstance(contact.birthday, str):
-            birthday = datetime.strptime(contact['birthday'], "%d-%m-%Y").date()
+            birthday = datetime.strptime(contact.birthday, "%d-%m-%Y").date()
         else:
             birthday = contact.birthday
-        next_birthday = birthday.replace(year=today.year)
 
-        if today > date(today.year, birthday.month, birthday.day):
-            next_birthday = next_birthday.replace(year=today.year + 1)
+        return next_birthday(birthday, today)
+
+
+# Ім'я контакту для нечіткого індексу: повні контакти для нього не потрібні
+ContactName = namedtuple('ContactName', 'id name')
+
+
+class StoredContacts:
+    """
+    Список контактів SqliteContactManager: довжина, сторінки та перебір читаються з бази
+    за запитом, тож книга не тримається в пам'яті цілком.
+    """
+
+    def __init__(self, manager):
+        self.manager = manager
+
+    def __len__(self):
+        return self.manager.storage.count()
+
+    def __bool__(self):
+        return len(self) > 0
+
+    def __iter__(self):
+        return map(self.manager._contact, self.manager.storage.read_snapshot())
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                return list(self)[index]
+            return [self.manager._contact(record) for record in self.manager.storage.page(start, max(stop - start, 0))]
+        records = self.manager.storage.page(index if index >= 0 else len(self) + index, 1)
+        if not records:
+            raise IndexError("Контакт з таким номером відсутній.")
+        return self.manager._contact(records[0])
 
-        return next_birthday
\ No newline at end of file
+
+class SqliteContactManager(ContactManager):
+    """
+    Книга контактів у базі SQLite (ASSISTANT_STORAGE=sqlite).
+
+    На відміну від ContactManager, книга не завантажується в пам'ять: пошук, перевірка
+    дублікатів телефону й пошти, сторінки списку та дні народження виконуються запитами
+    до SqliteContactStorage, а кожна зміна одразу записується в базу. У пам'яті лишаються
+    лише нечіткий індекс імен (будується при першому нечіткому пошуку) і нагадування,
+    якщо їх запущено.
+    """
+
+    def __init__(self, storage=None, autosave_delay=1.0, history=None):
+        """
+        Args:
+            storage (SqliteContactStorage, optional): Сховище. За замовчуванням - 'assistant.db'.
+            autosave_delay (float, optional): Період тиші перед фоновим збереженням змін, секунди.
+            history (UndoHistory, optional): Історія змін для скасування. За замовчуванням - без історії.
+        """
+        super().__init__(storage=storage or SqliteContactStorage(), autosave_delay=autosave_delay, history=history)
+        self.contacts = StoredContacts(self)
+        self._fuzzy_index = None
+        self._fuzzy_index_lock = threading.Lock()
+
+    @staticmethod
+    def _contact(record):
+        contact_id, name, address, phone, email, birthday = record
+        return Contact(name, address, phone, email, birthday, id=contact_id)
+
+    def load(self, background=True, batch_size=5000):
+        """
+        Відкриває книгу: читає лише наступний id і кількість контактів.
+        """
+        self.read_only = False
+        self._next_id = self.storage.max_id() + 1
+        self._rebuild_indexes()
+        count = len(self.contacts)
+        if count:
+            print(f"Контакти успішно завантажені ({count}).")
+        else:
+            print("Не вдалося завантажити контакти або файл порожній.")
+
+    def dump(self):
+        """
+        Зміни вже записані в базу, тож лише переносить WAL у файл бази.
+        """
+        if not self.read_only:
+            self.storage.checkpoint()
+
+    def _commit(self, op, contact):
+        # Книга не зберігається знімком, тож зміна записується одразу (навіть усередині batch)
+        self.storage.append(op, contact)
+
+    def _rebuild_indexes(self):
+        self._fuzzy_index = None
+        if self.reminder is not None:
+            self.reminder.rebuild(self.contacts)
+
+    def _index_contact(self, contact):
+        fuzzy_index = self._fuzzy_index
+        if fuzzy_index is not None:
+            fuzzy_index.add(contact)
+        if self.reminder is not None:
+            self.reminder.schedule(contact)
+
+    def _unindex_contact(self, contact):
+        fuzzy_index = self._fuzzy_index
+        if fuzzy_index is not None:
+            fuzzy_index.remove(contact.id)
+        if self.reminder is not None:
+            self.reminder.cancel(contact.id)
+
+    def _attach(self, contact):
+        # Контакт потрапляє в базу через _commit('add')
+        pass
+
+    def _detach(self, contact):
+        return contact if self.storage.get(contact.id) is not None else None
+
+    def get_contact(self, contact_id):
+        record = self.storage.get(contact_id)
+        return self._contact(record) if record is not None else None
+
+    def find_by_phone(self, phone):
+        record = self.storage.find_by_phone(phone)
+        return self._contact(record) if record is not None else None
+
+    def find_by_email(self, email):
+        record = self.storage.find_by_email(email)
+        return self._contact(record) if record is not None else None
+
+    def _search(self, query):
+        # Кандидатів відбирає індекс FTS5 бази, рейтинг - той самий, що й у ContactSearchIndex
+        query = normalize_query(query)
+        if not query:
+            return []
+        with metrics.timer('contacts.search'):
+            candidates = map(self._contact, self.storage.search_candidates(query))
+            return [contact.id for contact in rank_contacts(query, candidates)]
+
+    def _contacts_by_ids(self, contact_ids):
+        records = self.storage.get_many(contact_ids)
+        return [self._contact(records[contact_id]) for contact_id in contact_ids if contact_id in records]
+
+    def _fuzzy_search(self, query, limit):
+        if self._fuzzy_index is None:
+            with self._fuzzy_index_lock:
+                if self._fuzzy_index is None:
+                    fuzzy_index = FuzzyNameIndex()
+                    fuzzy_index.build(ContactName(*row) for row in self.storage.names())
+                    self._fuzzy_index = fuzzy_index
+        with metrics.timer('contacts.fuzzy_search'):
+            return self._fuzzy_index.search(query, limit)
+
+    def birthdays_within(self, days, today=None):
+        today = today or datetime.today().date()
+        tomorrow = today + timedelta(days=1)
+        upcoming = [(contact, next_birthday(contact.birthday, tomorrow))
+                    for contact in map(self._contact, self.storage.upcoming_birthdays(today, days))]
+        upcoming.sort(key=lambda item: (item[1], item[0].id))
+        metrics.records_scanned('contacts.birthdays', len(upcoming))
+        return upcoming
+
+    def import_records(self, records):
+        """
+        Додає перевірені записи: дублікати шукаються запитами за індексами телефону й пошти
+        та серед уже прочитаних рядків файлу, а всі нові контакти записуються однією
+        транзакцією - перерваний імпорт не додає жодного контакту.
+        """
+        self._check_writable()
+        imported = []
+        errors = []
+        phone_keys = set()
+        email_keys = set()
+        for row_number, record, error in records:
+            if error is not None:
+                errors.append((row_number, error))
+                continue
+            name, address, phone, email, birthday, phone_key, email_key = record
+            if phone_key in phone_keys or self.storage.find_by_phone(phone_key) is not None:
+                errors.append((row_number, f"Контакт з телефоном {phone} вже існує."))
+                continue
+            if email_key in email_keys or self.storage.find_by_email(email_key) is not None:
+                errors.append((row_number, f"Контакт з електронною поштою {email} вже існує."))
+                continue
+            phone_keys.add(phone_key)
+            email_keys.add(email_key)
+            imported.append(Contact(name, address, phone, email, date.fromordinal(birthday), id=self._next_id))
+            self._next_id += 1
+        self.storage.append_many([('add', contact) for contact in imported])
+        with self._history_step('імпорт контактів'):
+            for contact in imported:
+                self._index_contact(contact)
+                self._record(contact.id, None, self.contact_state(contact))
+        return len(imported), errors
+
+    def restore(self, changes):
+        """
+        Відновлює контакти до знімків з історії змін однією транзакцією.
+        """
+        records = self.storage.get_many([contact_id for contact_id, _ in changes])
+        writes = []
+        for contact_id, state in changes:
+            record = records.get(contact_id)
+            if record is not None:
+                current = self._contact(record)
+                self._unindex_contact(current)
+                if state is None:
+                    writes.append(('delete', current))
+            if state is not None:
+                name, address, phone, email, birthday = state
+                contact = Contact(name, address, phone, email, date.fromordinal(birthday), id=contact_id)
+                self._index_contact(contact)
+                writes.append(('edit', contact))
+        self.storage.append_many(writes)
@@ -0,0 +1,579 @@
+import os
+import csv
+import json
+import sqlite3
+import calendar
+import threading
+from abc import ABC, abstractmethod
+from datetime import date, timedelta
+from contact_index import normalize_phone, normalize_email, search_fields
+from snapshot_cache import file_signature, read_cache, write_cache
+from metrics import metrics
+
+
+class ContactStorage(ABC):
+    """
+    Інтерфейс сховища книги контактів, яким користується ContactManager.
+    """
+
+    @abstractmethod
+    def exists(self):
+        pass
+
+    @abstractmethod
+    def read_snapshot(self):
+        """
+        Returns:
+            generator: Кортежі (id, name, address, phone, email, birthday).
+        """
+
+    def read_journal(self):
+        """
+        Returns:
+            generator: Пари (op, record) змін, які потрібно застосувати поверх знімка.
+        """
+        return iter(())
+
+    @abstractmethod
+    def append(self, op, contact):
+        """
+        Зберігає одну зміну: 'add', 'edit' або 'delete'.
+        """
+
+    def append_many(self, changes):
+        """
+        Зберігає кілька змін поспіль.
+        Args:
+            changes (list): Пари (op, contact).
+        """
+        for op, contact in changes:
+            self.append(op, contact)
+
+    def needs_compaction(self, contacts_count):
+        return False
+
+    @abstractmethod
+    def compact(self, contacts):
+        """
+        Зберігає повний стан книги контактів.
+        """
+
+    def close(self):
+        pass
+
+
+class ContactJournalStorage(ContactStorage):
+    """
+    Сховище книги контактів: знімок у CSV та журнал змін у форматі JSON Lines.
+
+    Кожна зміна (додавання, редагування, видалення) дописується в кінець журналу
+    одним коротким рядком, тому вартість запису не залежить від розміру книги.
+    Коли журнал стає завеликим, він ущільнюється у новий знімок.
+    """
+
+    SNAPSHOT_FIELDS = ['name', 'address', 'phone', 'email', 'birthday', 'id']
+
+    def __init__(self, file_path='addressbook.csv', journal_path=None,
+                 compact_min_records=1000, compact_ratio=0.5, durable=False, cache_path=None):
+        """
+        Args:
+            file_path (str): Шлях до файлу знімка (CSV).
+            journal_path (str, optional): Шлях до журналу змін. За замовчуванням - file_path + '.journal'.
+            compact_min_records (int): Мінімальна кількість записів журналу перед ущільненням.
+            compact_ratio (float): Ущільнювати, коли журнал довший за цю частку книги.
+            durable (bool): Викликати fsync після кожного запису в журнал.
+            cache_path (str, optional): Шлях до двійкового кешу знімка. За замовчуванням - file_path + '.cache'.
+        """
+        self.file_path = file_path
+        self.journal_path = journal_path or f'{file_path}.journal'
+        self.cache_path = cache_path or f'{file_path}.cache'
+        self.compact_min_records = compact_min_records
+        self.compact_ratio = compact_ratio
+        self.durable = durable
+        self.journal_records = 0
+        self._journal = None
+
+    @staticmethod
+    def to_record(contact):
+        """
+        Перетворює контакт на словник для запису в журнал.
+        """
+        return {'id': contact.id, 'name': contact.name, 'address': contact.address,
+                'phone': contact.phone, 'email': contact.email,
+                'birthday': ContactJournalStorage.format_birthday(contact.birthday)}
+
+    @staticmethod
+    def parse_birthday(birthday_str):
+        """
+        Розбирає дату у фіксованому форматі 'день-місяць-рік' без strptime, який на великих
+        файлах займає більшу частину часу завантаження.
+        """
+        day, month, year = birthday_str.split('-')
+        return date(int(year), int(month), int(day))
+
+    @staticmethod
+    def format_birthday(birthday):
+        return f'{birthday.day:02d}-{birthday.month:02d}-{birthday.year:04d}'
+
+    def exists(self):
+        return os.path.exists(self.file_path) or os.path.exists(self.journal_path)
+
+    def read_snapshot(self):
+        """
+        Читає знімок книги контактів. Якщо для поточної версії CSV є двійковий кеш,
+        рядки беруться з нього без розбору CSV; інакше кеш створюється після читання.
+        Returns:
+            generator: Кортежі (id, name, address, phone, email, birthday). Для старих файлів
+            без колонки 'id' значення id дорівнює None.
+        """
+        signature = file_signature(self.file_path)
+        if signature is None:
+            return
+        rows = read_cache(self.cache_path, signature)
+        if rows is not None:
+            fromordinal = date.fromordinal
+            for contact_id, name, address, phone, email, birthday in rows:
+                yield contact_id, name, address, phone, email, fromordinal(birthday)
+            return
+
+        rows = []
+        for record in self._read_csv():
+            rows.append((*record[:5], record[5].toordinal()))
+            yield record
+        metrics.bytes_read(os.path.basename(self.file_path), signature[0])
+        write_cache(self.cache_path, signature, rows)
+
+    def _read_csv(self):
+        parse_birthday = self.parse_birthday
+        with open(self.file_path, newline='\n', encoding='UTF-8') as fh:
+            reader = csv.reader(fh)
+            header = next(reader, None)
+            if header is None:
+                return
+            # Позиції колонок визначаються один раз за заголовком, а не словником на кожен рядок
+            name, address, phone, email, birthday = (header.index(field) for field in self.SNAPSHOT_FIELDS[:5])
+            id_column = header.index('id') if 'id' in header else None
+            for row in reader:
+                if not row:
+                    continue
+                contact_id = row[id_column] if id_column is not None else None
+                yield (int(contact_id) if contact_id else None, row[name], row[address],
+                       row[phone], row[email], parse_birthday(row[birthday]))
+
+    def read_journal(self):
+        """
+        Відтворює журнал змін після аварійного завершення або звичайного запуску.
+        Недописаний останній рядок (обірваний запис) відкидається, а журнал обрізається
+        до останнього цілого запису.
+        Returns:
+            generator: Пари (op, record), де record - словник з полями контакту.
+        """
+        self.journal_records = 0
+        if not os.path.exists(self.journal_path):
+            return
+        valid_size = 0
+        with open(self.journal_path, 'rb') as fh:
+            for line in fh:
+                if not line.endswith(b'\n'):
+                    break
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    break
+                valid_size += len(line)
+                self.journal_records += 1
+                yield entry.pop('op'), entry
+        metrics.bytes_read(os.path.basename(self.journal_path), valid_size)
+        if valid_size != os.path.getsize(self.journal_path):
+            with open(self.journal_path, 'r+b') as fh:
+                fh.truncate(valid_size)
+
+    def append(self, op, contact):
+        """
+        Дописує одну зміну в журнал.
+        Args:
+            op (str): Тип зміни: 'add', 'edit' або 'delete'.
+            contact (Contact): Контакт, якого стосується зміна.
+        """
+        self.append_many([(op, contact)])
+
+    def append_many(self, changes):
+        """
+        Дописує кілька змін у журнал одним записом (і одним fsync у режимі durable).
+        Args:
+            changes (list): Пари (op, contact).
+        """
+        lines = []
+        for op, contact in changes:
+            if op == 'delete':
+                entry = {'op': op, 'id': contact.id}
+            else:
+                entry = {'op': op, **self.to_record(contact)}
+            lines.append(json.dumps(entry, ensure_ascii=False) + '\n')
+        if self._journal is None:
+            self._journal = open(self.journal_path, 'a', encoding='UTF-8')
+        data = ''.join(lines)
+        self._journal.write(data)
+        self._journal.flush()
+        if self.durable:
+            os.fsync(self._journal.fileno())
+        self.journal_records += len(lines)
+        if metrics.enabled:
+            metrics.bytes_written(os.path.basename(self.journal_path), len(data.encode('UTF-8')))
+
+    def needs_compaction(self, contacts_count):
+        """
+        Перевіряє, чи журнал досяг порогу ущільнення. Поріг пропорційний розміру книги,
+        тож амортизована вартість ущільнення на одну зміну залишається сталою.
+        """
+        threshold = max(self.compact_min_records, int(contacts_count * self.compact_ratio))
+        return self.journal_records >= threshold
+
+    def compact(self, contacts):
+        """
+        Записує повний знімок книги контактів і очищує журнал.
+        Знімок спочатку пишеться у тимчасовий файл і атомарно підміняє старий,
+        тому аварія посеред запису не пошкоджує дані.
+        Args:
+            contacts (list): Список контактів для збереження.
+        """
+        tmp_path = f'{self.file_path}.tmp'
+        format_birthday = self.format_birthday
+        with open(tmp_path, 'w', newline='\n', encoding='UTF-8') as fh:
+            writer = csv.writer(fh)
+            writer.writerow(self.SNAPSHOT_FIELDS)
+            writer.writerows((contact.name, contact.address, contact.phone, contact.email,
+                              format_birthday(contact.birthday), contact.id) for contact in contacts)
+            fh.flush()
+            os.fsync(fh.fileno())
+            written = fh.tell()
+        os.replace(tmp_path, self.file_path)
+        metrics.bytes_written(os.path.basename(self.file_path), written)
+        # Кеш пишеться одразу, тож наступний запуск не розбиратиме щойно записаний CSV
+        write_cache(self.cache_path, file_signature(self.file_path),
+                    [(contact.id, contact.name, contact.address, contact.phone, contact.email,
+                      contact.birthday.toordinal()) for contact in contacts])
+
+        # Повторне відтворення журналу поверх нового знімка безпечне (записи ідемпотентні),
+        # тому журнал очищується лише після підміни знімка.
+        self.close()
+        open(self.journal_path, 'w', encoding='UTF-8').close()
+        self.journal_records = 0
+
+    def close(self):
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+
+
+class SqliteContactStorage(ContactStorage):
+    """
+    Сховище книги контактів у базі SQLite (режим WAL) з індексами за ім'ям, телефоном,
+    поштою та днем народження і повнотекстовим індексом FTS5 (триграми) для пошуку за
+    підрядком. Пошук, перевірка дублікатів, сторінки списку та вибірка днів народження
+    виконуються запитами SQL, без завантаження всієї книги в пам'ять (див. SqliteContactManager).
+
+    Одне з'єднання використовують кілька потоків (HTTP-сервер, нагадування), тому всі
+    звернення до нього виконуються під блокуванням.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS contacts (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            address TEXT NOT NULL,
+            phone TEXT NOT NULL,
+            phone_key TEXT NOT NULL,
+            email TEXT NOT NULL,
+            email_key TEXT NOT NULL,
+            birthday TEXT NOT NULL,
+            birthday_md INTEGER NOT NULL,
+            name_key TEXT NOT NULL,
+            search_text TEXT NOT NULL
+        );
+        -- Пошук за префіксом імені йде через contacts_fts, тож окремий індекс імен не потрібен
+        DROP INDEX IF EXISTS contacts_name_key;
+        CREATE INDEX IF NOT EXISTS contacts_phone_key ON contacts (phone_key);
+        CREATE INDEX IF NOT EXISTS contacts_email_key ON contacts (email_key);
+        CREATE INDEX IF NOT EXISTS contacts_birthday_md ON contacts (birthday_md);
+    """
+
+    # Зовнішній вміст: FTS5 зберігає лише індекс триграм, текст береться з contacts
+    FTS_SCHEMA = """
+        CREATE VIRTUAL TABLE IF NOT EXISTS contacts_fts USING fts5 (
+            search_text, content='contacts', content_rowid='id', tokenize='trigram'
+        );
+        CREATE TRIGGER IF NOT EXISTS contacts_fts_insert AFTER INSERT ON contacts BEGIN
+            INSERT INTO contacts_fts (rowid, search_text) VALUES (new.id, new.search_text);
+        END;
+        CREATE TRIGGER IF NOT EXISTS contacts_fts_delete AFTER DELETE ON contacts BEGIN
+            INSERT INTO contacts_fts (contacts_fts, rowid, search_text) VALUES ('delete', old.id, old.search_text);
+        END;
+        CREATE TRIGGER IF NOT EXISTS contacts_fts_update AFTER UPDATE ON contacts BEGIN
+            INSERT INTO contacts_fts (contacts_fts, rowid, search_text) VALUES ('delete', old.id, old.search_text);
+            INSERT INTO contacts_fts (rowid, search_text) VALUES (new.id, new.search_text);
+        END;
+    """
+
+    # Версія формату search_text (PRAGMA user_version): 1 - з номером телефону лише цифрами
+    VERSION = 1
+
+    COLUMNS = 'id, name, address, phone, email, birthday'
+
+    # INSERT OR REPLACE не викликає тригерів видалення, тож індекс FTS розійшовся б з таблицею
+    UPSERT = """
+        INSERT INTO contacts VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT (id) DO UPDATE SET
+            name = excluded.name, address = excluded.address, phone = excluded.phone,
+            phone_key = excluded.phone_key, email = excluded.email, email_key = excluded.email_key,
+            birthday = excluded.birthday, birthday_md = excluded.birthday_md,
+            name_key = excluded.name_key, search_text = excluded.search_text
+    """
+
+    # Скільки рядків читається за одне звернення під блокуванням під час потокового читання
+    PAGE_SIZE = 1000
+
+    def __init__(self, file_path='assistant.db', csv_path='addressbook.csv'):
+        """
+        Args:
+            file_path (str): Шлях до файлу бази даних.
+            csv_path (str, optional): CSV-файл (разом із журналом змін), з якого імпортуються
+                контакти, якщо база порожня.
+        """
+        self.file_path = file_path
+        self.csv_path = csv_path
+        self.lock = threading.RLock()
+        self.conn = sqlite3.connect(file_path, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.executescript(self.SCHEMA)
+        self.has_fts = self._create_fts()
+        if self.conn.execute('PRAGMA user_version').fetchone()[0] < self.VERSION:
+            self._migrate()
+        if self.csv_path and os.path.exists(self.csv_path) and self.count() == 0:
+            try:
+                self.import_csv(self.csv_path)
+            except (OSError, ValueError, KeyError, csv.Error) as error:
+                # Транзакція відкочена: база лишається порожньою, імпорт повториться при наступному запуску
+                print(f"Не вдалося імпортувати контакти з '{self.csv_path}': {error}")
+
+    def _create_fts(self):
+        exists = self.conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'contacts_fts'").fetchone()
+        try:
+            self.conn.executescript(self.FTS_SCHEMA)
+        except sqlite3.OperationalError:
+            # SQLite зібрано без FTS5 або без токенізатора trigram - пошук перебиратиме таблицю
+            return False
+        if not exists:
+            with self.conn:
+                self.conn.execute("INSERT INTO contacts_fts (contacts_fts) VALUES ('rebuild')")
+        return True
+
+    def _migrate(self):
+        """
+        Перераховує search_text у базах, створених до появи цифрового ключа телефону.
+        """
+        with self.conn:
+            rows = self.conn.execute('SELECT id, name, address, phone, email FROM contacts').fetchall()
+            self.conn.executemany('UPDATE contacts SET search_text = ? WHERE id = ?',
+                                  ((self.search_text(name, address, phone, email), contact_id)
+                                   for contact_id, name, address, phone, email in rows))
+            self.conn.execute(f'PRAGMA user_version = {self.VERSION}')
+
+    @staticmethod
+    def search_text(name, address, phone, email):
+        # LIKE/NOCASE у SQLite не знають регістру кирилиці, тому зберігаємо вже згорнуті рядки
+        # тих самих полів, що й ContactSearchIndex (телефон ще й лише цифрами)
+        return '\n'.join(search_fields(name, address, phone, email))
+
+    @classmethod
+    def _row(cls, contact_id, name, address, phone, email, birthday):
+        return (contact_id, name, address, phone, normalize_phone(phone), email, normalize_email(email),
+                birthday.isoformat(), birthday.month * 100 + birthday.day, name.casefold(),
+                cls.search_text(name, address, phone, email))
+
+    @staticmethod
+    def _record(row):
+        contact_id, name, address, phone, email, birthday = row
+        return contact_id, name, address, phone, email, date.fromisoformat(birthday)
+
+    def _query(self, sql, params=()):
+        with self.lock:
+            return self.conn.execute(sql, params).fetchall()
+
+    def count(self):
+        return self._query('SELECT COUNT(*) FROM contacts')[0][0]
+
+    def max_id(self):
+        return self._query('SELECT COALESCE(MAX(id), 0) FROM contacts')[0][0]
+
+    def exists(self):
+        return True
+
+    def read_snapshot(self):
+        """
+        Читає контакти порціями за первинним ключем: блокування не утримується, поки
+        споживач обробляє порцію, тож інші потоки можуть працювати з базою.
+        """
+        last_id = -1
+        while True:
+            rows = self._query(f'SELECT {self.COLUMNS} FROM contacts WHERE id > ? ORDER BY id LIMIT ?',
+                               (last_id, self.PAGE_SIZE))
+            for row in rows:
+                yield self._record(row)
+            if len(rows) < self.PAGE_SIZE:
+                return
+            last_id = rows[-1][0]
+
+    def page(self, offset, limit):
+        """
+        Returns:
+            list: Кортежі (id, name, address, phone, email, birthday) контактів з номерами
+            offset..offset+limit у порядку id.
+        """
+        return [self._record(row) for row in self._query(
+            f'SELECT {self.COLUMNS} FROM contacts ORDER BY id LIMIT ? OFFSET ?', (limit, offset))]
+
+    def get(self, contact_id):
+        rows = self._query(f'SELECT {self.COLUMNS} FROM contacts WHERE id = ?', (contact_id,))
+        return self._record(rows[0]) if rows else None
+
+    def get_many(self, contact_ids):
+        """
+        Returns:
+            dict: id -> кортеж полів для наявних контактів.
+        """
+        contact_ids = list(contact_ids)
+        records = {}
+        # Кількість параметрів запиту SQLite обмежена, тож id передаються частинами
+        for start in range(0, len(contact_ids), 500):
+            chunk = contact_ids[start:start + 500]
+            for row in self._query(f'SELECT {self.COLUMNS} FROM contacts WHERE id IN ({", ".join("?" * len(chunk))})',
+                                   chunk):
+                records[row[0]] = self._record(row)
+        return records
+
+    def names(self):
+        """
+        Returns:
+            generator: Пари (id, ім'я) для побудови нечіткого індексу імен.
+        """
+        last_id = -1
+        while True:
+            rows = self._query('SELECT id, name FROM contacts WHERE id > ? ORDER BY id LIMIT ?',
+                               (last_id, self.PAGE_SIZE * 10))
+            yield from rows
+            if not rows:
+                return
+            last_id = rows[-1][0]
+
+    def append(self, op, contact):
+        self.append_many([(op, contact)])
+
+    def append_many(self, changes):
+        # Усі зміни - однією транзакцією
+        with self.lock, self.conn:
+            for op, contact in changes:
+                if op == 'delete':
+                    self.conn.execute('DELETE FROM contacts WHERE id = ?', (contact.id,))
+                else:
+                    self.conn.execute(self.UPSERT, self._row(contact.id, contact.name, contact.address,
+                                                             contact.phone, contact.email, contact.birthday))
+
+    def checkpoint(self):
+        """
+        Переносить WAL у файл бази (як знімок для CSV-сховища).
+        """
+        with self.lock:
+            self.conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+
+    def compact(self, contacts):
+        """
+        Синхронізує базу з переданим станом книги однією транзакцією та переносить WAL у файл бази.
+        """
+        contacts = list(contacts)
+        with self.lock:
+            with self.conn:
+                self.conn.execute('DELETE FROM contacts')
+                self.conn.executemany(self.UPSERT, (self._row(contact.id, contact.name, contact.address, contact.phone,
+                                                              contact.email, contact.birthday) for contact in contacts))
+            self.conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+    def find_by_phone(self, phone):
+        rows = self._query(f'SELECT {self.COLUMNS} FROM contacts WHERE phone_key = ? LIMIT 1',
+                           (normalize_phone(phone),))
+        return self._record(rows[0]) if rows else None
+
+    def find_by_email(self, email):
+        rows = self._query(f'SELECT {self.COLUMNS} FROM contacts WHERE email_key = ? LIMIT 1',
+                           (normalize_email(email),))
+        return self._record(rows[0]) if rows else None
+
+    def search_candidates(self, query):
+        """
+        Відбирає контакти, у полях яких є підрядок запиту. Запити від трьох символів шукаються
+        за індексом триграм FTS5; коротші (і бази без FTS5) - переглядом таблиці.
+        Args:
+            query (str): Запит, підготовлений contact_index.normalize_query.
+        Returns:
+            list: Кортежі (id, name, address, phone, email, birthday), не впорядковані.
+        """
+        if self.has_fts and len(query) >= 3:
+            rows = self._query(f'SELECT {self.COLUMNS} FROM contacts WHERE id IN '
+                               f'(SELECT rowid FROM contacts_fts WHERE contacts_fts MATCH ?)',
+                               ('"' + query.replace('"', '""') + '"',))
+        else:
+            rows = self._query(f'SELECT {self.COLUMNS} FROM contacts WHERE instr(search_text, ?) > 0', (query,))
+        metrics.records_scanned('contacts.search', len(rows))
+        return [self._record(row) for row in rows]
+
+    def upcoming_birthdays(self, today, days):
+        """
+        Вибирає дні народження у вікні (today, today + days] за індексом birthday_md.
+        Returns:
+            list: Кортежі (id, name, address, phone, email, birthday).
+        """
+        def month_day(day):
+            return day.month * 100 + day.day
+
+        # 29 лютого у невисокосні роки святкується 28 лютого
+        def celebrated_on_feb_28(day):
+            return day.month == 2 and day.day == 28 and not calendar.isleap(day.year)
+
+        days = min(days, 366)
+        if days <= 0:
+            return []
+        start = today + timedelta(days=1)
+        end = today + timedelta(days=days)
+        start_md = month_day(start)
+        end_md = 229 if celebrated_on_feb_28(end) else month_day(end)
+        if days >= 365:
+            excluded = (month_day(today), 229 if celebrated_on_feb_28(today) else month_day(today))
+            where, params = 'birthday_md NOT IN (?, ?)', excluded
+        elif start_md <= end_md:
+            where, params = 'birthday_md BETWEEN ? AND ?', (start_md, end_md)
+        else:
+            where, params = '(birthday_md >= ? OR birthday_md <= ?)', (start_md, end_md)
+        return [self._record(row) for row in self._query(f'SELECT {self.COLUMNS} FROM contacts WHERE {where}', params)]
+
+    def import_csv(self, csv_path):
+        """
+        Імпортує контакти з CSV-файлу (формат addressbook.csv) однією транзакцією разом
+        зі змінами з його журналу (addressbook.csv.journal), які ще не потрапили у знімок.
+        """
+        source = ContactJournalStorage(csv_path)
+        with self.lock, self.conn:
+            self.conn.executemany(self.UPSERT, (self._row(*record) for record in source.read_snapshot()))
+            # Журнал відтворюється поверх знімка в тому ж порядку, що й ContactManager.load
+            for op, record in source.read_journal():
+                if op == 'delete':
+                    self.conn.execute('DELETE FROM contacts WHERE id = ?', (record['id'],))
+                else:
+                    self.conn.execute(self.UPSERT, self._row(record['id'], record['name'], record['address'],
+                                                             record['phone'], record['email'],
+                                                             source.parse_birthday(record['birthday'])))
+        source.close()
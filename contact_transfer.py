@@ -0,0 +1,295 @@
+import io
+import os
+import re
+import csv
+import json
+from collections import deque
+from datetime import date
+from itertools import islice
+from contact_storage import ContactJournalStorage
+from contact_index import normalize_phone, normalize_email
+from contact_manager import ContactManager, PHONE_PATTERN, EMAIL_PATTERN
+
+# Формати файлів за розширенням
+FORMATS = {'.csv': 'csv', '.vcf': 'vcard', '.vcard': 'vcard', '.jsonl': 'jsonl', '.ndjson': 'jsonl'}
+FIELDS = ('name', 'address', 'phone', 'email', 'birthday')
+ISO_DATE = re.compile(r'\d{4}-\d{2}-\d{2}')
+# Скільки контактів форматується за один запис у файл під час експорту
+EXPORT_CHUNK = 1000
+
+
+def detect_format(path, fmt=None):
+    """
+    Визначає формат файлу контактів: явно вказаний або за розширенням.
+    Returns:
+        str: 'csv', 'vcard' або 'jsonl'.
+    Raises:
+        ValueError: Якщо формат невідомий.
+    """
+    fmt = fmt or FORMATS.get(os.path.splitext(path)[1].lower())
+    if fmt not in READERS:
+        raise ValueError(f"Невідомий формат файлу контактів: {path}. Підтримуються CSV, vCard (.vcf) та JSON Lines (.jsonl).")
+    return fmt
+
+
+# Читання: генератори пар (номер рядка, поля) або (номер рядка, текст помилки).
+# Поля - кортеж рядків (name, address, phone, email, birthday); файл читається потоково.
+def read_csv(path):
+    with open(path, newline='', encoding='UTF-8-sig') as fh:
+        reader = csv.reader(fh)
+        header = [column.strip().lower() for column in next(reader, [])]
+        missing = [field for field in FIELDS if field != 'address' and field not in header]
+        if missing:
+            raise ValueError(f"У файлі немає колонок: {', '.join(missing)}")
+        columns = [header.index(field) if field in header else None for field in FIELDS]
+        for row in reader:
+            if not row:
+                continue
+            if len(row) < len(header):
+                yield reader.line_num, f"Очікувалось {len(header)} колонок, отримано {len(row)}."
+                continue
+            yield reader.line_num, tuple(row[column] if column is not None else '' for column in columns)
+
+
+def read_jsonl(path):
+    with open(path, encoding='UTF-8') as fh:
+        for line_number, line in enumerate(fh, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as error:
+                yield line_number, f"Некоректний JSON: {error}"
+                continue
+            if not isinstance(record, dict):
+                yield line_number, "Рядок має бути JSON-об'єктом."
+                continue
+            yield line_number, tuple(str(record.get(field) or '') for field in FIELDS)
+
+
+def _unescape(value):
+    return re.sub(r'\\(.)', lambda match: '\n' if match.group(1) in 'nN' else match.group(1), value)
+
+
+def _split_components(value):
+    # Складені значення (N, ADR) розділяються крапкою з комою, якої не екрановано
+    return [_unescape(part) for part in re.split(r'(?<!\\);', value)]
+
+
+def read_vcard(path):
+    """
+    Читає картки vCard 2.1/3.0/4.0: FN (або N), ADR, перший TEL, перший EMAIL і BDAY.
+    """
+    def unfolded(fh):
+        # Довгі рядки vCard переносяться: продовження починається з пробілу або табуляції
+        current, current_number = None, 0
+        for line_number, line in enumerate(fh, start=1):
+            line = line.rstrip('\r\n')
+            if line[:1] in (' ', '\t') and current is not None:
+                current += line[1:]
+                continue
+            if current is not None:
+                yield current_number, current
+            current, current_number = line, line_number
+        if current is not None:
+            yield current_number, current
+
+    with open(path, encoding='UTF-8-sig') as fh:
+        card = None
+        for line_number, line in unfolded(fh):
+            name, _, value = line.partition(':')
+            # Група (item1.TEL) і параметри (TEL;TYPE=CELL) для вибору поля не потрібні
+            name = name.split(';', 1)[0].rsplit('.', 1)[-1].upper()
+            if name == 'BEGIN' and value.upper() == 'VCARD':
+                card = {'line': line_number}
+            elif card is None:
+                continue
+            elif name == 'END':
+                full_name = card.get('FN') or ' '.join(part for part in card.get('N', [])[1::-1] if part)
+                yield card['line'], (full_name, card.get('ADR', ''), card.get('TEL', ''),
+                                     card.get('EMAIL', ''), card.get('BDAY', ''))
+                card = None
+            elif name == 'FN':
+                card['FN'] = _unescape(value).strip()
+            elif name == 'N':
+                card['N'] = [part.strip() for part in _split_components(value)]
+            elif name == 'ADR' and 'ADR' not in card:
+                card['ADR'] = ', '.join(part.strip() for part in _split_components(value) if part.strip())
+            elif name in ('TEL', 'EMAIL') and name not in card:
+                card[name] = _unescape(value).strip()
+            elif name == 'BDAY':
+                value = value.strip()
+                # 19900201 -> 1990-02-01
+                if len(value) == 8 and value.isdigit():
+                    value = f'{value[:4]}-{value[4:6]}-{value[6:]}'
+                card['BDAY'] = value
+        if card is not None:
+            yield card['line'], "Картку не завершено рядком END:VCARD."
+
+
+READERS = {'csv': read_csv, 'jsonl': read_jsonl, 'vcard': read_vcard}
+
+
+def parse_birthday(value):
+    if ISO_DATE.fullmatch(value):
+        return date.fromisoformat(value)
+    return ContactManager.parse_birthday(value)
+
+
+def validate_chunk(chunk):
+    """
+    Перевіряє та нормалізує порцію рядків. Виконується в процесах пулу, тому функція
+    модульна і повертає лише прості типи.
+    Args:
+        chunk (list): Пари (номер рядка, поля або текст помилки).
+    Returns:
+        list: Трійки (номер рядка, запис або None, помилка або None). Запис - кортеж
+        (name, address, phone, email, birthday_ordinal, phone_key, email_key).
+    """
+    results = []
+    for row_number, fields in chunk:
+        if isinstance(fields, str):
+            results.append((row_number, None, fields))
+            continue
+        name, address, phone, email, birthday = (field.strip() for field in fields)
+        name = ' '.join(name.split())
+        if not name:
+            error = "Не вказано ім'я."
+        elif not PHONE_PATTERN.fullmatch(phone):
+            error = f"Некоректний формат номера телефону: {phone}"
+        elif not EMAIL_PATTERN.match(email):
+            error = f"Некоректна електронна пошта: {email}"
+        elif not birthday:
+            error = "Не вказано дату народження."
+        else:
+            try:
+                birthday_date = parse_birthday(birthday)
+            except (ValueError, OverflowError):
+                error = f"Некоректна дата народження: {birthday}"
+            else:
+                results.append((row_number, (name, ' '.join(address.split()), phone, email, birthday_date.toordinal(),
+                                             normalize_phone(phone), normalize_email(email)), None))
+                continue
+        results.append((row_number, None, error))
+    return results
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def validate_rows(rows, workers=None, chunk_size=5000):
+    """
+    Перевіряє рядки порціями в пулі процесів, зберігаючи порядок рядків. У роботі одночасно
+    перебуває не більше двох порцій на процес, тож пам'ять не залежить від розміру файлу.
+    Файли з однієї порції перевіряються в поточному процесі: запуск пулу коштував би більше.
+    Args:
+        rows (iterable): Пари (номер рядка, поля або текст помилки).
+        workers (int, optional): Кількість процесів. За замовчуванням - кількість ядер; 1 - без пулу.
+        chunk_size (int, optional): Кількість рядків у порції.
+    Yields:
+        tuple: (номер рядка, запис або None, помилка або None), див. validate_chunk.
+    """
+    workers = workers or os.cpu_count() or 1
+    chunks = chunked(rows, chunk_size)
+    first = next(chunks, None)
+    second = next(chunks, None)
+    if second is None or workers == 1:
+        for chunk in filter(None, (first, second)):
+            yield from validate_chunk(chunk)
+        for chunk in chunks:
+            yield from validate_chunk(chunk)
+        return
+
+    # multiprocessing імпортується лише під час імпорту великих файлів
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque([pool.submit(validate_chunk, first), pool.submit(validate_chunk, second)])
+        for chunk in chunks:
+            if len(pending) >= workers * 2:
+                yield from pending.popleft().result()
+            pending.append(pool.submit(validate_chunk, chunk))
+        while pending:
+            yield from pending.popleft().result()
+
+
+def read_contacts(path, fmt=None, workers=None, chunk_size=5000):
+    """
+    Потоково читає, перевіряє та нормалізує контакти з файлу CSV, vCard або JSON Lines.
+    Yields:
+        tuple: (номер рядка, запис або None, помилка або None), див. validate_chunk.
+    """
+    return validate_rows(READERS[detect_format(path, fmt)](path), workers, chunk_size)
+
+
+# Експорт: генератори фрагментів тексту по EXPORT_CHUNK контактів
+def export_csv(contacts):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator='\n')
+    writer.writerow(FIELDS)
+    format_birthday = ContactJournalStorage.format_birthday
+    for chunk in chunked(contacts, EXPORT_CHUNK):
+        writer.writerows((contact.name, contact.address, contact.phone, contact.email,
+                          format_birthday(contact.birthday)) for contact in chunk)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()
+
+
+def export_jsonl(contacts):
+    format_birthday = ContactJournalStorage.format_birthday
+    for chunk in chunked(contacts, EXPORT_CHUNK):
+        yield ''.join(json.dumps({'name': contact.name, 'address': contact.address, 'phone': contact.phone,
+                                  'email': contact.email, 'birthday': format_birthday(contact.birthday)},
+                                 ensure_ascii=False) + '\n' for contact in chunk)
+
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace(',', '\\,').replace(';', '\\;').replace('\n', '\\n')
+
+
+def export_vcard(contacts):
+    def card(contact):
+        first, _, last = contact.name.partition(' ')
+        return (f'BEGIN:VCARD\r\nVERSION:3.0\r\nFN:{_escape(contact.name)}\r\n'
+                f'N:{_escape(last)};{_escape(first)};;;\r\nADR:;;{_escape(contact.address)};;;;\r\n'
+                f'TEL:{contact.phone}\r\nEMAIL:{contact.email}\r\nBDAY:{contact.birthday.isoformat()}\r\nEND:VCARD\r\n')
+
+    for chunk in chunked(contacts, EXPORT_CHUNK):
+        yield ''.join(map(card, chunk))
+
+
+EXPORTERS = {'csv': export_csv, 'jsonl': export_jsonl, 'vcard': export_vcard}
+
+
+def write_contacts(path, contacts, fmt=None):
+    """
+    Записує контакти у файл потоково: у пам'яті одночасно лише один фрагмент тексту.
+    Файл пишеться поруч і атомарно підміняє старий.
+    Returns:
+        int: Кількість записаних байтів.
+    """
+    exporter = EXPORTERS[detect_format(path, fmt)]
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w', newline='', encoding='UTF-8') as fh:
+        fh.writelines(exporter(contacts))
+        written = fh.tell()
+    os.replace(tmp_path, path)
+    return written
+
+
+def write_error_report(path, errors):
+    """
+    Записує звіт про рядки, які не вдалося імпортувати: номер рядка та причина.
+    """
+    with open(path, 'w', newline='', encoding='UTF-8') as fh:
+        writer = csv.writer(fh)
+        writer.writerow(('row', 'error'))
+        writer.writerows(errors)
@@ -0,0 +1,106 @@
+import os
+import sys
+import time
+import struct
+import select
+import ctypes
+import ctypes.util
+
+
+# Результат read, коли події втрачено: папку потрібно відсортувати повністю, а не за іменами
+RESCAN = None
+
+
+class InotifyWatcher:
+    """
+    Спостерігач за папкою через Linux inotify. Повідомляє імена файлів, які дописано
+    (IN_CLOSE_WRITE) або переміщено в папку (IN_MOVED_TO). Якщо черга подій ядра
+    переповнилась (IN_Q_OVERFLOW), частину подій втрачено, і read повертає RESCAN.
+    """
+
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_TO = 0x00000080
+    IN_Q_OVERFLOW = 0x00004000
+    IN_ISDIR = 0x40000000
+    EVENT_HEADER = struct.Struct('iIII')
+
+    def __init__(self, path):
+        libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        self.fd = libc.inotify_init()
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init failed')
+        watch = libc.inotify_add_watch(self.fd, os.fsencode(path), self.IN_CLOSE_WRITE | self.IN_MOVED_TO)
+        if watch < 0:
+            error = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(error, f'inotify_add_watch failed for {path}')
+
+    def read(self, timeout):
+        """
+        Чекає на події не довше timeout секунд.
+        Returns:
+            set or None: Імена файлів, що з'явились або змінились, або RESCAN, якщо події
+            втрачено і папку треба переглянути повністю.
+        """
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set()
+        data = os.read(self.fd, 64 * 1024)
+        names = set()
+        offset = 0
+        while offset < len(data):
+            _, mask, _, length = self.EVENT_HEADER.unpack_from(data, offset)
+            offset += self.EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b'\0')
+            offset += length
+            if mask & self.IN_Q_OVERFLOW:
+                return RESCAN
+            if name and not mask & self.IN_ISDIR:
+                names.add(os.fsdecode(name))
+        return names
+
+    def close(self):
+        os.close(self.fd)
+
+
+class PollingWatcher:
+    """
+    Запасний спостерігач для систем без inotify: періодично переглядає папку
+    і повідомляє файли, що з'явились або змінили розмір чи час зміни.
+    """
+
+    def __init__(self, path, interval=1.0):
+        self.path = path
+        self.interval = interval
+        self._seen = self._snapshot()
+
+    def _snapshot(self):
+        snapshot = {}
+        with os.scandir(self.path) as entries:
+            for entry in entries:
+                if entry.is_file(follow_symlinks=False):
+                    stat = entry.stat(follow_symlinks=False)
+                    snapshot[entry.name] = (stat.st_size, stat.st_mtime_ns)
+        return snapshot
+
+    def read(self, timeout):
+        time.sleep(min(timeout, self.interval))
+        snapshot = self._snapshot()
+        names = {name for name, state in snapshot.items() if self._seen.get(name) != state}
+        self._seen = snapshot
+        return names
+
+    def close(self):
+        pass
+
+
+def make_watcher(path, poll_interval=1.0):
+    """
+    Створює спостерігач inotify на Linux або спостерігач з опитуванням на інших системах.
+    """
+    if sys.platform.startswith('linux'):
+        try:
+            return InotifyWatcher(path)
+        except (OSError, AttributeError):
+            pass
+    return PollingWatcher(path, poll_interval)
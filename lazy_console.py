@@ -0,0 +1,25 @@
+class LazyConsole:
+    """
+    Замінник rich.console.Console, який імпортує rich і створює справжню консоль
+    лише під час першого звернення. Імпорт rich займає помітну частину часу запуску,
+    а для завантаження даних і неінтерактивних команд він не потрібен.
+    """
+
+    __slots__ = ('_console', '_kwargs')
+
+    def __init__(self, **kwargs):
+        """
+        Args:
+            **kwargs: Аргументи для rich.console.Console.
+        """
+        self._console = None
+        self._kwargs = kwargs
+
+    def _get(self):
+        if self._console is None:
+            from rich.console import Console
+            self._console = Console(**self._kwargs)
+        return self._console
+
+    def __getattr__(self, name):
+        return getattr(self._get(), name)
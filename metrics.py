@@ -0,0 +1,312 @@
+import os
+import atexit
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from lazy_console import LazyConsole
+
+console = LazyConsole()
+
+# Межі кошиків гістограм: затримки в секундах і кількість переглянутих записів
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (1, 10, 100, 1_000, 10_000, 100_000, 1_000_000)
+
+PROMETHEUS_PREFIX = 'assistant'
+EXPORT_INTERVAL = 15.0
+
+
+class Histogram:
+    """
+    Гістограма з фіксованими межами кошиків, як у Prometheus: кількість спостережень
+    у кожному кошику, їх сума та максимум. Квантилі оцінюються за межами кошиків.
+    """
+
+    __slots__ = ('bounds', 'counts', 'total', 'count', 'max')
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.total = 0
+        self.count = 0
+        self.max = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.total += value
+        self.count += 1
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q):
+        """
+        Returns:
+            float: Верхня межа кошика, в який потрапляє квантиль q (для останнього кошика - максимум).
+        """
+        rank = q * self.count
+        cumulative = 0
+        for bound, count in zip(self.bounds, self.counts):
+            cumulative += count
+            if cumulative >= rank:
+                return min(bound, self.max)
+        return self.max
+
+
+class Metrics:
+    """
+    Збирач статистики роботи помічника: кількість і тривалість операцій (гістограми затримок),
+    байти, прочитані та записані сховищами, і кількість записів, переглянутих запитами.
+
+    Вимкнений збирач нічого не обгортає і не рахує: усі методи повертаються одразу,
+    тож без ASSISTANT_METRICS гарячі шляхи працюють як раніше.
+    """
+
+    def __init__(self, enabled=False):
+        """
+        Args:
+            enabled (bool, optional): Чи збирати статистику. За замовчуванням - False.
+        """
+        self.enabled = enabled
+        self.started = time.time()
+        self._lock = threading.Lock()
+        # (назва метрики, мітка) -> Histogram або число
+        self.histograms = {}
+        self.counters = {}
+        self._exporter = None
+
+    def observe(self, metric, label, value, bounds=LATENCY_BUCKETS):
+        if not self.enabled:
+            return
+        with self._lock:
+            histogram = self.histograms.get((metric, label))
+            if histogram is None:
+                histogram = self.histograms[(metric, label)] = Histogram(bounds)
+            histogram.observe(value)
+
+    def add(self, metric, label, value=1):
+        if not self.enabled:
+            return
+        with self._lock:
+            self.counters[(metric, label)] = self.counters.get((metric, label), 0) + value
+
+    def bytes_read(self, file, count):
+        self.add('bytes_read', file, count)
+
+    def bytes_written(self, file, count):
+        self.add('bytes_written', file, count)
+
+    def records_scanned(self, query, count):
+        self.observe('records_scanned', query, count, SIZE_BUCKETS)
+
+    @contextmanager
+    def timer(self, operation):
+        """
+        Вимірює тривалість блоку коду як операцію operation.
+        """
+        if not self.enabled:
+            yield
+            return
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe('operation_seconds', operation, time.perf_counter() - started)
+
+    def wrap(self, func, operation):
+        """
+        Returns:
+            callable: func, тривалість кожного виклику якої записується як операція operation.
+        """
+        @wraps(func)
+        def timed(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.observe('operation_seconds', operation, time.perf_counter() - started)
+        return timed
+
+    def instrument(self, obj, names, prefix):
+        """
+        Замінює методи об'єкта обгортками, що вимірюють тривалість викликів.
+        Обгортки ставляться на екземпляр, тож внутрішні виклики self.method теж вимірюються.
+        Args:
+            obj (object): Фасад або менеджер.
+            names (iterable): Назви методів.
+            prefix (str): Префікс назви операції, наприклад 'contacts'.
+        """
+        if not self.enabled:
+            return
+        for name in names:
+            setattr(obj, name, self.wrap(getattr(obj, name), f'{prefix}.{name}'))
+
+    def snapshot(self):
+        """
+        Returns:
+            tuple: Копії гістограм і лічильників, узгоджені між собою.
+        """
+        with self._lock:
+            histograms = {}
+            for key, histogram in self.histograms.items():
+                copy = Histogram(histogram.bounds)
+                copy.counts, copy.total, copy.count, copy.max = (list(histogram.counts), histogram.total,
+                                                                 histogram.count, histogram.max)
+                histograms[key] = copy
+            return histograms, dict(self.counters)
+
+    def show(self):
+        """
+        Виводить статистику в консоль таблицями.
+        """
+        if not self.enabled:
+            console.print("[yellow]Збір статистики вимкнено. Запустіть помічника з ASSISTANT_METRICS=1.[/yellow]")
+            return
+        from rich.table import Table
+
+        histograms, counters = self.snapshot()
+        table = Table(title=f"Операції за {time.time() - self.started:.0f} с")
+        for column in ("Операція", "Кількість", "Середнє, мс", "p50, мс", "p99, мс", "Макс, мс"):
+            table.add_column(column, justify="left" if column == "Операція" else "right")
+        for (metric, operation), histogram in sorted(histograms.items()):
+            if metric != 'operation_seconds':
+                continue
+            table.add_row(operation, str(histogram.count), f"{histogram.total / histogram.count * 1e3:.2f}",
+                          f"≤{histogram.quantile(0.5) * 1e3:.2f}", f"≤{histogram.quantile(0.99) * 1e3:.2f}",
+                          f"{histogram.max * 1e3:.2f}")
+        console.print(table)
+
+        table = Table(title="Переглянуті записи на запит")
+        for column in ("Запит", "Запитів", "Середнє", "p99", "Макс"):
+            table.add_column(column, justify="left" if column == "Запит" else "right")
+        for (metric, query), histogram in sorted(histograms.items()):
+            if metric != 'records_scanned':
+                continue
+            table.add_row(query, str(histogram.count), f"{histogram.total / histogram.count:.1f}",
+                          f"≤{histogram.quantile(0.99):.0f}", str(histogram.max))
+        console.print(table)
+
+        table = Table(title="Лічильники")
+        for column in ("Лічильник", "Мітка", "Значення"):
+            table.add_column(column, justify="right" if column == "Значення" else "left")
+        for (metric, label), value in sorted(counters.items()):
+            table.add_row(metric, label, str(value))
+        console.print(table)
+
+    def prometheus(self):
+        """
+        Returns:
+            str: Статистика у текстовому форматі Prometheus.
+        """
+        histograms, counters = self.snapshot()
+        lines = [f'# TYPE {PROMETHEUS_PREFIX}_uptime_seconds gauge',
+                 f'{PROMETHEUS_PREFIX}_uptime_seconds {time.time() - self.started:.3f}']
+        label_names = {'operation_seconds': 'operation', 'records_scanned': 'query',
+                       'bytes_read': 'file', 'bytes_written': 'file', 'commands': 'command'}
+
+        declared = set()
+        for (metric, label), histogram in sorted(histograms.items()):
+            name = f'{PROMETHEUS_PREFIX}_{metric}'
+            if name not in declared:
+                declared.add(name)
+                lines.append(f'# TYPE {name} histogram')
+            labels = f'{label_names.get(metric, "label")}="{_escape(label)}"'
+            cumulative = 0
+            for bound, count in zip(histogram.bounds, histogram.counts):
+                cumulative += count
+                lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {histogram.count}')
+            lines.append(f'{name}_sum{{{labels}}} {histogram.total}')
+            lines.append(f'{name}_count{{{labels}}} {histogram.count}')
+
+        for (metric, label), value in sorted(counters.items()):
+            name = f'{PROMETHEUS_PREFIX}_{metric}_total'
+            if name not in declared:
+                declared.add(name)
+                lines.append(f'# TYPE {name} counter')
+            lines.append(f'{name}{{{label_names.get(metric, "label")}="{_escape(label)}"}} {value}')
+        return '\n'.join(lines) + '\n'
+
+    def export(self, path):
+        """
+        Атомарно записує статистику у файл у форматі Prometheus (для textfile-колектора).
+        """
+        tmp_path = f'{path}.tmp'
+        try:
+            with open(tmp_path, 'w', encoding='UTF-8') as fh:
+                fh.write(self.prometheus())
+            os.replace(tmp_path, path)
+        except OSError as error:
+            console.print(f"[bold red]Помилка:[/bold red] Не вдалося записати статистику у '{path}': {error}")
+
+    def start_export(self, path, interval=EXPORT_INTERVAL):
+        """
+        Періодично оновлює файл статистики у фоновому потоці і записує його під час завершення.
+        """
+        if not self.enabled or self._exporter is not None:
+            return
+        stop = threading.Event()
+
+        def run():
+            while not stop.wait(interval):
+                self.export(path)
+
+        self._exporter = threading.Thread(target=run, name='metrics-export', daemon=True)
+        self._exporter.start()
+
+        def final_export():
+            stop.set()
+            self.export(path)
+        atexit.register(final_export)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def start_profiling(folder):
+    """
+    Вмикає cProfile і tracemalloc до кінця сеансу. Під час завершення в folder записуються
+    assistant.prof (відкривається pstats або snakeviz), assistant.tracemalloc (знімок пам'яті)
+    та assistant-memory.txt (30 місць, що виділили найбільше пам'яті).
+    cProfile профілює основний потік; фонові потоки видно лише в знімку пам'яті.
+    Args:
+        folder (str): Папка для результатів.
+    """
+    import cProfile
+    import tracemalloc
+
+    os.makedirs(folder, exist_ok=True)
+    tracemalloc.start(25)
+    profiler = cProfile.Profile()
+    profiler.enable()
+
+    def save():
+        profiler.disable()
+        profiler.dump_stats(os.path.join(folder, 'assistant.prof'))
+        snapshot = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+        snapshot.dump(os.path.join(folder, 'assistant.tracemalloc'))
+        with open(os.path.join(folder, 'assistant-memory.txt'), 'w', encoding='UTF-8') as fh:
+            for statistic in snapshot.statistics('lineno')[:30]:
+                fh.write(f'{statistic}\n')
+        print(f"Профіль сеансу збережено в '{folder}'.")
+    atexit.register(save)
+
+
+def start_from_env():
+    """
+    Запускає експорт статистики і профілювання відповідно до змінних середовища:
+    ASSISTANT_METRICS_FILE - файл для статистики у форматі Prometheus,
+    ASSISTANT_PROFILE - папка для профілю сеансу ('1' - поточна папка).
+    """
+    path = os.environ.get('ASSISTANT_METRICS_FILE')
+    if path:
+        metrics.start_export(path)
+    profile = os.environ.get('ASSISTANT_PROFILE')
+    if profile:
+        start_profiling('.' if profile == '1' else profile)
+
+
+# Статистика збирається лише на вимогу: ASSISTANT_METRICS=1 або файл експорту ASSISTANT_METRICS_FILE
+metrics = Metrics(enabled=bool(os.environ.get('ASSISTANT_METRICS') or os.environ.get('ASSISTANT_METRICS_FILE')))
@@ -0,0 +1,369 @@
+import os
+import re
+import json
+import math
+import bisect
+from itertools import accumulate
+from metrics import metrics
+
+
+def normalize_tag(tag):
+    """
+    Нормалізує тег для порівняння: без пробілів по краях, без '#' на початку, у нижньому регістрі.
+    Args:
+        tag (str): Тег нотатки або запиту.
+    Returns:
+        str: Ключ тегу в індексі.
+    """
+    return tag.strip().lstrip('#').casefold()
+
+
+class TagIndex:
+    """
+    Інвертований індекс тегів: відсортований список тегів та відсортовані списки ідентифікаторів
+    нотаток (posting lists) для кожного тегу. Оновлюється інкрементально при зміні нотаток;
+    нові нотатки мають найбільший id, тож вставка в posting list зазвичай дописує в кінець.
+
+    Для посторінкового перегляду за тегами (page) індекс рахує пари тег-нотатка і тримає
+    накопичені кількості нотаток за тегами: сторінка знаходиться двійковим пошуком за ними,
+    а не переглядом усіх попередніх рядків.
+    """
+
+    def __init__(self):
+        self._postings = {}
+        self._sorted_tags = []
+        self._display = {}
+        self._note_tags = {}
+        self._pairs = 0
+        # Накопичені кількості нотаток за _sorted_tags; будуються при першому запиті сторінки після змін
+        self._cumulative = None
+
+    def build(self, notes):
+        self._postings = {}
+        self._display = {}
+        self._note_tags = {}
+        self._cumulative = None
+        for note in notes:
+            keys = set()
+            for tag in note.tags:
+                key = normalize_tag(tag)
+                if not key:
+                    continue
+                if key not in keys:
+                    keys.add(key)
+                    self._postings.setdefault(key, []).append(note.id)
+                    self._display.setdefault(key, tag.strip())
+            self._note_tags[note.id] = keys
+        for postings in self._postings.values():
+            postings.sort()
+        self._sorted_tags = sorted(self._postings)
+        self._pairs = sum(len(keys) for keys in self._note_tags.values())
+
+    def add(self, note):
+        keys = set()
+        for tag in note.tags:
+            key = normalize_tag(tag)
+            if not key:
+                continue
+            if key in keys:
+                continue
+            keys.add(key)
+            postings = self._postings.get(key)
+            if postings is None:
+                postings = self._postings[key] = []
+                self._display[key] = tag.strip()
+                bisect.insort(self._sorted_tags, key)
+            bisect.insort(postings, note.id)
+        self._note_tags[note.id] = keys
+        self._pairs += len(keys)
+        self._cumulative = None
+
+    def remove(self, note_id):
+        keys = self._note_tags.pop(note_id, ())
+        self._pairs -= len(keys)
+        if keys:
+            self._cumulative = None
+        for key in keys:
+            postings = self._postings[key]
+            position = bisect.bisect_left(postings, note_id)
+            if position < len(postings) and postings[position] == note_id:
+                del postings[position]
+            if not postings:
+                del self._postings[key]
+                del self._display[key]
+                del self._sorted_tags[bisect.bisect_left(self._sorted_tags, key)]
+
+    def exact(self, tag):
+        """
+        Returns:
+            set: Ідентифікатори нотаток з точно таким тегом.
+        """
+        return set(self._postings.get(normalize_tag(tag), ()))
+
+    def prefix(self, prefix):
+        """
+        Returns:
+            set: Ідентифікатори нотаток, хоча б один тег яких починається з префікса.
+        """
+        prefix = normalize_tag(prefix)
+        result = set()
+        position = bisect.bisect_left(self._sorted_tags, prefix)
+        while position < len(self._sorted_tags) and self._sorted_tags[position].startswith(prefix):
+            result.update(self._postings[self._sorted_tags[position]])
+            position += 1
+        return result
+
+    def substring(self, fragment):
+        """
+        Пошук за частиною тегу, як до появи індексу. Переглядає лише список різних тегів,
+        а не теги кожної нотатки.
+        Returns:
+            set: Ідентифікатори нотаток, хоча б один тег яких містить фрагмент.
+        """
+        fragment = normalize_tag(fragment)
+        result = set()
+        for key in self._sorted_tags:
+            if fragment in key:
+                result.update(self._postings[key])
+        return result
+
+    def query(self, tags, mode='and', prefix=False, substring=False):
+        """
+        Шукає нотатки за кількома тегами перетином (AND) або об'єднанням (OR) posting lists.
+        Args:
+            tags (list): Теги запиту.
+            mode (str, optional): 'and' або 'or'. За замовчуванням - 'and'.
+            prefix (bool, optional): Порівнювати теги за префіксом. За замовчуванням - False.
+            substring (bool, optional): Шукати теги, що містять тег запиту. За замовчуванням - False.
+        Returns:
+            set: Ідентифікатори знайдених нотаток.
+        """
+        lookup = self.substring if substring else self.prefix if prefix else self.exact
+        postings = [lookup(tag) for tag in tags if normalize_tag(tag)]
+        if not postings:
+            return set()
+        metrics.records_scanned('notes.tag_search', sum(len(posting) for posting in postings))
+        if mode == 'or':
+            return set().union(*postings)
+        postings.sort(key=len)
+        result = postings[0]
+        for posting in postings[1:]:
+            result &= posting
+            if not result:
+                break
+        return result
+
+    @property
+    def total(self):
+        """
+        Кількість пар тег-нотатка (рядків таблиці нотаток, відсортованих за тегами).
+        """
+        return self._pairs
+
+    def page(self, offset, limit):
+        """
+        Повертає рядки offset..offset+limit переліку нотаток у порядку тегів.
+        Теги перед сторінкою пропускаються цілком за накопиченими кількостями.
+        Returns:
+            list: Пари (тег, ідентифікатор нотатки).
+        """
+        if self._cumulative is None:
+            self._cumulative = list(accumulate(len(self._postings[key]) for key in self._sorted_tags))
+        position = bisect.bisect_right(self._cumulative, offset)
+        skip = offset - (self._cumulative[position - 1] if position else 0)
+        rows = []
+        while position < len(self._sorted_tags) and len(rows) < limit:
+            key = self._sorted_tags[position]
+            note_ids = self._postings[key][skip:skip + limit - len(rows)]
+            rows.extend((self._display[key], note_id) for note_id in note_ids)
+            skip = 0
+            position += 1
+        return rows
+
+
+_TOKEN = re.compile(r'\w+')
+
+
+def tokenize(text):
+    """
+    Розбиває текст на слова з урахуванням Unicode (кирилиця, латиниця, цифри).
+    Args:
+        text (str): Текст нотатки або запиту.
+    Returns:
+        list: Слова у нижньому регістрі в порядку появи.
+    """
+    return _TOKEN.findall(text.casefold())
+
+
+class FullTextIndex:
+    """
+    Повнотекстовий індекс нотаток з позиційними posting lists та ранжуванням BM25.
+    Підтримує пошук за словами, префіксами слів та фразами, оновлюється інкрементально
+    і зберігається у файл поруч із нотатками, щоб не перебудовуватися при кожному запуску.
+    """
+
+    VERSION = 1
+    K1 = 1.2
+    B = 0.75
+
+    def __init__(self):
+        self._postings = {}
+        self._terms = []
+        self._doc_lengths = {}
+        self._total_length = 0
+
+    def __len__(self):
+        return len(self._doc_lengths)
+
+    def build(self, notes):
+        self._postings = {}
+        self._doc_lengths = {}
+        self._total_length = 0
+        for note in notes:
+            self._add_postings(note)
+        self._terms = sorted(self._postings)
+
+    def _add_postings(self, note):
+        tokens = tokenize(note.text)
+        new_terms = []
+        for position, term in enumerate(tokens):
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = {}
+                new_terms.append(term)
+            postings.setdefault(note.id, []).append(position)
+        self._doc_lengths[note.id] = len(tokens)
+        self._total_length += len(tokens)
+        return new_terms
+
+    def add(self, note):
+        for term in self._add_postings(note):
+            bisect.insort(self._terms, term)
+
+    def remove(self, note):
+        """
+        Видаляє нотатку з індексу. Викликається до зміни тексту нотатки.
+        """
+        length = self._doc_lengths.pop(note.id, None)
+        if length is None:
+            return
+        self._total_length -= length
+        for term in set(tokenize(note.text)):
+            postings = self._postings.get(term)
+            if postings is None:
+                continue
+            postings.pop(note.id, None)
+            if not postings:
+                del self._postings[term]
+                del self._terms[bisect.bisect_left(self._terms, term)]
+
+    def _expand(self, term):
+        position = bisect.bisect_left(self._terms, term)
+        while position < len(self._terms) and self._terms[position].startswith(term):
+            yield self._terms[position]
+            position += 1
+
+    def _bm25(self, term, scores, candidates=None):
+        postings = self._postings.get(term)
+        if not postings:
+            return
+        docs_count = len(self._doc_lengths)
+        average_length = self._total_length / docs_count if docs_count else 0
+        idf = math.log(1 + (docs_count - len(postings) + 0.5) / (len(postings) + 0.5))
+        for note_id, positions in postings.items():
+            if candidates is not None and note_id not in candidates:
+                continue
+            tf = len(positions)
+            norm = self.K1 * (1 - self.B + self.B * self._doc_lengths[note_id] / (average_length or 1))
+            scores[note_id] = scores.get(note_id, 0.0) + idf * tf * (self.K1 + 1) / (tf + norm)
+
+    def _phrase(self, terms):
+        postings = [self._postings.get(term) for term in terms]
+        if not all(postings):
+            return set()
+        candidates = set.intersection(*(set(posting) for posting in sorted(postings, key=len)))
+        matches = set()
+        for note_id in candidates:
+            starts = set(postings[0][note_id])
+            for offset, posting in enumerate(postings[1:], start=1):
+                starts &= {position - offset for position in posting[note_id]}
+                if not starts:
+                    break
+            if starts:
+                matches.add(note_id)
+        return matches
+
+    def search(self, query, limit=None, prefix=False):
+        """
+        Шукає нотатки за запитом. Запит у лапках шукається як фраза (слова поспіль),
+        інакше нотатки ранжуються за BM25 по всіх словах запиту.
+        Args:
+            query (str): Пошуковий запит.
+            limit (int, optional): Максимальна кількість результатів. За замовчуванням - без обмеження.
+            prefix (bool, optional): Вважати кожне слово запиту префіксом. За замовчуванням - False.
+        Returns:
+            list: Ідентифікатори нотаток, від найрелевантніших.
+        """
+        stripped = query.strip()
+        terms = tokenize(stripped)
+        if not terms:
+            return []
+        scores = {}
+        if len(stripped) > 1 and stripped.startswith('"') and stripped.endswith('"'):
+            candidates = self._phrase(terms)
+            for term in set(terms):
+                self._bm25(term, scores, candidates)
+        else:
+            for term in set(terms):
+                for expanded in (self._expand(term) if prefix else (term,)):
+                    self._bm25(expanded, scores)
+        metrics.records_scanned('notes.text_search', len(scores))
+        ranked = sorted(scores, key=lambda note_id: (-scores[note_id], note_id))
+        return ranked[:limit] if limit is not None else ranked
+
+    def save(self, index_path, notes, signature):
+        """
+        Зберігає індекс у файл. Ідентифікатори нотаток замінюються їх порядковими номерами
+        (з 1), під якими нотатки отримають id при наступному завантаженні.
+        Args:
+            index_path (str): Шлях до файлу індексу.
+            notes (list): Нотатки в тому порядку, в якому вони збережені.
+            signature (list): Підпис нотаток (NotesStorage.signature).
+        """
+        positions = {note.id: position for position, note in enumerate(notes, start=1)}
+        data = {
+            'version': self.VERSION,
+            'signature': signature,
+            'doc_lengths': {positions[note_id]: length for note_id, length in self._doc_lengths.items()},
+            'postings': {term: {positions[note_id]: note_positions for note_id, note_positions in postings.items()}
+                         for term, postings in self._postings.items()},
+        }
+        tmp_path = f'{index_path}.tmp'
+        with open(tmp_path, 'w', encoding='UTF-8') as fh:
+            json.dump(data, fh, ensure_ascii=False, separators=(',', ':'))
+            written = fh.tell()
+        os.replace(tmp_path, index_path)
+        metrics.bytes_written(os.path.basename(index_path), written)
+
+    def load(self, index_path, signature):
+        """
+        Завантажує індекс з файлу, якщо він збережений для тієї ж версії файлу нотаток.
+        Returns:
+            bool: True, якщо індекс завантажено, False - якщо його потрібно перебудувати.
+        """
+        if signature is None or not os.path.exists(index_path):
+            return False
+        try:
+            with open(index_path, encoding='UTF-8') as fh:
+                data = json.load(fh)
+        except (OSError, ValueError):
+            return False
+        if data.get('version') != self.VERSION or data.get('signature') != signature:
+            return False
+        metrics.bytes_read(os.path.basename(index_path), os.path.getsize(index_path))
+        self._doc_lengths = {int(note_id): length for note_id, length in data['doc_lengths'].items()}
+        self._total_length = sum(self._doc_lengths.values())
+        self._postings = {term: {int(note_id): positions for note_id, positions in postings.items()}
+                          for term, postings in data['postings'].items()}
+        self._terms = sorted(self._postings)
+        return True
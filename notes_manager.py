@@ -1,14 +1,18 @@
-import os
-import csv
-from rich.console import Console
-from rich.table import Table
-from rich.text import Text
 from abc import ABC, abstractmethod
+from notes_storage import CsvNotesStorage, SqliteNotesStorage
+from autosave import Autosaver
+from notes_index import TagIndex, FullTextIndex
+from table_view import PagedTable
+from lazy_console import LazyConsole
+from metrics import metrics
 
-console = Console()
+console = LazyConsole()
 
 class AbstractNote(ABC):
-    def __init__(self, text, tags=None):
+    __slots__ = ('id', 'text', 'tags')
+
+    def __init__(self, text, tags=None, id=None):
+        self.id = id
         self.text = text
         self.tags = tags or []
 
@@ -17,40 +21,174 @@ class AbstractNote(ABC):
         pass
 
 class Note(AbstractNote):
+    __slots__ = ()
+
     def display(self):
         print(f"Note: {self.text}, Tags: {', '.join(self.tags)}")
 
 class NotesManager:
-    def __init__(self, file_path='notes.csv'):
+    def __init__(self, file_path='notes.csv', storage=None, autosave_delay=1.0, history=None):
+        """
+        Args:
+            file_path (str, optional): Шлях до файлу нотаток. За замовчуванням - 'notes.csv'.
+            storage (NotesStorage, optional): Сховище нотаток. За замовчуванням - CSV-файл file_path.
+            autosave_delay (float, optional): Період тиші перед фоновим збереженням змін, секунди.
+            history (UndoHistory, optional): Історія змін для скасування. За замовчуванням - без історії.
+        """
         self.file_path = file_path
-        self.notes = self.load_notes()
-        self.console = Console()
+        self.history = history
+        self.storage = storage or CsvNotesStorage(file_path)
+        with metrics.timer('notes.load'):
+            self.notes = self.load_notes()
+            self.console = console
+            self._tag_index = TagIndex()
+            self._text_index = FullTextIndex()
+            self.index_path = f'{self.storage.file_path}.idx'
+            self._rebuild_indexes()
+        self._autosave = Autosaver(self._save_notes, autosave_delay, name='notes-autosave')
+
+    def _rebuild_indexes(self):
+        """
+        Будує індекси нотаток заново одним проходом.
+        """
+        self._notes_by_id = {note.id: note for note in self.notes}
+        self._next_id = max(self._notes_by_id, default=0) + 1
+        self._tag_index.build(self.notes)
+        # Повнотекстовий індекс читається з файлу, якщо той збережений для поточної версії нотаток
+        signature = self.storage.signature()
+        if self._text_index.load(self.index_path, signature):
+            self._text_index_signature = signature
+            self._text_index_dirty = False
+        else:
+            self._text_index.build(self.notes)
+            self._text_index_signature = None
+            self._text_index_dirty = True
+
+    # Кожна зміна нотаток проходить через індекси, тож тут же нотатки позначаються для фонового збереження
+    def _index_note(self, note):
+        self._text_index_dirty = True
+        self._autosave.mark_dirty()
+        self._notes_by_id[note.id] = note
+        self._tag_index.add(note)
+        self._text_index.add(note)
+
+    def _unindex_note(self, note):
+        self._text_index_dirty = True
+        self._autosave.mark_dirty()
+        self._notes_by_id.pop(note.id, None)
+        self._tag_index.remove(note.id)
+        self._text_index.remove(note)
+
+    @staticmethod
+    def note_state(note):
+        """
+        Returns:
+            tuple: Незмінний знімок нотатки для історії змін.
+        """
+        return (note.text, tuple(note.tags))
+
+    def _record(self, note_id, before, after):
+        if self.history is not None:
+            self.history.record(self, note_id, before, after)
+
+    def restore(self, changes):
+        """
+        Відновлює нотатки до знімків з історії змін (скасування або повторення).
+        Args:
+            changes (list): Пари (id нотатки, знімок або None - нотатки не має бути).
+        """
+        removed = set()
+        added = []
+        for note_id, state in changes:
+            note = self._notes_by_id.get(note_id)
+            if state is None:
+                if note is not None:
+                    self._unindex_note(note)
+                    removed.add(note_id)
+                continue
+            text, tags = state
+            if note is None:
+                note = Note(text, list(tags), id=note_id)
+                self._index_note(note)
+                added.append(note)
+                continue
+            self._unindex_note(note)
+            note.text, note.tags = text, list(tags)
+            self._index_note(note)
+        if removed:
+            self.notes = [note for note in self.notes if note.id not in removed]
+        if added:
+            # Нотатки впорядковані за id, тож повернені нотатки стають на свої місця (і номери)
+            self.notes.extend(added)
+            self.notes.sort(key=lambda note: note.id)
+
+    def search_text(self, query, limit=None):
+        """
+        Шукає нотатки за текстом через повнотекстовий індекс. Кожне слово запиту
+        порівнюється як префікс, запит у лапках шукається як фраза.
+        Args:
+            query (str): Пошуковий запит.
+            limit (int, optional): Максимальна кількість результатів. За замовчуванням - без обмеження.
+        Returns:
+            list: Знайдені нотатки, від найрелевантніших.
+        """
+        return [self._notes_by_id[note_id] for note_id in self._text_index.search(query, limit, prefix=True)]
+
+    def get_note(self, note_id):
+        """
+        Returns:
+            Note or None: Нотатка з указаним id або None.
+        """
+        return self._notes_by_id.get(note_id)
+
+    def notes_by_tags(self, tags, mode='and', prefix=False, substring=False):
+        """
+        Шукає нотатки за тегами через інвертований індекс тегів.
+        Args:
+            tags (list): Теги запиту.
+            mode (str, optional): 'and' - нотатка має всі теги, 'or' - хоча б один. За замовчуванням - 'and'.
+            prefix (bool, optional): Порівнювати теги за префіксом. За замовчуванням - False.
+            substring (bool, optional): Шукати теги, що містять тег запиту. За замовчуванням - False.
+        Returns:
+            list: Знайдені нотатки в порядку додавання.
+        """
+        note_ids = self._tag_index.query(tags, mode, prefix, substring)
+        return [self._notes_by_id[note_id] for note_id in sorted(note_ids)]
 
     def dump_notes(self):
-        with open(self.file_path, 'w', newline='\n') as fh:
-            field_names = ['text', 'tags']
-            writer = csv.DictWriter(fh, fieldnames=field_names)
-            writer.writeheader()
-            for note in self.notes:
-                writer.writerow({'text': note.text, 'tags': ', '.join(note.tags)})
+        """
+        Одразу зберігає незбережені нотатки та повнотекстовий індекс. Якщо з попереднього
+        збереження нічого не змінилось, нічого й не записується.
+        """
+        with self._autosave.lock:
+            if self._autosave.dirty or not self.storage.exists():
+                self._autosave.mark_clean()
+                self.storage.save(self.notes)
+            signature = self.storage.signature()
+            if self._text_index_dirty or signature != self._text_index_signature:
+                self._text_index_dirty = False
+                self._text_index.save(self.index_path, self.notes, signature)
+                self._text_index_signature = signature
+
+    def _save_notes(self):
+        # Фонове збереження пише лише нотатки: індекс, який змінюється в основному потоці,
+        # зберігається в dump_notes, а застарілий індекс при запуску просто перебудовується
+        self.storage.save(list(self.notes))
 
     def load_notes(self):
         notes = []
-        if os.path.exists(self.file_path):
-            with open(self.file_path, newline='\n') as fh:
-                reader = csv.DictReader(fh)
-                for row in reader:
-                    text = row['text']
-                    tags = row['tags'].split(', ')
-                    new_note = Note(text, tags)
-                    notes.append(new_note)
+        if self.storage.exists():
+            for note_id, (text, tags) in enumerate(self.storage.load(), start=1):
+                new_note = Note(text, tags, id=note_id)
+                notes.append(new_note)
 
+            # Повідомлення без rich: під час запуску консоль rich ще не потрібна
             if notes:
-                console.print("Нотатки успішно завантажені.")
+                print("Нотатки успішно завантажені.")
             else:
-                console.print("Не вдалося завантажити нотатки або файл порожній.")
+                print("Не вдалося завантажити нотатки або файл порожній.")
         else:
-            console.print(f"Файл '{self.file_path}' не знайдено. Спробуйте створити файл або перевірити шлях.")
+            print(f"Файл '{self.file_path}' не знайдено. Спробуйте створити файл або перевірити шлях.")
         return notes
 
     def add_note(self, text=None, tags=None):
@@ -70,35 +208,78 @@ class NotesManager:
 
             tags = input("Теги (розділіть їх комою): ").split(',')
              # Додавання нової нотатки
-            formatted_tags = [tag.strip() if tag.startswith('#') else f"#{tag.strip()}" for tag in tags]
-            new_note = Note(text, tags=formatted_tags)
-            self.notes.append(new_note)
+            self.create_note(text, tags)
             console.print(f"[green]Нотатка успішно додана.[/green]")
-            self.dump_notes()
+
+    @staticmethod
+    def format_tags(tags):
+        return [tag.strip() if tag.startswith('#') else f"#{tag.strip()}" for tag in tags]
+
+    def create_note(self, text, tags):
+        """
+        Додає одну нотатку без діалогу з користувачем і без збереження у файл.
+        Args:
+            text (str): Текст нотатки.
+            tags (list): Теги нотатки (з '#' або без).
+        Returns:
+            Note: Створена нотатка.
+        """
+        new_note = Note(text, tags=self.format_tags(tags), id=self._next_id)
+        self._next_id += 1
+        self.notes.append(new_note)
+        self._index_note(new_note)
+        self._record(new_note.id, None, self.note_state(new_note))
+        return new_note
+
+    def update_note(self, note_index, text, tags):
+        """
+        Змінює текст і теги нотатки за індексом без діалогу з користувачем.
+        Raises:
+            IndexError: Якщо нотатки з таким індексом немає.
+        """
+        if not 0 <= note_index < len(self.notes):
+            raise IndexError(note_index)
+        note = self.notes[note_index]
+        before = self.note_state(note)
+        self._unindex_note(note)
+        note.text = text
+        note.tags = self.format_tags(tags)
+        self._index_note(note)
+        self._record(note.id, before, self.note_state(note))
+
+    def remove_note(self, note_index):
+        """
+        Видаляє нотатку за індексом без діалогу з користувачем.
+        Returns:
+            Note: Видалена нотатка.
+        Raises:
+            IndexError: Якщо нотатки з таким індексом немає.
+        """
+        if not 0 <= note_index < len(self.notes):
+            raise IndexError(note_index)
+        note = self.notes.pop(note_index)
+        self._unindex_note(note)
+        self._record(note.id, self.note_state(note), None)
+        return note
 
 
-    def list_notes(self):
+    def list_notes(self, page_size=20):
         """
-        Виводить список існуючих нотаток.
+        Виводить список існуючих нотаток посторінково.
+        Args:
+            page_size (int, optional): Кількість нотаток на сторінці. За замовчуванням - 20.
         """
             # Виведення списку нотаток
         if not self.notes:
             console.print("[red]У вас немає жодних нотаток.[/red]")
             return  # Повернення з функції, оскільки немає нотаток для редагування
 
-        table = Table(title="Список нотаток")
-        table.add_column("[blue]Номер[/blue]")
-        table.add_column("[blue]Текст[/blue]")
-        table.add_column("[cyan]Теги[/cyan]")
-
-        for i, note in enumerate(self.notes, start=0):
-            table.add_row(
-                Text(str(i), style="blue"),
-                Text(note.text, style="blue"),
-                Text(", ".join(note.tags), style="cyan")
-            )
+        def fetch_page(offset, limit):
+            return [(str(i), note.text, ", ".join(note.tags))
+                    for i, note in enumerate(self.notes[offset:offset + limit], start=offset)]
 
-        console.print(table, justify="center")
+        PagedTable("Список нотаток", [("Номер", "blue"), ("Текст", "blue"), ("Теги", "cyan")],
+                   fetch_page, len(self.notes), page_size).show()
         console.print(f"[green]Кількість існуючих нотаток: {len(self.notes)}[/green]")
 
 
@@ -110,39 +291,35 @@ class NotesManager:
             text_query (str, optional): Текст для пошуку в нотатках. За замовчуванням - None.
             tag_query (str, optional): Тег для пошуку в нотатках. За замовчуванням - None.
         """
-        specify_query = input(
-            "Введіть слово 'текст' для пошуку за текстом або введіть слово 'тег' для пошуку за тегом: ")
-        if specify_query == 'текст':
-            text_query = input("Введіть текст для пошуку: ")
-        elif specify_query == 'тег':
-            tag_query = input("Введіть тег для пошуку: ")
+        if text_query is None and tag_query is None:
+            specify_query = input(
+                "Введіть слово 'текст' для пошуку за текстом або введіть слово 'тег' для пошуку за тегом: ")
+            if specify_query == 'текст':
+                text_query = input("Введіть текст для пошуку: ")
+            elif specify_query == 'тег':
+                tag_query = input("Введіть тег для пошуку (кілька тегів через кому - усі одразу, через '|' - будь-який з них): ")
 
         matching_notes = []
         if text_query is not None:
-            matching_notes_text = [note for note in self.notes if text_query.lower() in note.text.lower()]
+            matching_notes_text = self.search_text(text_query)
             matching_notes.extend(matching_notes_text)
         if tag_query is not None:
-            matching_notes_tag = [note for note in self.notes if
-                                  any(tag_query.lower() in tag.lower() for tag in note.tags)]
+            if '|' in tag_query:
+                matching_notes_tag = self.notes_by_tags(tag_query.split('|'), mode='or', substring=True)
+            else:
+                matching_notes_tag = self.notes_by_tags(tag_query.split(','), mode='and', substring=True)
             matching_notes.extend(matching_notes_tag)
 
         if matching_notes:
             console.print(f"[bold green]Результати пошуку:[/bold green]")
 
-            # Виведення знайдених нотаток в таблицю
-            table = Table(title="Знайдені нотатки")
-            table.add_column("[cyan]Номер[/cyan]")
-            table.add_column("[blue]Нотатка[/blue]")
-            table.add_column("[green]Теги[/green]")
+            # Виведення знайдених нотаток посторінково, рядки будуються лише для видимої сторінки
+            def fetch_page(offset, limit):
+                return [(str(i), note.text, ", ".join(note.tags))
+                        for i, note in enumerate(matching_notes[offset:offset + limit], start=offset)]
 
-            for i, note in enumerate(matching_notes, start=0):
-                table.add_row(
-                    Text(str(i), style='cyan'),
-                    Text(note.text, style='blue'),
-                    Text(", ".join(note.tags), style='green')
-                )
-
-            console.print(table, justify='center')
+            PagedTable("Знайдені нотатки", [("Номер", "cyan"), ("Нотатка", "blue"), ("Теги", "green")],
+                       fetch_page, len(matching_notes)).show()
 
         else:
             if text_query is None:
@@ -157,21 +334,14 @@ class NotesManager:
             note_index (int): Індекс нотатки для редагування.
         """
         if 0 <= note_index < len(self.notes):
-            # Отримання нотатки за індексом
-            note_to_edit = self.notes[note_index]
-
-            # Редагування тексту нотатки
+            # Редагування тексту і тегів нотатки
             new_text = input("Введіть новий текст нотатки: ")
-            note_to_edit.text = new_text
-
-            # Редагування тегів нотатки
             new_tags = input("Введіть нові теги нотатки (через кому): ").split(",")
-            note_to_edit.tags = [tag.strip() if tag.startswith('#') else f"#{tag.strip()}" for tag in new_tags]
+            self.update_note(note_index, new_text, new_tags)
 
             console.print(f"[green]Нотатка {note_index} успішно відредагована.[/green]")
         else:
             console.print("[red]Невірний індекс нотатки. Спробуйте ще раз.[/red]")
-        self.dump_notes()
 
                 
     def delete_note(self):
@@ -184,7 +354,9 @@ class NotesManager:
         query = console.input("Введіть текст, назву або тег для пошуку: ")
 
         # Пошук нотаток за текстом, назвою або тегом
-        matching_notes = [note for note in self.notes if query.lower() in note.text.lower() or query.lower() in note.tags]
+        matching_notes = self.search_text(query)
+        found_ids = {note.id for note in matching_notes}
+        matching_notes += [note for note in self.notes_by_tags([query]) if note.id not in found_ids]
 
         if matching_notes:
             console.print(f"[bold green]Результати пошуку:[/bold green]")
@@ -202,6 +374,8 @@ class NotesManager:
                 # Видалення вибраної нотатки
                 deleted_note = matching_notes[note_index - 1]
                 self.notes.remove(deleted_note)
+                self._unindex_note(deleted_note)
+                self._record(deleted_note.id, self.note_state(deleted_note), None)
                 console.print(f"[bold green]Нотатка успішно видалена:[/bold green] {deleted_note.text}")
             elif note_index == 0:
                 console.print("[cyan]Видалення скасовано користувачем.[/cyan]")
@@ -209,38 +383,166 @@ class NotesManager:
                 console.print("[red]Введено невірний номер нотатки. Видалення скасовано.[/red]")
         else:
             console.print(f"[red]Немає результатів пошуку для запиту: {query}[/red]")
-        self.dump_notes()
 
 
-    def sort_notes_by_tags(self):
+    def sort_notes_by_tags(self, page_size=20):
         """
-        Сортує нотатки за тегами та виводить результат у вигляді табличного вигляду.
+        Сортує нотатки за тегами та виводить результат посторінково у вигляді таблиці.
         Якщо немає жодних нотаток, виводить повідомлення про відсутність нотаток.
         """
         # Сортування нотаток за тегами
         if not self.notes:
             console.print("Немає нотаток для сортування.")
             return
-        # створюємо словник для нотаток за тегами
-        notes_by_tag_dict = {}  
-        for note in self.notes:
-            for tag in note.tags:
-                if tag not in notes_by_tag_dict:
-                    notes_by_tag_dict[tag] = []
-                # додаємо нотатку до списку за ключем(тегом)
-                notes_by_tag_dict[tag].append(note)
-
-        sorted_tags = sorted(notes_by_tag_dict.keys())
-
-        # відображення нотаток
-        table = Table(title="Сортування нотаток за тегами")
-        table.add_column("[red]Тег[/red]")
-        table.add_column("[green]Текст[/green]")
-
-        for tag in sorted_tags:
-            tag_notes = notes_by_tag_dict[tag]
-            for note in tag_notes:
-                table.add_row(Text(tag, style="red"), Text(note.text, style="green"))
-
-        console.print(table)
-        self.dump_notes()
+        PagedTable("Сортування нотаток за тегами", [("Тег", "red"), ("Текст", "green")],
+                   self._tag_rows, self._tag_rows_total(), page_size).show(justify=None)
+
+    def _tag_rows(self, offset, limit):
+        """
+        Рядки сторінки нотаток, відсортованих за тегами.
+        Returns:
+            list: Пари (тег, текст нотатки).
+        """
+        # індекс знаходить сторінку за кількостями нотаток у тегах, не перебираючи попередні рядки
+        return [(tag, self._notes_by_id[note_id].text) for tag, note_id in self._tag_index.page(offset, limit)]
+
+    def _tag_rows_total(self):
+        return self._tag_index.total
+
+
+class StoredNotes:
+    """
+    Список нотаток SqliteNotesManager: довжина, сторінки та номери нотаток читаються з бази
+    за запитом. Список не змінюється напряму: append, remove і pop лише повторюють інтерфейс
+    list для NotesManager, а записує зміни в базу SqliteNotesManager._index_note/_unindex_note.
+    """
+
+    def __init__(self, storage):
+        self.storage = storage
+
+    def __len__(self):
+        return self.storage.count()
+
+    def __bool__(self):
+        return len(self) > 0
+
+    def __iter__(self):
+        return (Note(text, tags, id=note_id) for note_id, text, tags in self.storage.read_notes())
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                return list(self)[index]
+            return [Note(text, tags, id=note_id)
+                    for note_id, text, tags in self.storage.page(start, max(stop - start, 0))]
+        notes = self.storage.page(index if index >= 0 else len(self) + index, 1)
+        if not notes:
+            raise IndexError(index)
+        note_id, text, tags = notes[0]
+        return Note(text, tags, id=note_id)
+
+    def index(self, note):
+        position = self.storage.position(note.id)
+        if position is None:
+            raise ValueError(f"Нотатки {note.id} немає у списку.")
+        return position
+
+    def append(self, note):
+        pass
+
+    def remove(self, note):
+        pass
+
+    def pop(self, index):
+        return self[index]
+
+
+class SqliteNotesManager(NotesManager):
+    """
+    Нотатки в базі SQLite (ASSISTANT_STORAGE=sqlite).
+
+    Нотатки не завантажуються в пам'ять і не мають індексів у пам'яті: пошук за текстом
+    (FTS5), за тегами, сторінки списку та сортування за тегами виконуються запитами до
+    SqliteNotesStorage, а кожна зміна одразу записується в базу за сталим id нотатки.
+    """
+
+    def __init__(self, storage=None, autosave_delay=1.0, history=None):
+        """
+        Args:
+            storage (SqliteNotesStorage, optional): Сховище. За замовчуванням - 'assistant.db'.
+            autosave_delay (float, optional): Період тиші перед фоновим збереженням змін, секунди.
+            history (UndoHistory, optional): Історія змін для скасування. За замовчуванням - без історії.
+        """
+        super().__init__(storage=storage or SqliteNotesStorage(), autosave_delay=autosave_delay, history=history)
+
+    def load_notes(self):
+        notes = StoredNotes(self.storage)
+        print("Нотатки успішно завантажені." if notes else "Не вдалося завантажити нотатки або файл порожній.")
+        return notes
+
+    def _rebuild_indexes(self):
+        self._next_id = self.storage.max_id() + 1
+
+    def _index_note(self, note):
+        self.storage.put(note)
+
+    def _unindex_note(self, note):
+        self.storage.delete(note.id)
+
+    @staticmethod
+    def _note(stored):
+        note_id, text, tags = stored
+        return Note(text, tags, id=note_id)
+
+    def _notes_by_ids(self, note_ids):
+        stored = self.storage.get_many(note_ids)
+        return [self._note(stored[note_id]) for note_id in note_ids if note_id in stored]
+
+    def restore(self, changes):
+        """
+        Відновлює нотатки до знімків з історії змін однією транзакцією.
+        """
+        self.storage.write(notes=[Note(state[0], list(state[1]), id=note_id)
+                                  for note_id, state in changes if state is not None],
+                           deleted=[note_id for note_id, state in changes if state is None])
+
+    def update_note(self, note_index, text, tags):
+        """
+        Змінює текст і теги нотатки за індексом одним записом у базу.
+        Raises:
+            IndexError: Якщо нотатки з таким індексом немає.
+        """
+        if not 0 <= note_index < len(self.notes):
+            raise IndexError(note_index)
+        note = self.notes[note_index]
+        before = self.note_state(note)
+        note.text = text
+        note.tags = self.format_tags(tags)
+        self.storage.put(note)
+        self._record(note.id, before, self.note_state(note))
+
+    def search_text(self, query, limit=None):
+        return self._notes_by_ids(self.storage.search_text(query, limit))
+
+    def get_note(self, note_id):
+        stored = self.storage.get(note_id)
+        return self._note(stored) if stored is not None else None
+
+    def notes_by_tags(self, tags, mode='and', prefix=False, substring=False):
+        return self._notes_by_ids(self.storage.search_tags(tags, mode, prefix, substring))
+
+    def dump_notes(self):
+        """
+        Зміни вже записані в базу, тож лише переносить WAL у файл бази.
+        """
+        self.storage.checkpoint()
+
+    def _save_notes(self):
+        pass
+
+    def _tag_rows(self, offset, limit):
+        return self.storage.tag_page(offset, limit)
+
+    def _tag_rows_total(self):
+        return self.storage.tag_total()
@@ -0,0 +1,421 @@
+import os
+import csv
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from snapshot_cache import file_signature, read_cache, write_cache
+from notes_index import normalize_tag, tokenize
+from metrics import metrics
+
+
+class NotesStorage(ABC):
+    """
+    Інтерфейс сховища нотаток, яким користується NotesManager.
+    """
+
+    @abstractmethod
+    def exists(self):
+        pass
+
+    @abstractmethod
+    def load(self):
+        """
+        Returns:
+            generator: Пари (text, tags), де tags - список тегів.
+        """
+
+    @abstractmethod
+    def save(self, notes):
+        """
+        Зберігає повний список нотаток.
+        """
+
+    def signature(self):
+        """
+        Підпис поточної версії нотаток, за яким перевіряється актуальність збереженого
+        повнотекстового індексу (див. FullTextIndex.load).
+        Returns:
+            list or None: Підпис або None, якщо нотаток ще немає.
+        """
+        signature = file_signature(self.file_path)
+        return list(signature) if signature is not None else None
+
+
+class CsvNotesStorage(NotesStorage):
+    """
+    Сховище нотаток у файлі CSV з колонками 'text' та 'tags'.
+    """
+
+    def __init__(self, file_path='notes.csv', cache_path=None):
+        """
+        Args:
+            file_path (str): Шлях до файлу нотаток.
+            cache_path (str, optional): Шлях до двійкового кешу нотаток. За замовчуванням - file_path + '.cache'.
+        """
+        self.file_path = file_path
+        self.cache_path = cache_path or f'{file_path}.cache'
+
+    def exists(self):
+        return os.path.exists(self.file_path)
+
+    def load(self):
+        signature = file_signature(self.file_path)
+        if signature is None:
+            return
+        # Двійковий кеш поточної версії файлу читається без розбору CSV
+        rows = read_cache(self.cache_path, signature)
+        if rows is not None:
+            yield from rows
+            return
+        rows = []
+        with open(self.file_path, newline='\n') as fh:
+            reader = csv.DictReader(fh)
+            for row in reader:
+                rows.append((row['text'], row['tags'].split(', ')))
+                yield rows[-1]
+        metrics.bytes_read(os.path.basename(self.file_path), signature[0])
+        write_cache(self.cache_path, signature, rows)
+
+    def save(self, notes):
+        # Файл пишеться поруч і атомарно підміняє старий, тож аварія посеред запису не пошкоджує нотатки
+        tmp_path = f'{self.file_path}.tmp'
+        with open(tmp_path, 'w', newline='\n') as fh:
+            field_names = ['text', 'tags']
+            writer = csv.DictWriter(fh, fieldnames=field_names)
+            writer.writeheader()
+            for note in notes:
+                writer.writerow({'text': note.text, 'tags': ', '.join(note.tags)})
+            written = fh.tell()
+        os.replace(tmp_path, self.file_path)
+        metrics.bytes_written(os.path.basename(self.file_path), written)
+        write_cache(self.cache_path, file_signature(self.file_path), [(note.text, note.tags) for note in notes])
+
+
+class SqliteNotesStorage(NotesStorage):
+    """
+    Сховище нотаток у базі SQLite (режим WAL) з індексом нормалізованих тегів та
+    повнотекстовим індексом FTS5 для пошуку за текстом. Пошук, сторінки списку та
+    сортування за тегами виконуються запитами SQL (див. SqliteNotesManager), а кожна
+    нотатка зберігається окремо за своїм сталим id.
+
+    Одне з'єднання використовують кілька потоків (HTTP-сервер, автозбереження), тому всі
+    звернення до нього виконуються під блокуванням.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS notes (
+            id INTEGER PRIMARY KEY,
+            text TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS note_tags (
+            note_id INTEGER NOT NULL REFERENCES notes (id) ON DELETE CASCADE,
+            tag TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS note_tags_tag ON note_tags (tag);
+        CREATE INDEX IF NOT EXISTS note_tags_note_id ON note_tags (note_id);
+        CREATE TABLE IF NOT EXISTS notes_revision (revision INTEGER NOT NULL);
+        INSERT INTO notes_revision SELECT 0 WHERE NOT EXISTS (SELECT 1 FROM notes_revision);
+        CREATE TRIGGER IF NOT EXISTS notes_revision_insert AFTER INSERT ON notes BEGIN
+            UPDATE notes_revision SET revision = revision + 1;
+        END;
+        CREATE TRIGGER IF NOT EXISTS notes_revision_update AFTER UPDATE ON notes BEGIN
+            UPDATE notes_revision SET revision = revision + 1;
+        END;
+        CREATE TRIGGER IF NOT EXISTS notes_revision_delete AFTER DELETE ON notes BEGIN
+            UPDATE notes_revision SET revision = revision + 1;
+        END;
+    """
+
+    # Ключ тегу (notes_index.normalize_tag) - для пошуку без регістру і '#' та сортування за тегами
+    TAG_KEY_SCHEMA = """
+        CREATE INDEX IF NOT EXISTS note_tags_tag_key ON note_tags (tag_key, note_id);
+    """
+
+    # remove_diacritics 0: інакше FTS5 не розрізняє 'й' та 'и', 'ї' та 'і'
+    FTS_TOKENIZE = "tokenize='unicode61 remove_diacritics 0'"
+
+    FTS_SCHEMA = f"""
+        CREATE VIRTUAL TABLE IF NOT EXISTS notes_fts USING fts5 (
+            text, content='notes', content_rowid='id', {FTS_TOKENIZE}
+        );
+        CREATE TRIGGER IF NOT EXISTS notes_fts_insert AFTER INSERT ON notes BEGIN
+            INSERT INTO notes_fts (rowid, text) VALUES (new.id, new.text);
+        END;
+        CREATE TRIGGER IF NOT EXISTS notes_fts_delete AFTER DELETE ON notes BEGIN
+            INSERT INTO notes_fts (notes_fts, rowid, text) VALUES ('delete', old.id, old.text);
+        END;
+        CREATE TRIGGER IF NOT EXISTS notes_fts_update AFTER UPDATE ON notes BEGIN
+            INSERT INTO notes_fts (notes_fts, rowid, text) VALUES ('delete', old.id, old.text);
+            INSERT INTO notes_fts (rowid, text) VALUES (new.id, new.text);
+        END;
+    """
+
+    # Скільки нотаток читається за одне звернення під блокуванням під час потокового читання
+    PAGE_SIZE = 1000
+
+    def __init__(self, file_path='assistant.db', csv_path='notes.csv'):
+        """
+        Args:
+            file_path (str): Шлях до файлу бази даних.
+            csv_path (str, optional): CSV-файл, з якого імпортуються нотатки, якщо база порожня.
+        """
+        self.file_path = file_path
+        self.lock = threading.RLock()
+        self.conn = sqlite3.connect(file_path, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.execute('PRAGMA foreign_keys=ON')
+        # lower() у SQLite не знає регістру кирилиці
+        self.conn.create_function('casefold', 1, str.casefold, deterministic=True)
+        self.conn.executescript(self.SCHEMA)
+        self._add_tag_keys()
+        self.has_fts = self._create_fts()
+        if csv_path and os.path.exists(csv_path) and self.count() == 0:
+            self.import_csv(csv_path)
+
+    def _add_tag_keys(self):
+        """
+        Додає колонку tag_key у бази, створені до її появи, і заповнює її для наявних тегів.
+        """
+        columns = {row[1] for row in self.conn.execute('PRAGMA table_info(note_tags)')}
+        if 'tag_key' not in columns:
+            with self.conn:
+                self.conn.execute("ALTER TABLE note_tags ADD COLUMN tag_key TEXT NOT NULL DEFAULT ''")
+                rows = self.conn.execute('SELECT rowid, tag FROM note_tags').fetchall()
+                self.conn.executemany('UPDATE note_tags SET tag_key = ? WHERE rowid = ?',
+                                      ((normalize_tag(tag), rowid) for rowid, tag in rows))
+        self.conn.executescript(self.TAG_KEY_SCHEMA)
+
+    def _create_fts(self):
+        row = self.conn.execute("SELECT sql FROM sqlite_master WHERE name = 'notes_fts'").fetchone()
+        rebuild = row is None
+        if row is not None and 'remove_diacritics 0' not in row[0]:
+            # Індекс зі старим токенізатором перебудовується з таблиці notes
+            self.conn.executescript("""
+                DROP TRIGGER IF EXISTS notes_fts_insert;
+                DROP TRIGGER IF EXISTS notes_fts_delete;
+                DROP TRIGGER IF EXISTS notes_fts_update;
+                DROP TABLE notes_fts;
+            """)
+            rebuild = True
+        try:
+            self.conn.executescript(self.FTS_SCHEMA)
+        except sqlite3.OperationalError:
+            # SQLite зібрано без FTS5 - пошук за текстом виконується через instr
+            return False
+        if rebuild:
+            with self.conn:
+                self.conn.execute("INSERT INTO notes_fts (notes_fts) VALUES ('rebuild')")
+        return True
+
+    def _query(self, sql, params=()):
+        with self.lock:
+            return self.conn.execute(sql, params).fetchall()
+
+    def count(self):
+        return self._query('SELECT COUNT(*) FROM notes')[0][0]
+
+    def max_id(self):
+        return self._query('SELECT COALESCE(MAX(id), 0) FROM notes')[0][0]
+
+    def signature(self):
+        # Розмір і mtime файлу бази в режимі WAL не змінюються до checkpoint, тож підпис
+        # складається з кількості нотаток, найбільшого id та лічильника змін (тригери notes_revision)
+        count, max_id = self._query('SELECT COUNT(*), COALESCE(MAX(id), 0) FROM notes')[0]
+        return ['sqlite', count, max_id, self._query('SELECT revision FROM notes_revision')[0][0]]
+
+    def exists(self):
+        return True
+
+    def _with_tags(self, rows):
+        """
+        Додає до пар (id, text) теги нотаток одним запитом.
+        Returns:
+            list: Трійки (id, text, tags).
+        """
+        tags_by_note = {note_id: [] for note_id, _ in rows}
+        note_ids = list(tags_by_note)
+        # Кількість параметрів запиту SQLite обмежена, тож id передаються частинами
+        for start in range(0, len(note_ids), 500):
+            chunk = note_ids[start:start + 500]
+            for note_id, tag in self._query(f'SELECT note_id, tag FROM note_tags WHERE note_id IN '
+                                            f'({", ".join("?" * len(chunk))}) ORDER BY rowid', chunk):
+                tags_by_note[note_id].append(tag)
+        return [(note_id, text, tags_by_note[note_id]) for note_id, text in rows]
+
+    def read_notes(self):
+        """
+        Читає нотатки порціями за первинним ключем, не утримуючи блокування між порціями.
+        Returns:
+            generator: Трійки (id, text, tags).
+        """
+        last_id = -1
+        while True:
+            rows = self._query('SELECT id, text FROM notes WHERE id > ? ORDER BY id LIMIT ?',
+                               (last_id, self.PAGE_SIZE))
+            yield from self._with_tags(rows)
+            if len(rows) < self.PAGE_SIZE:
+                return
+            last_id = rows[-1][0]
+
+    def load(self):
+        for _, text, tags in self.read_notes():
+            yield text, tags
+
+    def page(self, offset, limit):
+        """
+        Returns:
+            list: Трійки (id, text, tags) нотаток з номерами offset..offset+limit у порядку id.
+        """
+        return self._with_tags(self._query('SELECT id, text FROM notes ORDER BY id LIMIT ? OFFSET ?',
+                                           (limit, offset)))
+
+    def get(self, note_id):
+        notes = self._with_tags(self._query('SELECT id, text FROM notes WHERE id = ?', (note_id,)))
+        return notes[0] if notes else None
+
+    def get_many(self, note_ids):
+        """
+        Returns:
+            dict: id -> трійка (id, text, tags) для наявних нотаток.
+        """
+        note_ids = list(note_ids)
+        rows = []
+        for start in range(0, len(note_ids), 500):
+            chunk = note_ids[start:start + 500]
+            rows += self._query(f'SELECT id, text FROM notes WHERE id IN ({", ".join("?" * len(chunk))})', chunk)
+        return {note[0]: note for note in self._with_tags(rows)}
+
+    def position(self, note_id):
+        """
+        Returns:
+            int or None: Номер нотатки у списку (порядок id) або None, якщо її немає.
+        """
+        with self.lock:
+            if self.conn.execute('SELECT 1 FROM notes WHERE id = ?', (note_id,)).fetchone() is None:
+                return None
+            return self.conn.execute('SELECT COUNT(*) FROM notes WHERE id < ?', (note_id,)).fetchone()[0]
+
+    def _insert_tags(self, note_id, tags):
+        self.conn.executemany('INSERT INTO note_tags (note_id, tag, tag_key) VALUES (?, ?, ?)',
+                              ((note_id, tag, normalize_tag(tag)) for tag in tags))
+
+    def write(self, notes=(), deleted=()):
+        """
+        Зберігає змінені нотатки і видаляє вказані однією транзакцією.
+        Args:
+            notes (iterable): Нотатки (з атрибутами id, text, tags) для запису.
+            deleted (iterable): Ідентифікатори нотаток для видалення.
+        """
+        with self.lock, self.conn:
+            for note in notes:
+                self.conn.execute('INSERT INTO notes (id, text) VALUES (?, ?) '
+                                  'ON CONFLICT (id) DO UPDATE SET text = excluded.text', (note.id, note.text))
+                self.conn.execute('DELETE FROM note_tags WHERE note_id = ?', (note.id,))
+                self._insert_tags(note.id, note.tags)
+            self.conn.executemany('DELETE FROM notes WHERE id = ?', ((note_id,) for note_id in deleted))
+
+    def put(self, note):
+        self.write(notes=(note,))
+
+    def delete(self, note_id):
+        self.write(deleted=(note_id,))
+
+    def _insert(self, notes):
+        for text, tags in notes:
+            note_id = self.conn.execute('INSERT INTO notes (text) VALUES (?)', (text,)).lastrowid
+            self._insert_tags(note_id, tags)
+
+    def save(self, notes):
+        """
+        Замінює вміст бази переданим списком нотаток однією транзакцією.
+        """
+        with self.lock, self.conn:
+            self.conn.execute('DELETE FROM notes')
+            self._insert((note.text, note.tags) for note in notes)
+
+    def checkpoint(self):
+        """
+        Переносить WAL у файл бази.
+        """
+        with self.lock:
+            self.conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+    def search_text(self, query, limit=None):
+        """
+        Шукає нотатки за словами тексту через FTS5 з ранжуванням bm25, як FullTextIndex.search
+        з prefix=True: кожне слово запиту - префікс (досить збігу будь-якого слова),
+        запит у лапках шукається як фраза.
+        Returns:
+            list: Ідентифікатори нотаток, від найрелевантніших.
+        """
+        stripped = query.strip()
+        terms = tokenize(stripped)
+        if not terms:
+            return []
+        limit = -1 if limit is None else limit
+        if not self.has_fts:
+            # Без FTS5 лишається перегляд таблиці: нотатки з будь-яким словом запиту
+            where = ' OR '.join(['instr(casefold(text), ?) > 0'] * len(terms))
+            rows = self._query(f'SELECT id FROM notes WHERE {where} ORDER BY id LIMIT ?', (*terms, limit))
+            return [note_id for note_id, in rows]
+        if len(stripped) > 1 and stripped.startswith('"') and stripped.endswith('"'):
+            match = '"' + ' '.join(terms) + '"'
+        else:
+            # Слова з \w+ не містять лапок, тож символи запиту не сприймаються як синтаксис FTS5
+            match = ' OR '.join(f'"{term}"*' for term in dict.fromkeys(terms))
+        rows = self._query('SELECT rowid FROM notes_fts WHERE notes_fts MATCH ? ORDER BY bm25(notes_fts), rowid '
+                           'LIMIT ?', (match, limit))
+        metrics.records_scanned('notes.text_search', len(rows))
+        return [note_id for note_id, in rows]
+
+    @staticmethod
+    def _tag_condition(tag, prefix, substring):
+        key = normalize_tag(tag)
+        if substring:
+            return 'instr(tag_key, ?) > 0', (key,)
+        if prefix:
+            return 'tag_key >= ? AND tag_key < ?', (key, key + '\U0010ffff')
+        return 'tag_key = ?', (key,)
+
+    def search_tags(self, tags, mode='and', prefix=False, substring=False):
+        """
+        Шукає нотатки за тегами за індексом tag_key, як TagIndex.query.
+        Returns:
+            list: Ідентифікатори знайдених нотаток за зростанням.
+        """
+        conditions = [self._tag_condition(tag, prefix, substring) for tag in tags if normalize_tag(tag)]
+        if not conditions:
+            return []
+        operator = ' UNION ' if mode == 'or' else ' INTERSECT '
+        sql = operator.join(f'SELECT note_id FROM note_tags WHERE {where}' for where, _ in conditions)
+        params = [param for _, condition_params in conditions for param in condition_params]
+        rows = self._query(f'{sql} ORDER BY note_id', params)
+        metrics.records_scanned('notes.tag_search', len(rows))
+        return [note_id for note_id, in rows]
+
+    def tag_page(self, offset, limit):
+        """
+        Рядки таблиці нотаток, відсортованих за тегами (кожна пара тег-нотатка один раз).
+        Returns:
+            list: Пари (тег, текст нотатки).
+        """
+        return self._query(
+            "SELECT MIN(note_tags.tag), notes.text FROM note_tags JOIN notes ON notes.id = note_tags.note_id "
+            "WHERE tag_key != '' GROUP BY tag_key, note_id ORDER BY tag_key, note_id LIMIT ? OFFSET ?",
+            (limit, offset))
+
+    def tag_total(self):
+        return self._query("SELECT COUNT(*) FROM (SELECT DISTINCT tag_key, note_id FROM note_tags "
+                           "WHERE tag_key != '')")[0][0]
+
+    def import_csv(self, csv_path):
+        """
+        Імпортує нотатки з CSV-файлу (формат notes.csv) однією транзакцією.
+        """
+        with self.lock, self.conn:
+            self._insert(CsvNotesStorage(csv_path).load())
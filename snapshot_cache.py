@@ -0,0 +1,68 @@
+import os
+import marshal
+from metrics import metrics
+
+# Версія формату кешу: змінюється разом зі складом рядків, щоб старі кеші ігнорувались
+CACHE_VERSION = 1
+
+
+def file_signature(path):
+    """
+    Підпис файлу (розмір і час зміни), за яким перевіряється актуальність кешу.
+    Returns:
+        tuple or None: (size, mtime_ns) або None, якщо файлу немає.
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_size, stat.st_mtime_ns)
+
+
+def read_cache(cache_path, signature):
+    """
+    Читає двійковий знімок рядків, збережений для файлу з тим самим підписом.
+    Args:
+        cache_path (str): Шлях до файлу кешу.
+        signature (tuple): Підпис вихідного файлу.
+    Returns:
+        list or None: Рядки (кортежі) або None, якщо кешу немає чи він застарів.
+    """
+    if signature is None:
+        return None
+    try:
+        # Файл читається цілком: marshal.load з файлу читає дрібними порціями і значно повільніший
+        with open(cache_path, 'rb') as fh:
+            data = fh.read()
+        version, marshal_version, cached_signature, rows = marshal.loads(data)
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    if version != CACHE_VERSION or marshal_version != marshal.version or tuple(cached_signature) != signature:
+        return None
+    metrics.bytes_read(os.path.basename(cache_path), len(data))
+    return rows
+
+
+def write_cache(cache_path, signature, rows):
+    """
+    Атомарно зберігає рядки у двійковий кеш (marshal) з підписом вихідного файлу.
+    Помилки запису ігноруються: кеш лише пришвидшує запуск.
+    Args:
+        cache_path (str): Шлях до файлу кешу.
+        signature (tuple): Підпис вихідного файлу.
+        rows (list): Рядки з простих типів (str, int, None).
+    """
+    if signature is None:
+        return
+    tmp_path = f'{cache_path}.tmp'
+    try:
+        with open(tmp_path, 'wb') as fh:
+            marshal.dump((CACHE_VERSION, marshal.version, signature, rows), fh)
+            written = fh.tell()
+        os.replace(tmp_path, cache_path)
+        metrics.bytes_written(os.path.basename(cache_path), written)
+    except (OSError, ValueError):
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
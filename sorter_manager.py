@@ -1,23 +1,553 @@
+import os
+import errno
 import shutil
 import re
+import time
+import gzip
+import tarfile
+import zipfile
+import json
+import hashlib
+from array import array
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from pathlib import Path
-from rich.console import Console
+from lazy_console import LazyConsole
+from transliteration import CYRILLIC_SYMBOLS, TRANSLATION, TRANS
+
+console = LazyConsole()
+
+
+def folder_files(folder):
+    """
+    Returns:
+        set: Шляхи всіх файлів папки відносно неї (через '/').
+    """
+    files = set()
+    for current, _, names in os.walk(folder):
+        prefix = os.path.relpath(current, folder).replace(os.sep, '/')
+        files.update(name if prefix == '.' else f'{prefix}/{name}' for name in names)
+    return files
+
+
+def extract_archive(archive_path, target_dir):
+    """
+    Розпаковує архів у окрему папку. Виконується в окремому процесі пулу розпакування.
+    Args:
+        archive_path (str): Шлях до архіву.
+        target_dir (str): Папка, куди розпакувати вміст.
+    Returns:
+        tuple: (опис помилки або None, чи створило розпакування папку, список доданих файлів
+        відносно папки). Скасування сортування прибирає лише ці файли і лише створену папку.
+    """
+    # Видаляти після помилки можна лише папку, створену цим розпакуванням, а не наявну папку користувача
+    created = not os.path.isdir(target_dir)
+    try:
+        existing = set() if created else folder_files(target_dir)
+        os.makedirs(target_dir, exist_ok=True)
+        if archive_path.lower().endswith('.gz') and not archive_path.lower().endswith('.tar.gz'):
+            # Одиночний файл .gz shutil.unpack_archive не підтримує
+            with gzip.open(archive_path, 'rb') as src, \
+                    open(os.path.join(target_dir, Path(archive_path).stem), 'wb') as dst:
+                shutil.copyfileobj(src, dst)
+        elif archive_path.lower().endswith('.zip'):
+            # shutil.unpack_archive не приймає filter для zip, тож шляхи перевіряються тут
+            root = os.path.realpath(target_dir)
+            with zipfile.ZipFile(archive_path) as archive:
+                for member in archive.infolist():
+                    destination = os.path.realpath(os.path.join(root, member.filename))
+                    if os.path.commonpath((root, destination)) != root:
+                        raise ValueError(f'шлях за межами папки розпакування: {member.filename}')
+                archive.extractall(root)
+        else:
+            # Фільтр 'data' відхиляє абсолютні шляхи, '..' та посилання за межі папки
+            shutil.unpack_archive(archive_path, target_dir, filter='data')
+        return None, created, sorted(folder_files(target_dir) - existing)
+    except (OSError, EOFError, ValueError, shutil.ReadError, tarfile.TarError, zipfile.BadZipFile) as error:
+        if created:
+            shutil.rmtree(target_dir, ignore_errors=True)
+        return f'{archive_path}: {error}', created, []
+
+def file_hash(path, chunk_size=1024 * 1024):
+    """
+    Повний хеш вмісту файлу, такий самий, як DuplicateFinder.full_hash.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as fh:
+        for chunk in iter(lambda: fh.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def same_file(path, other):
+    """
+    Returns:
+        bool: True, якщо обидва шляхи існують і є одним файлом (тим самим inode).
+    """
+    try:
+        return os.path.samefile(path, other)
+    except OSError:
+        return False
+
+
+class DuplicateFinder:
+    """
+    Пошук однакових файлів у три етапи: групування за розміром, хеш перших і останніх
+    64 КіБ і лише потім повний хеш вмісту. Хеші обчислюються ліниво - лише коли з'являється
+    інший файл того ж розміру - і кешуються, тож більшість файлів взагалі не читається.
+    """
+
+    EDGE_SIZE = 64 * 1024
+    CHUNK_SIZE = 1024 * 1024
+
+    def __init__(self):
+        self._by_size = {}
+        self._paths = {}
+        self._meta = {}
+        self._partial = {}
+        self._full = {}
+        # Файли з маніфесту, зареєстровані без stat: перевіряються, лише коли стають дублікатом
+        self._unverified = set()
+
+    def _open(self, key):
+        # Файл міг уже переміститися: пробуємо шляхи по черзі (джерело, потім призначення)
+        for path in self._paths[key]:
+            try:
+                return open(path, 'rb')
+            except FileNotFoundError:
+                continue
+        raise FileNotFoundError(key)
+
+    def partial_hash(self, key, size):
+        if key not in self._partial:
+            digest = hashlib.blake2b(digest_size=16)
+            with self._open(key) as fh:
+                if size <= 2 * self.EDGE_SIZE:
+                    data = fh.read()
+                    digest.update(data)
+                    # Малий файл прочитано повністю, тож це і є повний хеш
+                    self._full[key] = digest.hexdigest()
+                else:
+                    digest.update(fh.read(self.EDGE_SIZE))
+                    fh.seek(-self.EDGE_SIZE, os.SEEK_END)
+                    digest.update(fh.read(self.EDGE_SIZE))
+            self._partial[key] = digest.hexdigest()
+        return self._partial[key]
+
+    def full_hash(self, key, size):
+        if key not in self._full:
+            if size <= 2 * self.EDGE_SIZE:
+                self.partial_hash(key, size)
+            else:
+                digest = hashlib.blake2b(digest_size=16)
+                with self._open(key) as fh:
+                    for chunk in iter(lambda: fh.read(self.CHUNK_SIZE), b''):
+                        digest.update(chunk)
+                self._full[key] = digest.hexdigest()
+        return self._full[key]
+
+    def find(self, path, size):
+        """
+        Шукає серед відомих файлів файл з таким самим вмістом.
+        Args:
+            path (Path): Новий файл.
+            size (int): Його розмір у байтах.
+        Returns:
+            tuple or None: Шляхи знайденого дубліката (останній - остаточний) або None.
+        """
+        candidates = self._by_size.get(size)
+        if not candidates:
+            return None
+        key = str(path)
+        self._paths.setdefault(key, (path,))
+        try:
+            partial = self.partial_hash(key, size)
+            for candidate in candidates:
+                if self.partial_hash(candidate, size) == partial and self.full_hash(candidate, size) == self.full_hash(key, size):
+                    if candidate in self._unverified and not self._verify(candidate):
+                        continue
+                    return self._paths[candidate]
+        except OSError:
+            return None
+        return None
+
+    def _verify(self, key):
+        """
+        Перевіряє, що файл, зареєстрований з маніфесту без stat, не змінювався після запису
+        хешів (наприклад, його переписали на місці). Змінений файл втрачає збережені хеші.
+        Returns:
+            bool: True, якщо розмір і час зміни збігаються з маніфестом.
+        """
+        self._unverified.discard(key)
+        try:
+            stat = os.stat(self._paths[key][-1])
+        except OSError:
+            return False
+        if (stat.st_size, stat.st_mtime_ns) == self._meta[key]:
+            return True
+        self._meta[key] = (stat.st_size, stat.st_mtime_ns)
+        self._partial.pop(key, None)
+        self._full.pop(key, None)
+        return False
+
+    def add(self, path, size, final_path=None, mtime=None, hashes=None, verified=True):
+        """
+        Реєструє файл як відомий. Для файлу, що буде переміщений, final_path - шлях призначення.
+        Відомі з маніфесту хеші (частковий та повний) передаються в hashes і не перераховуються.
+        verified=False - розмір і mtime взято з маніфесту без stat (див. _verify).
+        """
+        key = str(path)
+        self._paths[key] = (path, final_path) if final_path else (path,)
+        self._meta[key] = (size, mtime)
+        self._by_size.setdefault(size, []).append(key)
+        if hashes:
+            partial, full = hashes
+            if partial:
+                self._partial[key] = partial
+            if full:
+                self._full[key] = full
+        if not verified:
+            self._unverified.add(key)
+
+    def known_files(self):
+        """
+        Returns:
+            generator: Кортежі (остаточний шлях, розмір, mtime, частковий хеш, повний хеш) зареєстрованих файлів.
+        """
+        for key, (size, mtime) in self._meta.items():
+            yield self._paths[key][-1], size, mtime, self._partial.get(key), self._full.get(key)
+
+    def content_hash(self, path, size):
+        key = str(path)
+        self._paths.setdefault(key, (path,))
+        return self.full_hash(key, size)
+
+
+class SortManifest:
+    """
+    Маніфест відсортованої папки: для кожного обробленого файлу в папках призначення
+    зберігає розмір, час зміни та обчислені хеші, а для кожної папки призначення - її час
+    зміни після сортування, коли перелік її файлів у маніфесті повний.
+
+    Повторне сортування не перераховує хеші файлів, які не змінювались, а папку призначення,
+    час зміни якої не змінився (у ній ніщо не з'являлось і не зникало), не переглядає зовсім:
+    її файли беруться з маніфесту без жодного stat. Вихідні файли після сортування вже
+    лежать у папках призначення, тож окремо пропускати необроблені джерела не потрібно.
+    """
+
+    FILE_NAME = '.sorter_manifest.json'
+    VERSION = 2
+
+    def __init__(self, folder: Path):
+        self.folder = folder
+        self.path = folder / self.FILE_NAME
+        self.files = {}
+        self.folders = {}
+        try:
+            with open(self.path, encoding='UTF-8') as fh:
+                data = json.load(fh)
+            # Маніфест версії 1 не має часу зміни папок, але хеші файлів у ньому ті самі
+            if data.get('version') in (1, self.VERSION):
+                self.files = data['files']
+                self.folders = data.get('folders', {})
+        except (OSError, ValueError, KeyError):
+            self.files = {}
+            self.folders = {}
+
+    def relative(self, path: Path) -> str:
+        return path.relative_to(self.folder).as_posix()
+
+    def lookup(self, path: Path, size, mtime):
+        """
+        Returns:
+            tuple or None: Збережені хеші (частковий, повний), якщо файл не змінювався.
+        """
+        entry = self.files.get(self.relative(path))
+        if entry and entry[0] == size and entry[1] == mtime:
+            return entry[2], entry[3]
+        return None
+
+    def _folder_files(self, target_folder: Path):
+        prefix = self.relative(target_folder) + '/'
+        return {name[len(prefix):]: entry for name, entry in self.files.items()
+                if name.startswith(prefix) and '/' not in name[len(prefix):]}
+
+    def unchanged_folder(self, target_folder: Path):
+        """
+        Returns:
+            list or None: Записи (шлях, розмір, mtime, хеші) файлів папки призначення, якщо
+            папка не змінювалась після попереднього сортування, інакше None.
+        """
+        mtime = self.folders.get(self.relative(target_folder))
+        if mtime is None:
+            return None
+        try:
+            if os.stat(target_folder).st_mtime_ns != mtime:
+                return None
+        except OSError:
+            return None
+        return [(target_folder / name, size, file_mtime, (partial, full))
+                for name, (size, file_mtime, partial, full) in self._folder_files(target_folder).items()]
+
+    def remember_folders(self, target_folders):
+        """
+        Запам'ятовує час зміни папок призначення, перелік файлів яких у маніфесті збігається
+        з вмістом папки (імена читаються без stat кожного файлу).
+        """
+        for target_folder in target_folders:
+            key = self.relative(target_folder)
+            self.folders.pop(key, None)
+            try:
+                mtime = os.stat(target_folder).st_mtime_ns
+                with os.scandir(target_folder) as entries:
+                    names = {entry.name for entry in entries if entry.is_file(follow_symlinks=False)}
+                if names == self._folder_files(target_folder).keys() and os.stat(target_folder).st_mtime_ns == mtime:
+                    self.folders[key] = mtime
+            except OSError:
+                continue
+
+    def forget_missing(self, target_folder: Path, present: set):
+        """
+        Прибирає записи про файли папки призначення, яких у ній уже немає.
+        """
+        prefix = self.relative(target_folder) + '/'
+        for name in [name for name in self.files if name.startswith(prefix) and name[len(prefix):] not in present]:
+            del self.files[name]
+
+    def update(self, finder: DuplicateFinder):
+        for path, size, mtime, partial, full in finder.known_files():
+            if mtime is not None:
+                self.files[self.relative(path)] = [size, mtime, partial, full]
+
+    def add_targets(self, plan):
+        """
+        Записує файли, які розмістив план, без хешів: після продовження перерваного сортування
+        хешів немає, тож вони обчисляться, лише коли знадобляться для пошуку дублікатів.
+        """
+        for op, target in zip(plan.ops, plan.targets):
+            if op == MovePlan.DROP or target in self.files:
+                continue
+            try:
+                stat = (plan.folder / target).stat()
+            except FileNotFoundError:
+                continue
+            self.files[target] = [stat.st_size, stat.st_mtime_ns, None, None]
+
+    def forget(self, paths):
+        """
+        Прибирає записи про шляхи, які зайняли чужі файли (див. FolderOrganizer.execute_plan).
+        """
+        for path in paths:
+            self.files.pop(self.relative(path), None)
+            self.folders.pop(self.relative(path.parent), None)
+
+    def save(self):
+        tmp_path = self.path.with_name(self.FILE_NAME + '.tmp')
+        with open(tmp_path, 'w', encoding='UTF-8') as fh:
+            json.dump({'version': self.VERSION, 'files': self.files, 'folders': self.folders}, fh,
+                      separators=(',', ':'))
+        os.replace(tmp_path, self.path)
+
+
+class MovePlan:
+    """
+    План сортування папки. Дії зберігаються компактно: коди операцій у масиві байтів,
+    шляхи - відносними рядками в паралельних списках.
+    """
+
+    MOVE, DROP, LINK = 0, 1, 2
+    OP_NAMES = ('move', 'drop', 'link')
+
+    def __init__(self, folder: Path):
+        self.folder = folder
+        self.ops = array('B')
+        self.sources = []
+        self.targets = []
+        self.links = []
+        self.link_sources = []
+        # Для 'drop' - хеш вмісту на момент планування: перед видаленням копії він перевіряється знову
+        self.hashes = []
+
+    def __len__(self):
+        return len(self.ops)
+
+    def _relative(self, path):
+        return path.relative_to(self.folder).as_posix() if path else ''
+
+    def add(self, op, source: Path, target: Path, duplicate=None, content_hash=None):
+        """
+        Args:
+            op (str): 'move', 'drop' або 'link'.
+            source (Path): Файл, що сортується.
+            target (Path): Шлях призначення (для 'drop' - однаковий файл, що залишається).
+            duplicate (tuple, optional): Шляхи однакового файлу для 'link' (джерело, остаточний шлях).
+            content_hash (str, optional): Хеш вмісту файлу для 'drop'.
+        """
+        self.ops.append(self.OP_NAMES.index(op))
+        self.sources.append(self._relative(source))
+        self.targets.append(self._relative(target))
+        self.links.append(self._relative(duplicate[-1]) if duplicate else '')
+        self.link_sources.append(self._relative(duplicate[0]) if duplicate else '')
+        self.hashes.append(content_hash or '')
+
+    def retarget(self, index, target: Path):
+        self.targets[index] = self._relative(target)
+
+    def change_op(self, index, op):
+        self.ops[index] = self.OP_NAMES.index(op)
+
+    def action(self, index):
+        """
+        Returns:
+            tuple: (op, джерело, призначення, шляхи дубліката або None).
+        """
+        duplicate = None
+        if self.links[index]:
+            duplicate = (self.folder / self.link_sources[index], self.folder / self.links[index])
+        return self.OP_NAMES[self.ops[index]], self.folder / self.sources[index], self.folder / self.targets[index], duplicate
+
+    def to_dict(self):
+        return {'ops': self.ops.tolist(), 'sources': self.sources, 'targets': self.targets,
+                'links': self.links, 'link_sources': self.link_sources, 'hashes': self.hashes}
+
+    @classmethod
+    def from_dict(cls, folder: Path, data):
+        plan = cls(folder)
+        plan.ops = array('B', data['ops'])
+        plan.sources = data['sources']
+        plan.targets = data['targets']
+        plan.links = data['links']
+        plan.link_sources = data['link_sources']
+        # Журнали попередньої версії хешів не містять: копії тоді порівнюються між собою
+        plan.hashes = data.get('hashes') or [''] * len(plan.ops)
+        return plan
+
+
+class SortJournal:
+    """
+    Журнал виконання плану сортування (JSON Lines): перший рядок - план, далі по рядку
+    на кожну завершену порцію та позначка про завершення. Дозволяє продовжити перерване
+    сортування з останньої завершеної порції та скасувати останнє сортування.
+    Якщо під час виконання шлях призначення виявився зайнятим, нове призначення дії
+    записується окремим рядком і застосовується до плану під час читання журналу,
+    так само як і заміна видалення дубліката переміщенням.
+    """
+
+    FILE_NAME = '.sorter_journal.jsonl'
+
+    def __init__(self, folder: Path):
+        self.folder = folder
+        self.path = folder / self.FILE_NAME
+        self._fh = None
+        # Нові призначення записують потоки пулу переміщень
+        self._lock = threading.Lock()
+
+    def _write(self, entry):
+        with self._lock:
+            self._fh.write(json.dumps(entry, ensure_ascii=False, separators=(',', ':')) + '\n')
+            self._fh.flush()
+            os.fsync(self._fh.fileno())
+
+    def start(self, plan: MovePlan, batch_size, recursive=False):
+        self._fh = open(self.path, 'w', encoding='UTF-8')
+        self._write({'type': 'plan', 'batch_size': batch_size, 'recursive': recursive, **plan.to_dict()})
+
+    def retarget(self, plan: MovePlan, index, target: Path):
+        plan.retarget(index, target)
+        self._write({'type': 'target', 'index': index, 'target': plan.targets[index]})
+
+    def change_op(self, plan: MovePlan, index, op):
+        plan.change_op(index, op)
+        self._write({'type': 'op', 'index': index, 'op': op})
+
+    def extracted(self, index, folder: Path, created, files):
+        """
+        Записує, що дало розпакування архіву дії index: скасування прибере лише ці файли
+        і саму папку, лише якщо її створило розпакування.
+        """
+        self._write({'type': 'extract', 'index': index, 'folder': folder.relative_to(self.folder).as_posix(),
+                     'created': created, 'files': files})
+
+    def resume(self):
+        self._fh = open(self.path, 'a', encoding='UTF-8')
+
+    def commit(self, batch_index):
+        self._write({'type': 'batch', 'index': batch_index})
+
+    def finish(self):
+        self._write({'type': 'done'})
+        self.close()
+
+    def close(self):
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+
+    def load(self):
+        """
+        Returns:
+            dict or None: План ('plan'), розмір порції ('batch_size'), рекурсивність ('recursive'),
+            кількість завершених порцій ('committed'), ознака завершення ('done') та розпаковані
+            архіви ('extracted': номер дії -> запис розпакування), або None, якщо журналу немає.
+        """
+        try:
+            fh = open(self.path, encoding='UTF-8')
+        except FileNotFoundError:
+            return None
+        state = None
+        with fh:
+            for line in fh:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # Обірваний останній запис
+                    break
+                if entry['type'] == 'plan':
+                    state = {'plan': MovePlan.from_dict(self.folder, entry), 'batch_size': entry['batch_size'],
+                             'recursive': entry.get('recursive', False), 'committed': 0, 'done': False,
+                             'extracted': {}}
+                elif state and entry['type'] == 'target':
+                    state['plan'].targets[entry['index']] = entry['target']
+                elif state and entry['type'] == 'op':
+                    state['plan'].change_op(entry['index'], entry['op'])
+                elif state and entry['type'] == 'extract':
+                    state['extracted'][entry['index']] = entry
+                elif state and entry['type'] == 'batch':
+                    state['committed'] = entry['index'] + 1
+                elif state and entry['type'] == 'done':
+                    state['done'] = True
+        return state
+
+    def remove(self):
+        self.close()
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
 
-console = Console()
 
 class FolderOrganizer:
-    def __init__(self, folder_path=None):
+    def __init__(self, folder_path=None, max_workers=8, archive_workers=None, batch_size=1000, duplicates='link'):
+        """
+        Args:
+            folder_path (str, optional): Папка для сортування.
+            max_workers (int, optional): Кількість потоків, що переміщують файли. За замовчуванням - 8.
+            archive_workers (int, optional): Кількість процесів розпакування архівів. За замовчуванням - кількість ядер.
+            batch_size (int, optional): Кількість файлів, що плануються та передаються пулу за раз. За замовчуванням - 1000.
+            duplicates (str, optional): Що робити з копією вже наявного файлу під іншим ім'ям: 'link' - жорстке
+                посилання замість копії, 'delete' - видалити. Копія з тим самим ім'ям видаляється завжди. За замовчуванням - 'link'.
+        """
         self.folder_path = folder_path
+        self.duplicates = duplicates
+        self.max_workers = max_workers
+        self.archive_workers = archive_workers
+        self.batch_size = batch_size
         
-        self.CYRILLIC_SYMBOLS = 'абвгдеёжзийклмнопрстуфхцчшщъыьэюяєіїґ'
-        self.TRANSLATION = ("a", "b", "v", "g", "d", "e", "e", "j", "z", "i", "j", "k", "l", "m", "n", "o", "p", "r", "s", "t", "u",
-                           "f", "h", "ts", "ch", "sh", "sch", "", "y", "", "e", "yu", "u", "ja", "je", "ji", "g")
-
-        self.TRANS = dict()
-
-        for cyrillic, latin in zip(self.CYRILLIC_SYMBOLS, self.TRANSLATION):
-            self.TRANS[ord(cyrillic)] = latin
-            self.TRANS[ord(cyrillic.upper())] = latin.upper()
+        # Таблиця транслітерації спільна з нечітким пошуком контактів (див. transliteration.py)
+        self.CYRILLIC_SYMBOLS = CYRILLIC_SYMBOLS
+        self.TRANSLATION = TRANSLATION
+        self.TRANS = TRANS
 
         self.KNOWN_EXTENSIONS = {
             'Images': {'JPEG', 'JPG', 'PNG', 'SVG'},
@@ -27,6 +557,13 @@ class FolderOrganizer:
             'Archives': {'ZIP', 'GZ', 'TAR'},
         }
 
+        # Таблиці, обчислені один раз: розширення -> категорія та розширення -> папка призначення
+        self.EXTENSION_CATEGORIES = {ext: category for category, exts in self.KNOWN_EXTENSIONS.items() for ext in exts}
+        self.EXTENSION_FOLDERS = {ext: ext for ext in self.EXTENSION_CATEGORIES}
+        self.OTHER_FOLDER = 'MY_OTHER'
+        # Службові файли сортувальника, які самі не сортуються
+        self.SERVICE_FILES = {SortManifest.FILE_NAME, SortManifest.FILE_NAME + '.tmp', SortJournal.FILE_NAME}
+
 
     def normalize(self, name: str) -> str:
         translate_name = re.sub(r'[^a-zA-Z0-9.]', '_', name.translate(self.TRANS))
@@ -35,24 +572,540 @@ class FolderOrganizer:
     def get_extension(self, name: str) -> str:
         return Path(name).suffix[1:].upper()
 
+    def target_folder_name(self, name: str) -> str:
+        return self.EXTENSION_FOLDERS.get(self.get_extension(name), self.OTHER_FOLDER)
+
+    def unique_target(self, target_path: Path, reserved: set, suffix=None) -> Path:
+        """
+        Повертає вільне ім'я в папці призначення. Якщо ім'я зайняте, до назви додається
+        суфікс (наприклад, частина хешу вмісту), а за потреби - лічильник _1, _2, ...
+        Args:
+            target_path (Path): Бажаний шлях призначення.
+            reserved (set): Шляхи, вже зайняті іншими файлами цього сортування.
+            suffix (callable, optional): Повертає суфікс для зайнятого імені. За замовчуванням - лише лічильник.
+        Returns:
+            Path: Шлях, який не існує і не зарезервований.
+        """
+        candidate = target_path
+        if candidate in reserved or candidate.exists():
+            base = f"{target_path.stem}_{suffix()}" if suffix else target_path.stem
+            candidate = target_path.with_name(f"{base}{target_path.suffix}")
+            counter = 1
+            while candidate in reserved or candidate.exists():
+                candidate = target_path.with_name(f"{base}_{counter}{target_path.suffix}")
+                counter += 1
+        reserved.add(candidate)
+        return candidate
+
+    def register_target_folder(self, target_folder: Path, reserved: set, finder: DuplicateFinder, manifest=None):
+        """
+        Один раз читає вміст папки призначення: наявні імена резервуються, а файли
+        реєструються для пошуку дублікатів разом із хешами з маніфесту, якщо файл не змінювався.
+        Папка, яка не змінювалась після попереднього сортування, не читається: її файли
+        беруться з маніфесту.
+        """
+        listing = manifest.unchanged_folder(target_folder) if manifest else None
+        if listing is not None:
+            for path, size, mtime, hashes in listing:
+                reserved.add(path)
+                finder.add(path, size, mtime=mtime, hashes=hashes, verified=False)
+            return
+        present = set()
+        try:
+            with os.scandir(target_folder) as entries:
+                for entry in entries:
+                    if entry.is_file(follow_symlinks=False):
+                        path = target_folder / entry.name
+                        stat = entry.stat(follow_symlinks=False)
+                        hashes = manifest.lookup(path, stat.st_size, stat.st_mtime_ns) if manifest else None
+                        reserved.add(path)
+                        present.add(entry.name)
+                        finder.add(path, stat.st_size, mtime=stat.st_mtime_ns, hashes=hashes)
+        except FileNotFoundError:
+            pass
+        if manifest:
+            manifest.forget_missing(target_folder, present)
+
+    def plan_file(self, source: Path, target_folder: Path, reserved: set, finder: DuplicateFinder):
+        """
+        Визначає дію для одного файлу.
+        Returns:
+            tuple: ('move', джерело, призначення), ('drop', джерело, дублікат, шляхи дубліката, хеш вмісту)
+            або ('link', джерело, призначення, шляхи дубліката).
+        Raises:
+            FileNotFoundError: Файл зник після обходу папки.
+        """
+        stat = source.stat()
+        size = stat.st_size
+        desired = target_folder / self.normalize(source.name)
+        duplicate = finder.find(source, size)
+        if duplicate is not None:
+            if duplicate[-1] == desired or self.duplicates == 'delete':
+                return 'drop', source, duplicate[-1], duplicate, finder.content_hash(source, size)
+            target = self.unique_target(desired, reserved, lambda: finder.content_hash(source, size)[:8])
+            return 'link', source, target, duplicate
+        target = self.unique_target(desired, reserved, lambda: finder.content_hash(source, size)[:8])
+        # Переміщення в межах файлової системи зберігає mtime, тож його можна записати в маніфест одразу
+        finder.add(source, size, target, mtime=stat.st_mtime_ns)
+        return 'move', source, target
+
+    def link_file(self, source: Path, target: Path, duplicate: tuple):
+        """
+        Замінює файл жорстким посиланням на однаковий файл. Дублікат може саме переміщуватись
+        іншим потоком, тому пробуємо його остаточний шлях, джерело і знову остаточний шлях.
+        Якщо посилання створити не вдалося (інша файлова система), файл просто переміщується.
+        """
+        for existing in (duplicate[-1], duplicate[0], duplicate[-1]):
+            try:
+                os.link(existing, target)
+            except FileNotFoundError:
+                continue
+            except OSError:
+                break
+            os.remove(source)
+            return True
+        self.move_file(source, target)
+        return False
+
+    def move_file(self, source: Path, target: Path):
+        """
+        Переміщує файл, ніколи не перезаписуючи наявний: os.rename на POSIX мовчки замінив би
+        файл, що з'явився за шляхом призначення після планування. У межах однієї файлової
+        системи файл переноситься жорстким посиланням і видаленням старого імені,
+        копіювання використовується лише для переміщення між пристроями.
+        Raises:
+            FileExistsError: Якщо шлях призначення вже зайнятий.
+        """
+        try:
+            os.link(source, target)
+        except FileExistsError:
+            raise
+        except OSError as error:
+            # Жорсткі посилання недоступні (інший пристрій, FAT тощо): перевірка перед перейменуванням
+            if os.path.lexists(target):
+                raise FileExistsError(errno.EEXIST, os.strerror(errno.EEXIST), str(target))
+            if error.errno == errno.EXDEV:
+                shutil.move(str(source), str(target))
+            else:
+                os.rename(source, target)
+            return
+        os.remove(source)
+
     def handle_file(self, file_name: Path, target_folder: Path):
-        extension = self.get_extension(file_name)
-        normalized_name = self.normalize(file_name.name)
+        target_folder = target_folder / self.target_folder_name(file_name.name)
+        target_folder.mkdir(exist_ok=True, parents=True)
+        target_path = self.unique_target(target_folder / self.normalize(file_name.name), set())
+        self.move_file(file_name, target_path)
+
+    def iter_files(self, folder: Path, recursive=False):
+        """
+        Перебирає файли папки через os.scandir. У рекурсивному режимі обходить вкладені
+        папки без побудови списку всього дерева; папки призначення сортування пропускаються.
+        Args:
+            folder (Path): Папка для обходу.
+            recursive (bool, optional): Обходити вкладені папки. За замовчуванням - False.
+        Returns:
+            generator: Шляхи до файлів.
+        """
+        skipped = {self.OTHER_FOLDER, *self.EXTENSION_FOLDERS.values()}
+        pending = [folder]
+        while pending:
+            current = pending.pop()
+            try:
+                with os.scandir(current) as entries:
+                    # Перелік однієї папки читається повністю до переміщень із неї
+                    entries = list(entries)
+            except OSError:
+                continue
+            for entry in entries:
+                if entry.is_file(follow_symlinks=False):
+                    if not (current == folder and entry.name in self.SERVICE_FILES):
+                        yield current / entry.name
+                elif recursive and entry.is_dir(follow_symlinks=False) and not (current == folder and entry.name in skipped):
+                    pending.append(current / entry.name)
+
+    def plan_folder(self, folder: Path, recursive=False, files=None):
+        """
+        Етап планування: обходить папку, шукає дублікати та визначає шлях призначення
+        кожного файлу, нічого не змінюючи на диску.
+        Args:
+            folder (Path): Папка для сортування.
+            recursive (bool, optional): Сортувати також файли з вкладених папок. За замовчуванням - False.
+            files (iterable, optional): Сортувати лише ці файли замість обходу папки.
+        Returns:
+            tuple: План (MovePlan) та пошук дублікатів (DuplicateFinder) з обчисленими хешами.
+        """
+        plan = MovePlan(folder)
+        reserved = set()
+        finder = DuplicateFinder()
+        manifest = SortManifest(folder)
+        registered = set()
+        for source in (files if files is not None else self.iter_files(folder, recursive)):
+            target_folder = folder / self.target_folder_name(source.name)
+            if target_folder not in registered:
+                self.register_target_folder(target_folder, reserved, finder, manifest)
+                registered.add(target_folder)
+            try:
+                action = self.plan_file(source, target_folder, reserved, finder)
+            except FileNotFoundError:
+                # Файл видалили або перемістили між обходом папки і плануванням
+                continue
+            plan.add(*action)
+        return plan, finder
+
+    def kept_copy_matches(self, source: Path, size, target: Path, duplicate, content_hash=None):
+        """
+        Перевіряє перед видаленням дубліката, що однаковий файл, який залишається, досі існує
+        і не змінився після планування: план міг чекати виконання або продовження.
+        Returns:
+            bool: True, якщо копія має той самий розмір і хеш, що й джерело під час планування.
+        """
+        try:
+            expected = content_hash or file_hash(source)
+            if content_hash and file_hash(source) != content_hash:
+                return False
+        except FileNotFoundError:
+            return False
+        # Копія може саме переміщуватись іншим потоком: остаточний шлях, джерело і знову остаточний шлях
+        for kept in (target, *(duplicate or ())[:1], target):
+            try:
+                if kept.stat().st_size == size and file_hash(kept) == expected:
+                    return True
+            except FileNotFoundError:
+                continue
+        return False
 
-        if extension in {ext for exts in self.KNOWN_EXTENSIONS.values() for ext in exts}:
-            target_folder = target_folder / extension
+    def apply_action(self, op, source: Path, target: Path, duplicate=None, content_hash=None):
+        """
+        Виконує одну дію плану. Дія, яку вже виконано до переривання, пропускається, а перервану
+        посередині (нове ім'я створено, старе ще не видалено) лише завершено, тому порцію можна
+        безпечно повторити. Дублікат видаляється, лише якщо однакова копія досі на місці,
+        інакше він переміщується як звичайний файл.
+        Returns:
+            tuple: Фактична операція ('move', 'drop', 'link' або None, якщо пропущено) і розмір файлу.
+        """
+        try:
+            size = source.stat().st_size
+        except FileNotFoundError:
+            return None, 0
+        if op != 'drop' and any(same_file(target, original) for original in (source, *(duplicate or ()))):
+            # Переміщення чи посилання перервано між створенням посилання і видаленням джерела
+            os.remove(source)
+            return op, size
+        if op == 'drop' and self.kept_copy_matches(source, size, target, duplicate, content_hash):
+            os.remove(source)
+        elif op == 'link' and self.link_file(source, target, duplicate):
+            pass
         else:
-            target_folder = target_folder / 'MY_OTHER'
+            self.move_file(source, target)
+            op = 'move'
+        return op, size
 
-        target_folder.mkdir(exist_ok=True, parents=True)
-        target_path = target_folder / normalized_name
+    def execute_plan(self, plan: MovePlan, journal: SortJournal, start_batch=0, on_progress=None) -> dict:
+        """
+        Етап виконання: застосовує план порціями по batch_size дій пулом потоків і записує
+        в журнал кожну завершену порцію. Архіви розпаковуються пулом процесів паралельно.
+        Args:
+            plan (MovePlan): План сортування.
+            journal (SortJournal): Відкритий журнал виконання.
+            start_batch (int, optional): Номер порції, з якої почати (при продовженні). За замовчуванням - 0.
+            on_progress (callable, optional): Викликається зі словником лічильників після кожної порції.
+        Returns:
+            dict: Лічильники (файли, архіви, дублікати, помилки), зайняті після планування
+            призначення ('taken') і тривалість етапів у секундах.
+        """
+        timings = {}
+        progress = {'scanned': len(plan), 'moved': 0, 'extracted': 0, 'duplicates': 0, 'saved_bytes': 0}
+        errors = []
+        # Призначення, які зайняли чужі файли після планування
+        taken = []
+        lock = threading.Lock()
+
+        started = time.perf_counter()
+        target_folders = {plan.folder / target.rpartition('/')[0]
+                          for op, target in zip(plan.ops, plan.targets) if op != MovePlan.DROP}
+        for target_folder in target_folders:
+            target_folder.mkdir(exist_ok=True, parents=True)
+        timings['mkdir'] = time.perf_counter() - started
+
+        # multiprocessing імпортується лише під час сортування, а не при запуску програми
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+
+        # Процеси розпакування не можна створювати через fork: пул потоків у цей момент уже працює,
+        # і дочірній процес успадкував би захоплені блокування
+        start_method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+        move_pool = ThreadPoolExecutor(max_workers=self.max_workers)
+        archive_pool = ProcessPoolExecutor(max_workers=self.archive_workers,
+                                           mp_context=multiprocessing.get_context(start_method))
+
+        def extracted(index, folder, future):
+            try:
+                error, created, files = future.result()
+            except Exception as failure:
+                # Наприклад, процес пулу аварійно завершився
+                error, created, files = f'{failure!r}', False, []
+            if not error and (files or created):
+                try:
+                    journal.extracted(index, folder, created, files)
+                except (OSError, ValueError) as failure:
+                    error = error or f'{folder}: {failure}'
+            with lock:
+                if error:
+                    errors.append(error)
+                else:
+                    progress['extracted'] += 1
+
+        def execute(index):
+            op, source, target, duplicate = plan.action(index)
+            content_hash = plan.hashes[index] or None
+            while True:
+                try:
+                    done, size = self.apply_action(op, source, target, duplicate, content_hash)
+                    break
+                except FileExistsError:
+                    # Ім'я зайняли після планування: дія отримує вільне ім'я, записане в журнал для скасування
+                    with lock:
+                        taken.append(target)
+                    target = self.unique_target(target, set())
+                    journal.retarget(plan, index, target)
+            if op == 'drop' and done == 'move':
+                # Копії дубліката вже немає: скасування має повернути переміщений файл, а не копіювати
+                journal.change_op(plan, index, 'move')
+            with lock:
+                if done == 'move':
+                    progress['moved'] += 1
+                elif done:
+                    progress['duplicates'] += 1
+                    progress['saved_bytes'] += size
+            if done == 'move' and self.EXTENSION_CATEGORIES.get(self.get_extension(target.name)) == 'Archives':
+                folder = target.with_name(target.stem)
+                archive_pool.submit(extract_archive, str(target), str(folder)).add_done_callback(
+                    partial(extracted, index, folder))
+
+        started = time.perf_counter()
+        try:
+            for batch_start in range(start_batch * self.batch_size, len(plan), self.batch_size):
+                for future in [move_pool.submit(execute, index)
+                               for index in range(batch_start, min(batch_start + self.batch_size, len(plan)))]:
+                    try:
+                        future.result()
+                    except OSError as error:
+                        errors.append(str(error))
+                journal.commit(batch_start // self.batch_size)
+                if on_progress:
+                    on_progress(dict(progress))
+            timings['move'] = time.perf_counter() - started
+            # Журнал закривається лише після розпакування: результати розпакування записуються в нього
+            started = time.perf_counter()
+            archive_pool.shutdown()
+            timings['extract'] = time.perf_counter() - started
+            journal.finish()
+        finally:
+            move_pool.shutdown()
+            archive_pool.shutdown()
+            journal.close()
+
+        return {'files': progress['moved'], 'archives': progress['extracted'], 'duplicates': progress['duplicates'],
+                'saved_bytes': progress['saved_bytes'], 'errors': errors, 'taken': taken, 'timings': timings}
+
+    def sort_folder(self, folder: Path, recursive=False, on_progress=None, files=None) -> dict:
+        """
+        Сортує файли папки у два етапи: планування всіх переміщень і виконання плану порціями
+        з журналом. Якщо попереднє сортування було перерване, воно продовжується з останньої
+        завершеної порції без повторного обходу папки.
+        Args:
+            folder (Path): Папка для сортування.
+            recursive (bool, optional): Сортувати також файли з вкладених папок. За замовчуванням - False.
+            on_progress (callable, optional): Викликається зі словником лічильників після кожної порції.
+            files (iterable, optional): Сортувати лише ці файли замість обходу папки.
+        Returns:
+            dict: Лічильники (файли, архіви, дублікати, помилки), тривалість етапів у секундах
+            та ознака продовження перерваного сортування ('resumed').
+        """
+        started_at = time.perf_counter()
+        journal = SortJournal(folder)
+        state = journal.load()
+        manifest = SortManifest(folder)
+        if state and not state['done']:
+            # Продовження з тим самим розміром порції і параметрами, з якими план було записано
+            batch_size, self.batch_size = self.batch_size, state['batch_size']
+            try:
+                journal.resume()
+                plan = state['plan']
+                report = self.execute_plan(plan, journal, state['committed'], on_progress)
+            finally:
+                self.batch_size = batch_size
+            report['resumed'] = True
+            manifest.add_targets(plan)
+        else:
+            plan, finder = self.plan_folder(folder, recursive, files)
+            plan_time = time.perf_counter() - started_at
+            journal.start(plan, self.batch_size, recursive)
+            report = self.execute_plan(plan, journal, on_progress=on_progress)
+            report['timings'] = {'plan': plan_time, **report['timings']}
+            report['resumed'] = False
+            manifest.update(finder)
+            # Посилання на дублікати не реєструються в пошуку дублікатів, тож дописуються з плану
+            manifest.add_targets(plan)
+        # Хеші, обчислені для запланованого призначення, не належать файлу, який його зайняв
+        manifest.forget(report['taken'])
+        manifest.remember_folders({(folder / target).parent for target in plan.targets})
+        manifest.save()
 
-        if target_path.exists():
-            target_path = target_folder / f"{normalized_name.stem}_{normalized_name.suffix}"
+        # Для нерекурсивного плану всі джерела лежать у самій папці, тож прибирати нічого
+        self.remove_empty_dirs(folder, plan)
+        report['timings']['total'] = time.perf_counter() - started_at
+        return report
 
-        shutil.move(str(file_name), str(target_path))
+    @staticmethod
+    def remove_extracted(extract_folder: Path, extraction):
+        """
+        Прибирає результат розпакування архіву: лише файли, які додало розпакування, порожні
+        після цього вкладені папки і саму папку, якщо її створило розпакування. Файли, які
+        були в папці раніше або з'явилися пізніше, залишаються.
+        """
+        folders = set()
+        for name in extraction['files']:
+            path = extract_folder / name
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+            except OSError:
+                continue
+            folders.update(parent for parent in path.parents if extract_folder in parent.parents)
+        if extraction['created']:
+            folders.add(extract_folder)
+        # Спершу найглибші папки; непорожні (з чужими файлами) залишаються
+        for path in sorted(folders, key=lambda path: len(path.parts), reverse=True):
+            try:
+                path.rmdir()
+            except OSError:
+                pass
 
-    def organize_folder(self, local_path):   
+    def undo_last_sort(self, folder: Path) -> int:
+        """
+        Скасовує останнє сортування за журналом: повертає переміщені файли на місце,
+        відновлює видалені дублікати копіюванням однакового файлу та прибирає файли, розпаковані з архівів.
+        Args:
+            folder (Path): Відсортована папка.
+        Returns:
+            int: Кількість відновлених файлів.
+        """
+        journal = SortJournal(folder)
+        state = journal.load()
+        if state is None:
+            return 0
+        plan = state['plan']
+        # Перервана порція могла бути виконана частково, тож переглядаємо й її
+        applied = len(plan) if state['done'] else min(len(plan), (state['committed'] + 1) * state['batch_size'])
+        restored = 0
+        for index in reversed(range(applied)):
+            op, source, target, duplicate = plan.action(index)
+            if source.exists():
+                continue
+            source.parent.mkdir(exist_ok=True, parents=True)
+            if op == 'drop':
+                for original in (target, *(duplicate or ())):
+                    if original.exists():
+                        shutil.copy2(original, source)
+                        restored += 1
+                        break
+            elif target.exists():
+                if index in state['extracted']:
+                    self.remove_extracted(folder / state['extracted'][index]['folder'], state['extracted'][index])
+                self.move_file(target, source)
+                restored += 1
+        for target_folder in {target.parent for target in (plan.folder / name for name in plan.targets)}:
+            try:
+                target_folder.rmdir()
+            except OSError:
+                pass
+        journal.remove()
+        return restored
+
+    def print_plan(self, plan: MovePlan, limit=50):
+        """
+        Виводить план сортування (пробний запуск) без виконання.
+        """
+        titles = {'move': 'перемістити', 'drop': 'видалити дублікат', 'link': 'замінити посиланням'}
+        for index in range(min(len(plan), limit)):
+            op = MovePlan.OP_NAMES[plan.ops[index]]
+            console.print(f'{titles[op]}: {plan.sources[index]} -> {plan.targets[index]}')
+        if len(plan) > limit:
+            console.print(f'[yellow]... та ще {len(plan) - limit} дій[/yellow]')
+        console.print(f'[cyan]Усього дій у плані: {len(plan)}[/cyan]')
+
+    def watch_folder(self, folder: Path, debounce=2.0, poll_interval=1.0, stop_event=None, on_report=None):
+        """
+        Стежить за папкою і сортує нові файли. Події накопичуються, доки в папці не настане
+        тиша на debounce секунд, після чого вся пачка сортується одним проходом.
+        Використовує inotify на Linux і періодичне опитування папки на інших системах.
+        Якщо спостерігач втратив події (переповнення черги inotify), наступний прохід
+        сортує всю папку, а не лише пачку імен.
+        Args:
+            folder (Path): Папка для спостереження.
+            debounce (float, optional): Тривалість тиші перед сортуванням, секунди. За замовчуванням - 2.
+            poll_interval (float, optional): Період опитування без inotify, секунди. За замовчуванням - 1.
+            stop_event (threading.Event, optional): Подія для зупинки спостереження. За замовчуванням - до Ctrl+C.
+            on_report (callable, optional): Викликається зі звітом після кожного проходу сортування.
+        """
+        from folder_watcher import make_watcher, RESCAN
+
+        watcher = make_watcher(folder, poll_interval)
+        pending = set()
+        rescan = False
+        last_event = time.monotonic()
+        try:
+            report = self.sort_folder(folder)
+            if on_report:
+                on_report(report)
+            while stop_event is None or not stop_event.is_set():
+                names = watcher.read(debounce if pending or rescan else poll_interval)
+                if names is RESCAN:
+                    rescan = True
+                    pending.clear()
+                    last_event = time.monotonic()
+                    continue
+                names -= self.SERVICE_FILES
+                if names:
+                    if not rescan:
+                        pending |= names
+                    last_event = time.monotonic()
+                elif rescan and time.monotonic() - last_event >= debounce:
+                    rescan = False
+                    report = self.sort_folder(folder)
+                    if on_report:
+                        on_report(report)
+                elif pending and time.monotonic() - last_event >= debounce:
+                    batch = [folder / name for name in sorted(pending) if (folder / name).is_file()]
+                    pending.clear()
+                    if batch:
+                        report = self.sort_folder(folder, files=batch)
+                        if on_report:
+                            on_report(report)
+        finally:
+            watcher.close()
+
+    def remove_empty_dirs(self, folder: Path, plan: MovePlan):
+        """
+        Видаляє вкладені папки, які спорожніли після рекурсивного сортування: папки, з яких
+        план забрав файли, та їхні батьківські папки, якщо ті теж стали порожніми.
+        Порожні папки, які створив сам користувач, залишаються.
+        """
+        emptied = {(folder / source).parent for source in plan.sources}
+        emptied.discard(folder)
+        # Спочатку найглибші папки, щоб батьківська папка встигла спорожніти
+        for current in sorted(emptied, key=lambda path: len(path.parts), reverse=True):
+            while current != folder and folder in current.parents:
+                try:
+                    current.rmdir()
+                except OSError:
+                    break
+                current = current.parent
+
+    def organize_folder(self, local_path, recursive=None):   
         self.folder_path = Path(local_path) 
 
         if not self.folder_path.exists() or not self.folder_path.is_dir():     
@@ -66,7 +1119,66 @@ class FolderOrganizer:
                     self.organize_folder(new_user_input)
                     # return
         else:
-            for item in self.folder_path.iterdir():
-                if item.is_file():
-                    self.handle_file(item, self.folder_path)
-            console.print(f'[green]Файли в папці "{self.folder_path.name}" відсортовані.[/green]')
\ No newline at end of file
+            state = SortJournal(self.folder_path).load()
+            if state and not state['done']:
+                console.print('[yellow]Знайдено перерване сортування - продовжую з останньої завершеної порції.[/yellow]')
+                recursive = state['recursive']
+            elif recursive is None:
+                recursive = self.ask_recursive()
+            with console.status('Сортування файлів...') as status:
+                def show_progress(progress):
+                    status.update(f"Сортування файлів: знайдено {progress['scanned']}, переміщено {progress['moved']}, "
+                                  f"розпаковано архівів {progress['extracted']}")
+                report = self.sort_folder(self.folder_path, recursive=recursive, on_progress=show_progress)
+            console.print(f'[green]Файли в папці "{self.folder_path.name}" відсортовані.[/green]')
+            phases = ', '.join(f'{phase}: {seconds * 1000:.1f} мс' for phase, seconds in report['timings'].items())
+            console.print(f"[cyan]Переміщено файлів: {report['files']}, розпаковано архівів: {report['archives']}, "
+                          f"дублікатів: {report['duplicates']} ({report['saved_bytes']} байт не скопійовано) ({phases})[/cyan]")
+            for error in report['errors']:
+                console.print(f'[red]Помилка: {error}[/red]')
+
+    @staticmethod
+    def ask_recursive():
+        return input('Сортувати також вкладені папки? (так/ні): ').strip().lower() in ('так', 'т', 'yes', 'y')
+
+    def preview_folder_from_console(self, local_path, recursive=None):
+        """
+        Пробний запуск: будує та виводить план сортування, не змінюючи файли.
+        """
+        folder = Path(local_path)
+        if not folder.is_dir():
+            console.print(f'[red]Папка "{folder}" не існує.[/red]')
+            return
+        if recursive is None:
+            recursive = self.ask_recursive()
+        plan, _ = self.plan_folder(folder, recursive)
+        self.print_plan(plan)
+
+    def undo_from_console(self, local_path):
+        """
+        Скасовує останнє сортування папки за журналом.
+        """
+        folder = Path(local_path)
+        if not (folder / SortJournal.FILE_NAME).exists():
+            console.print(f'[red]Для папки "{folder}" немає журналу сортування.[/red]')
+            return
+        restored = self.undo_last_sort(folder)
+        console.print(f'[green]Сортування скасовано, відновлено файлів: {restored}.[/green]')
+
+    def watch_folder_from_console(self, local_path):
+        """
+        Запускає спостереження за папкою з консолі до натискання Ctrl+C.
+        """
+        folder = Path(local_path)
+        if not folder.is_dir():
+            console.print(f'[red]Папка "{folder}" не існує.[/red]')
+            return
+
+        def show_report(report):
+            console.print(f"[green]Відсортовано файлів: {report['files']}, дублікатів: {report['duplicates']}[/green]")
+
+        console.print(f'[cyan]Стежу за папкою "{folder}". Натисніть Ctrl+C, щоб зупинити.[/cyan]')
+        try:
+            self.watch_folder(folder, on_report=show_report)
+        except KeyboardInterrupt:
+            console.print('[cyan]Спостереження зупинено.[/cyan]')
@@ -0,0 +1,87 @@
+import sys
+from lazy_console import LazyConsole
+
+console = LazyConsole()
+
+
+class PagedTable:
+    """
+    Посторінковий перегляд великих таблиць. Рядки запитуються в менеджера лише для
+    видимої сторінки, тож час до першого екрана не залежить від розміру колекції.
+    Якщо вивід не є терміналом (перенаправлено у файл чи іншу програму), рядки
+    виводяться без стилів і таблиць, порціями по одній сторінці.
+    """
+
+    # False - завжди простий текст без запитів введення (пакетний режим читає команди зі stdin)
+    interactive = True
+
+    def __init__(self, title, columns, fetch_page, total, page_size=20, justify=None):
+        """
+        Args:
+            title (str): Заголовок таблиці.
+            columns (list): Пари (назва колонки, стиль).
+            fetch_page (callable): fetch_page(offset, limit) повертає список рядків (кортежів рядків).
+            total (int): Загальна кількість рядків.
+            page_size (int, optional): Кількість рядків на сторінці. За замовчуванням - 20.
+            justify (str, optional): Вирівнювання вмісту колонок.
+        """
+        self.title = title
+        self.columns = columns
+        self.fetch_page = fetch_page
+        self.total = total
+        self.page_size = page_size
+        self.justify = justify
+
+    @property
+    def pages(self):
+        return max(1, -(-self.total // self.page_size))
+
+    def render_page(self, page):
+        """
+        Будує таблицю rich лише для рядків однієї сторінки.
+        Args:
+            page (int): Номер сторінки, починаючи з 1.
+        Returns:
+            Table: Таблиця сторінки.
+        """
+        from rich.table import Table
+
+        title = f"{self.title} (сторінка {page} з {self.pages})" if self.pages > 1 else self.title
+        table = Table(title=title)
+        for header, style in self.columns:
+            table.add_column(f"[{style}]{header}[/{style}]", style=style, justify=self.justify)
+        for row in self.fetch_page((page - 1) * self.page_size, self.page_size):
+            table.add_row(*row)
+        return table
+
+    def print_plain(self, stream=None):
+        """
+        Швидкий вивід без стилів: рядки через табуляцію, сторінка за сторінкою.
+        """
+        stream = stream or sys.stdout
+        for offset in range(0, self.total, self.page_size):
+            stream.write(''.join('\t'.join(row) + '\n' for row in self.fetch_page(offset, self.page_size)))
+        stream.flush()
+
+    def show(self, justify="center"):
+        """
+        Показує таблицю: у терміналі - посторінково з переходами вперед, назад і на номер
+        сторінки, при перенаправленому виводі - простим текстом.
+        """
+        if not self.interactive or not console.is_terminal:
+            self.print_plain()
+            return
+        page = 1
+        while True:
+            console.print(self.render_page(page), justify=justify)
+            if self.pages == 1:
+                return
+            answer = input(f"[n] далі, [p] назад, номер сторінки (1-{self.pages}) або Enter для виходу: ").strip().lower()
+            if answer in ('n', 'д', '>'):
+                page = min(page + 1, self.pages)
+            elif answer in ('p', 'н', '<'):
+                page = max(page - 1, 1)
+            elif answer.isdigit():
+                page = min(max(int(answer), 1), self.pages)
+            else:
+                return
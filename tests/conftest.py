@@ -0,0 +1,48 @@
+import os
+import sys
+from datetime import date
+
+import pytest
+
+# Модулі помічника лежать у корені репозиторію, а не в пакеті
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from contact_manager import ContactManager  # noqa: E402
+from table_view import PagedTable  # noqa: E402
+from undo_history import UndoHistory  # noqa: E402
+
+BIRTHDAY = date(1990, 5, 17)
+
+
+@pytest.fixture(autouse=True)
+def plain_tables(monkeypatch):
+    # Таблиці виводяться простим текстом і не чекають на введення
+    monkeypatch.setattr(PagedTable, 'interactive', False)
+
+
+@pytest.fixture
+def book_path(tmp_path):
+    return str(tmp_path / 'addressbook.csv')
+
+
+@pytest.fixture
+def book(book_path):
+    """
+    Порожня книга контактів з історією змін. Автозбереження відкладене на 60 секунд,
+    тож журнал записується лише явним flush().
+    """
+    return ContactManager(book_path, autosave_delay=60, history=UndoHistory())
+
+
+def add(manager, name, phone, email, birthday=BIRTHDAY, address='Київ'):
+    return manager.create_contact(name, address, phone, email, birthday)
+
+
+def reload(book_path):
+    manager = ContactManager(book_path, autosave_delay=60)
+    manager.load(background=False)
+    return manager
+
+
+def snapshot(manager):
+    return sorted((contact.id,) + manager.contact_state(contact) for contact in manager.contacts)
@@ -0,0 +1,114 @@
+import asyncio
+import builtins
+import json
+
+import pytest
+
+from conftest import add
+
+
+@pytest.fixture
+def facade(tmp_path, monkeypatch):
+    """
+    Фасад з книгою контактів і нотатками у тимчасовій папці.
+    """
+    monkeypatch.delenv('ASSISTANT_STORAGE', raising=False)
+    monkeypatch.chdir(tmp_path)
+    from assistant import PersonalAssistantFacade
+
+    facade = PersonalAssistantFacade()
+    yield facade
+    # Шляхи файлів відносні: зміни зберігаються, поки поточна папка ще тимчасова,
+    # а не під час виходу з інтерпретатора
+    facade.exit()
+    facade.contact_manager._autosave.close()
+    facade.notes_manager._autosave.close()
+
+
+@pytest.fixture
+def api(facade):
+    from api_server import AssistantApiServer, ReadWriteLock
+
+    server = AssistantApiServer(facade, workers=1)
+    server.lock = ReadWriteLock()
+    yield lambda method, target, body=None: asyncio.run(
+        server.dispatch(method, target, json.dumps(body).encode() if body is not None else b''))
+    server.executor.shutdown()
+
+
+def answer_with(monkeypatch, *answers):
+    answers = iter(answers)
+    monkeypatch.setattr(builtins, 'input', lambda prompt='': next(answers))
+
+
+def test_batch_delete_and_unexpected_errors(facade, monkeypatch):
+    """
+    Регресія: пакетне видалення контакту падало з TypeError, а непередбачена помилка
+    однієї команди переривала весь сценарій.
+    """
+    errors = facade.run_batch([
+        "додати контакт Іван Петренко; Київ; +380502223344; ivan@example.com; 17-05-1990",
+        "додати контакт Олена Коваль; Львів; +380501112233; olena@example.com; 01-01-1991",
+        "видалити контакт +380502223344",
+        "список контактів",
+    ])
+    assert errors == 0
+    assert [contact.name for contact in facade.contact_manager.contacts] == ['Олена Коваль']
+
+    def broken(*args):
+        raise RuntimeError('збій')
+
+    monkeypatch.setattr(facade.contact_manager, 'create_contact', broken)
+    errors = facade.run_batch([
+        "додати контакт Тарас Шевчук; Полтава; +380503334455; taras@example.com; 03-03-1993",
+        "додати нотатку Купити хліб; покупки",
+    ])
+    assert errors == 1
+    assert [note.text for note in facade.find_notes(tags=['покупки'])] == ['Купити хліб']
+
+
+def test_api_rejects_non_string_fields(facade, api):
+    """
+    Регресія: PATCH зберігав нерядкові поля, а рядок замість списку тегів розбивався на символи.
+    """
+    contact = add(facade.contact_manager, 'Іван Петренко', '+380502223344', 'ivan@example.com')
+
+    status, data = api('PATCH', f'/contacts/{contact.id}', {'phone': 380502223344})
+    assert status == 400 and 'phone' in data['error']
+    status, data = api('PATCH', f'/contacts/{contact.id}', {'name': ['Іван']})
+    assert status == 400
+    assert (contact.name, contact.phone) == ('Іван Петренко', '+380502223344')
+    status, data = api('PATCH', f'/contacts/{contact.id}', {'name': 'Іван Іваненко'})
+    assert status == 200 and data['name'] == 'Іван Іваненко'
+
+    assert api('POST', '/notes', {'text': 'Купити хліб', 'tags': 'покупки'})[0] == 400
+    assert api('POST', '/notes', {'text': 'Купити хліб', 'tags': ['покупки', 1]})[0] == 400
+    status, note = api('POST', '/notes', {'text': 'Купити хліб', 'tags': ['покупки']})
+    assert status == 201
+    assert api('PATCH', f"/notes/{note['id']}", {'text': 5})[0] == 400
+    assert api('PATCH', f"/notes/{note['id']}", {'tags': 'дім'})[0] == 400
+    status, data = api('PATCH', f"/notes/{note['id']}", {'tags': ['дім']})
+    assert status == 200 and data['text'] == 'Купити хліб' and data['tags'] == ['#дім']
+
+
+def test_fuzzy_match_needs_explicit_choice(facade, monkeypatch):
+    """
+    Регресія: видалення і редагування брали найближчий нечіткий збіг без підтвердження.
+    """
+    manager = facade.contact_manager
+    contact = add(manager, 'Іван Петренко', '+380502223344', 'ivan@example.com')
+
+    # Пошук лише показує схожі контакти
+    assert manager.search_contacts('Петрнеко') is None
+
+    answer_with(monkeypatch, 'Петрнеко', '')
+    manager.delete_contact()
+    assert manager.contacts == [contact]
+
+    answer_with(monkeypatch, 'Петрнеко', '7')
+    manager.delete_contact()
+    assert manager.contacts == [contact]
+
+    answer_with(monkeypatch, 'Петрнеко', '1')
+    manager.delete_contact()
+    assert manager.contacts == []
@@ -0,0 +1,174 @@
+import builtins
+
+import pytest
+
+from conftest import add, reload, snapshot
+from contact_transfer import validate_chunk
+
+
+def test_journal_replay_and_compaction(book, book_path):
+    """
+    Зміни після знімка відтворюються з журналу, а ущільнення не змінює книгу.
+    """
+    add(book, 'Олена Коваль', '+380501112233', 'olena@example.com')
+    book.dump()
+    ivan = add(book, 'Іван Петренко', '+380502223344', 'ivan@example.com')
+    taras = add(book, 'Тарас Шевчук', '+380503334455', 'taras@example.com')
+    book.update_contact(ivan, name='Іван Петренко-Новий', phone='+380509998877')
+    book.remove_contact(taras)
+    book.flush()
+
+    assert list(book.storage.read_journal())
+    replayed = reload(book_path)
+    assert snapshot(replayed) == snapshot(book)
+    assert replayed.find_by_phone('+380509998877').name == 'Іван Петренко-Новий'
+
+    replayed.dump()
+    assert not list(replayed.storage.read_journal())
+    compacted = reload(book_path)
+    assert snapshot(compacted) == snapshot(book)
+
+
+def test_legacy_snapshot_without_ids_keeps_journal_ids(book_path):
+    """
+    Рядки старого знімка без колонки id нумеруються з 1 і після відтворення журналу.
+    """
+    with open(book_path, 'w', encoding='UTF-8') as fh:
+        fh.write('name,address,phone,email,birthday\n'
+                 'Миколай,Запоріжжя,1111111111,as@ss.ss,12-12-1955\n'
+                 'Ольга,Харків,222222222,ds@eee.ee,02-02-1993\n'
+                 'Олексій,Рівне,99999999,trtr@ddd.tt,15-08-1983\n')
+    book = reload(book_path)
+    book.update_contact(book.get_contact(2), name='Ольга Змінена')
+    add(book, 'Нова Людина', '+380504445566', 'new@example.com')
+    book.flush()
+
+    replayed = reload(book_path)
+    assert [(contact.id, contact.name) for contact in sorted(replayed.contacts, key=lambda contact: contact.id)] == \
+        [(1, 'Миколай'), (2, 'Ольга Змінена'), (3, 'Олексій'), (4, 'Нова Людина')]
+    # Ще один сеанс з тим самим журналом дає ті самі id
+    assert snapshot(reload(book_path)) == snapshot(replayed)
+
+
+def test_indexes_follow_edit_delete_and_undo(book):
+    contact = add(book, 'Іван Петренко', '+380502223344', 'ivan@example.com')
+
+    book.update_contact(contact, name='Петро Іваненко', phone='+380509998877')
+    assert book.find_by_phone('+380502223344') is None
+    assert book.find_by_phone('+380509998877') is contact
+    assert book._contacts_by_ids(book._search('Іваненко')) == [contact]
+    assert not book._search('Петренко')
+
+    book.remove_contact(contact)
+    assert book.find_by_phone('+380509998877') is None
+    assert book.find_by_email('ivan@example.com') is None
+    assert not book._search('Іваненко')
+
+    # Скасування видалення, потім редагування
+    book.history.undo()
+    restored = book.find_by_phone('+380509998877')
+    assert restored is not None and restored.name == 'Петро Іваненко'
+    book.history.undo()
+    assert book.find_by_phone('+380509998877') is None
+    assert book.find_by_phone('+380502223344').name == 'Іван Петренко'
+    assert [found.name for found in book._contacts_by_ids(book._search('Петренко'))] == ['Іван Петренко']
+    assert not book._search('Іваненко')
+
+    book.history.redo()
+    assert book.find_by_phone('+380509998877').name == 'Петро Іваненко'
+
+
+def test_interrupted_console_edit_keeps_contact_indexed(book, monkeypatch):
+    contact = add(book, 'Іван Петренко', '+380502223344', 'ivan@example.com')
+    answers = iter(['Інше Ім’я', 'Львів'])
+
+    def answer(prompt=''):
+        try:
+            return next(answers)
+        except StopIteration:
+            raise KeyboardInterrupt
+
+    monkeypatch.setattr(builtins, 'input', answer)
+    with pytest.raises(KeyboardInterrupt):
+        book.edit_contact(contact)
+    assert (contact.name, contact.address) == ('Іван Петренко', 'Київ')
+    assert book.find_by_phone('+380502223344') is contact
+    assert book._contacts_by_ids(book._search('Петренко')) == [contact]
+    # Перерване редагування не потрапляє в історію: там лише створення контакту
+    assert len(book.history) == 1
+
+
+def test_import_skips_duplicates_from_book_and_file(book, book_path):
+    add(book, 'Олена Коваль', '+380501112233', 'olena@example.com')
+    rows = [
+        (2, ('Іван Петренко', 'Київ', '+380502223344', 'ivan@example.com', '17-05-1990')),
+        # Той самий телефон, що вже є в книзі
+        (3, ('Олена Друга', 'Львів', '+380501112233', 'other@example.com', '01-01-1991')),
+        # Та сама пошта, що в рядку 2 цього ж файлу (регістр не важливий)
+        (4, ('Іван Дубль', 'Одеса', '+380507778899', 'IVAN@example.com', '02-02-1992')),
+        (5, ('Тарас Шевчук', 'Полтава', '+380503334455', 'taras@example.com', '03-03-1993')),
+    ]
+
+    imported, errors = book.import_records(validate_chunk(rows))
+
+    assert imported == 2
+    assert [row for row, _ in errors] == [3, 4]
+    assert sorted(contact.name for contact in book.contacts) == ['Іван Петренко', 'Олена Коваль', 'Тарас Шевчук']
+    assert snapshot(reload(book_path)) == snapshot(book)
+    # Увесь імпорт скасовується одним кроком
+    book.history.undo()
+    assert [contact.name for contact in book.contacts] == ['Олена Коваль']
+
+
+def test_failed_flush_keeps_changes_for_retry(book, book_path, monkeypatch):
+    contact = add(book, 'Іван Петренко', '+380502223344', 'ivan@example.com')
+    append_many = book.storage.append_many
+
+    def failing(changes):
+        raise OSError('диск заповнено')
+
+    monkeypatch.setattr(book.storage, 'append_many', failing)
+    book.flush()
+    assert book._autosave.dirty
+    assert not list(book.storage.read_journal())
+
+    monkeypatch.setattr(book.storage, 'append_many', append_many)
+    book.flush()
+    assert not book._autosave.dirty
+    assert reload(book_path).find_by_phone('+380502223344').id == contact.id
+
+
+def test_queued_change_is_written_as_committed(book, book_path):
+    contact = add(book, 'Іван Петренко', '+380502223344', 'ivan@example.com')
+    # Зміна об'єкта після _commit (наприклад, незавершене редагування) не потрапляє в журнал
+    contact.name = 'Напівзмінений'
+    book.flush()
+    assert [record['name'] for _, record in book.storage.read_journal()] == ['Іван Петренко']
+
+
+def test_search_index_matches_full_scan_for_short_and_long_queries(book):
+    people = [('Іван Петренко', '+380502223344', 'ivan@example.com'),
+              ('Олена Коваль', '+380501112233', 'olena@mail.com'),
+              ('Петро Іваненко', '+380509998877', 'petro@example.com'),
+              ('Ян Ко', '+380504445566', 'yan@ko.ua')]
+    for name, phone, email in people:
+        add(book, name, phone, email)
+    index = book._search_index
+    contact = book.find_by_phone('+380504445566')
+    book.update_contact(contact, name='Ян Коваленко')
+
+    def check():
+        for query in ('і', 'ко', 'ан', 'ван', 'ваЛ', '44', '@ex', 'я', 'яр', 'zz', 'Коваленко'):
+            normalized = query.casefold()
+            expected = {contact_id for contact_id, texts in index._texts.items()
+                        if index.rank(normalized, texts) is not None}
+            assert set(index.search(query)) == expected, query
+
+    check()
+    assert index._substring_candidates('ол') == [book.find_by_phone('+380501112233').id]
+    # Індекс коротких n-грам уже побудовано: далі він оновлюється разом з книгою
+    book.update_contact(book.find_by_phone('+380502223344'), name='Ярема Оліфіренко')
+    book.remove_contact(book.find_by_phone('+380509998877'))
+    add(book, 'Ярослава Ко', '+380507778899', 'yaroslava@ko.ua')
+    check()
+    assert [found.name for found in book._contacts_by_ids(book._search('ян'))] == ['Ян Коваленко']
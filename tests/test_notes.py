@@ -0,0 +1,48 @@
+import pytest
+
+from notes_manager import NotesManager
+from undo_history import UndoHistory
+
+
+@pytest.fixture
+def notes(tmp_path):
+    manager = NotesManager(str(tmp_path / 'notes.csv'), autosave_delay=60, history=UndoHistory())
+    manager.create_note('Купити хліб', ['покупки', 'Дім'])
+    manager.create_note('Полагодити кран', ['дім', 'ремонт'])
+    manager.create_note('Прочитати книгу', ['читання'])
+    manager.create_note('Без тегів', [])
+    return manager
+
+
+def reference_rows(manager):
+    rows = {(tag.casefold(), note.id, note.text) for note in manager.notes for tag in note.tags}
+    return [(tag, text) for tag, _, text in sorted(rows)]
+
+
+def test_tag_index_follows_edit_delete_and_undo(notes):
+    def texts(tags, **options):
+        return sorted(note.text for note in notes.notes_by_tags(tags, **options))
+
+    assert texts(['ДІМ']) == ['Купити хліб', 'Полагодити кран']
+    assert texts(['дім', 'ремонт']) == ['Полагодити кран']
+    assert texts(['ремонт', 'читання'], mode='or') == ['Полагодити кран', 'Прочитати книгу']
+    assert texts(['по'], prefix=True) == ['Купити хліб']
+    assert texts(['та'], substring=True) == ['Прочитати книгу']
+
+    notes.update_note(0, 'Купити молоко', ['покупки'])
+    notes.remove_note(1)
+    assert texts(['дім']) == []
+    notes.history.undo()
+    notes.history.undo()
+    assert texts(['дім']) == ['Купити хліб', 'Полагодити кран']
+
+
+def test_tag_rows_page_matches_sorted_rows(notes):
+    notes.update_note(2, 'Прочитати дві книги', ['читання', 'Покупки'])
+    expected = reference_rows(notes)
+
+    assert notes._tag_rows_total() == len(expected)
+    for limit in (1, 2, 3, len(expected) + 1):
+        rows = [row for offset in range(0, len(expected), limit) for row in notes._tag_rows(offset, limit)]
+        assert [(tag.casefold(), text) for tag, text in rows] == expected, limit
+    assert notes._tag_rows(len(expected), 5) == []
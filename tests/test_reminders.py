@@ -0,0 +1,42 @@
+from datetime import date, datetime, time
+
+from birthday_reminder import BirthdayReminder
+from conftest import add
+from contact_index import next_birthday
+
+TODAY = date(2025, 3, 1)
+
+
+def birthday_after(contact, today):
+    return next_birthday(contact.birthday, today)
+
+
+def test_reminder_fires_once_and_moves_to_next_year(book):
+    reminder = BirthdayReminder(birthday_after, days_before=1, at=time(8, 30))
+    ivan = add(book, 'Іван Петренко', '+380502223344', 'ivan@example.com', birthday=date(1990, 3, 5))
+    olena = add(book, 'Олена Коваль', '+380501112233', 'olena@example.com', birthday=date(1991, 3, 3))
+    reminder.rebuild(book.contacts, today=TODAY)
+    assert reminder.upcoming() == [(olena, date(2025, 3, 3)), (ivan, date(2025, 3, 5))]
+
+    # За день до дня народження о 8:30, не раніше
+    assert reminder._due(datetime(2025, 3, 2, 8, 29).timestamp()) == []
+    assert reminder._due(datetime(2025, 3, 2, 8, 30).timestamp()) == [(olena, date(2025, 3, 3))]
+    assert reminder._due(datetime(2025, 3, 2, 9, 0).timestamp()) == []
+    assert reminder.upcoming() == [(ivan, date(2025, 3, 5)), (olena, date(2026, 3, 3))]
+
+
+def test_reminders_follow_edit_delete_and_undo(book):
+    # Потік не запускається: перевіряється лише планування на фіксовану дату
+    book.reminder = BirthdayReminder(lambda contact, today: book.get_next_birthday(contact, TODAY))
+    ivan = add(book, 'Іван Петренко', '+380502223344', 'ivan@example.com', birthday=date(1990, 12, 30))
+    olena = add(book, 'Олена Коваль', '+380501112233', 'olena@example.com', birthday=date(1991, 12, 31))
+    assert [contact for contact, _ in book.reminder.upcoming()] == [ivan, olena]
+
+    book.update_contact(olena, birthday=date(1991, 12, 29))
+    assert [contact for contact, _ in book.reminder.upcoming()] == [olena, ivan]
+
+    book.remove_contact(ivan)
+    assert [contact.id for contact, _ in book.reminder.upcoming()] == [olena.id]
+    book.history.undo()
+    assert [contact.id for contact, _ in book.reminder.upcoming()] == [olena.id, ivan.id]
+    assert len(book.reminder) == 2
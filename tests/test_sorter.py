@@ -0,0 +1,185 @@
+import io
+import tarfile
+import zipfile
+
+import os
+
+from sorter_manager import FolderOrganizer, SortJournal, extract_archive
+
+
+def make_zip(path, members):
+    with zipfile.ZipFile(path, 'w') as archive:
+        for name, data in members.items():
+            archive.writestr(name, data)
+
+
+def test_extract_zip(tmp_path):
+    archive = tmp_path / 'photos.zip'
+    make_zip(archive, {'a.txt': 'перший', 'inner/b.txt': 'другий'})
+
+    assert extract_archive(str(archive), str(tmp_path / 'photos')) == (None, True, ['a.txt', 'inner/b.txt'])
+    assert (tmp_path / 'photos' / 'a.txt').read_text() == 'перший'
+    assert (tmp_path / 'photos' / 'inner' / 'b.txt').read_text() == 'другий'
+
+
+def test_extract_zip_rejects_paths_outside_folder(tmp_path):
+    archive = tmp_path / 'evil.zip'
+    make_zip(archive, {'ok.txt': 'так', '../escaped.txt': 'ні'})
+
+    assert extract_archive(str(archive), str(tmp_path / 'evil'))[0] is not None
+    assert not (tmp_path / 'escaped.txt').exists()
+    # Папку, створену розпакуванням, прибрано
+    assert not (tmp_path / 'evil').exists()
+
+
+def test_extract_broken_zip_keeps_existing_folder(tmp_path):
+    archive = tmp_path / 'broken.zip'
+    archive.write_bytes(b'not a zip')
+    (tmp_path / 'broken').mkdir()
+    (tmp_path / 'broken' / 'mine.txt').write_text('файл користувача')
+
+    assert extract_archive(str(archive), str(tmp_path / 'broken'))[0] is not None
+    assert (tmp_path / 'broken' / 'mine.txt').exists()
+
+
+def test_extract_tar(tmp_path):
+    archive = tmp_path / 'docs.tar'
+    with tarfile.open(archive, 'w') as tar:
+        data = 'вміст'.encode()
+        info = tarfile.TarInfo('doc.txt')
+        info.size = len(data)
+        tar.addfile(info, io.BytesIO(data))
+
+    assert extract_archive(str(archive), str(tmp_path / 'docs'))[0] is None
+    assert (tmp_path / 'docs' / 'doc.txt').read_text() == 'вміст'
+
+
+def test_extract_into_existing_folder_reports_only_added_files(tmp_path):
+    archive = tmp_path / 'photos.zip'
+    make_zip(archive, {'a.txt': 'перший', 'mine.txt': 'з архіву'})
+    (tmp_path / 'photos').mkdir()
+    (tmp_path / 'photos' / 'mine.txt').write_text('файл користувача')
+
+    assert extract_archive(str(archive), str(tmp_path / 'photos')) == (None, False, ['a.txt'])
+
+
+def test_sort_folder_extracts_zip(tmp_path):
+    make_zip(tmp_path / 'archive.zip', {'note.txt': 'текст'})
+    (tmp_path / 'photo.jpg').write_bytes(b'jpg')
+
+    report = FolderOrganizer(max_workers=2, archive_workers=1).sort_folder(tmp_path)
+
+    assert report['errors'] == []
+    assert report['archives'] == 1
+    assert (tmp_path / 'ZIP' / 'archive.zip').exists()
+    assert (tmp_path / 'ZIP' / 'archive' / 'note.txt').read_text() == 'текст'
+    assert (tmp_path / 'JPG' / 'photo.jpg').exists()
+
+
+def plan_duplicate(tmp_path):
+    (tmp_path / 'JPG').mkdir()
+    (tmp_path / 'JPG' / 'photo.jpg').write_bytes(b'same picture')
+    (tmp_path / 'photo copy.jpg').write_bytes(b'same picture')
+    organizer = FolderOrganizer(max_workers=2, archive_workers=1, duplicates='delete')
+    plan, _ = organizer.plan_folder(tmp_path)
+    assert [plan.action(index)[0] for index in range(len(plan))] == ['drop']
+    return organizer, plan
+
+
+def execute(organizer, plan, folder):
+    journal = SortJournal(folder)
+    journal.start(plan, organizer.batch_size)
+    return organizer.execute_plan(plan, journal)
+
+
+def test_duplicate_is_dropped_when_copy_is_intact(tmp_path):
+    organizer, plan = plan_duplicate(tmp_path)
+
+    report = execute(organizer, plan, tmp_path)
+
+    assert report['duplicates'] == 1
+    assert not (tmp_path / 'photo copy.jpg').exists()
+    assert sorted(path.name for path in (tmp_path / 'JPG').iterdir()) == ['photo.jpg']
+
+
+def test_duplicate_is_moved_when_copy_changed_after_planning(tmp_path):
+    organizer, plan = plan_duplicate(tmp_path)
+    (tmp_path / 'JPG' / 'photo.jpg').write_bytes(b'edited picture')
+
+    report = execute(organizer, plan, tmp_path)
+
+    assert report['duplicates'] == 0 and report['files'] == 1
+    contents = sorted(path.read_bytes() for path in (tmp_path / 'JPG').iterdir())
+    assert contents == [b'edited picture', b'same picture']
+    # Скасування повертає переміщений файл, а не копію зміненого
+    assert organizer.undo_last_sort(tmp_path) == 1
+    assert (tmp_path / 'photo copy.jpg').read_bytes() == b'same picture'
+    assert [path.name for path in (tmp_path / 'JPG').iterdir()] == ['photo.jpg']
+
+
+def test_duplicate_is_moved_when_copy_vanished(tmp_path):
+    organizer, plan = plan_duplicate(tmp_path)
+    (tmp_path / 'JPG' / 'photo.jpg').unlink()
+
+    execute(organizer, plan, tmp_path)
+
+    assert (tmp_path / 'JPG' / 'photo.jpg').read_bytes() == b'same picture'
+
+
+def test_undo_removes_only_what_extraction_added(tmp_path):
+    make_zip(tmp_path / 'new.zip', {'inner/a.txt': 'з архіву'})
+    make_zip(tmp_path / 'old.zip', {'b.txt': 'з архіву'})
+    # Папка розпакування old.zip уже існує і містить файл користувача
+    (tmp_path / 'ZIP' / 'old').mkdir(parents=True)
+    (tmp_path / 'ZIP' / 'old' / 'kept.txt').write_text('файл користувача')
+    organizer = FolderOrganizer(max_workers=2, archive_workers=1)
+    assert organizer.sort_folder(tmp_path)['archives'] == 2
+    # Після сортування користувач додав файл у створену розпакуванням папку
+    (tmp_path / 'ZIP' / 'new' / 'later.txt').write_text('доданий пізніше')
+
+    assert organizer.undo_last_sort(tmp_path) == 2
+
+    assert (tmp_path / 'new.zip').exists() and (tmp_path / 'old.zip').exists()
+    assert (tmp_path / 'ZIP' / 'old' / 'kept.txt').exists()
+    assert not (tmp_path / 'ZIP' / 'old' / 'b.txt').exists()
+    assert (tmp_path / 'ZIP' / 'new' / 'later.txt').exists()
+    assert not (tmp_path / 'ZIP' / 'new' / 'inner').exists()
+
+
+def test_resume_completes_interrupted_move_without_second_link(tmp_path):
+    (tmp_path / 'report.txt').write_text('звіт')
+    organizer = FolderOrganizer(max_workers=2, archive_workers=1)
+    plan, _ = organizer.plan_folder(tmp_path)
+    journal = SortJournal(tmp_path)
+    journal.start(plan, organizer.batch_size)
+    journal.close()
+    # Процес завершився між створенням нового імені та видаленням старого
+    (tmp_path / 'TXT').mkdir()
+    os.link(tmp_path / 'report.txt', tmp_path / 'TXT' / 'report.txt')
+
+    report = organizer.sort_folder(tmp_path)
+
+    assert report['resumed'] and report['files'] == 1 and report['errors'] == []
+    assert not (tmp_path / 'report.txt').exists()
+    assert [path.name for path in (tmp_path / 'TXT').iterdir()] == ['report.txt']
+
+
+def test_resume_completes_interrupted_link(tmp_path):
+    (tmp_path / 'JPG').mkdir()
+    (tmp_path / 'JPG' / 'photo.jpg').write_bytes(b'same picture')
+    (tmp_path / 'photo copy.jpg').write_bytes(b'same picture')
+    organizer = FolderOrganizer(max_workers=2, archive_workers=1)
+    plan, _ = organizer.plan_folder(tmp_path)
+    op, source, target, duplicate = plan.action(0)
+    assert op == 'link'
+    journal = SortJournal(tmp_path)
+    journal.start(plan, organizer.batch_size)
+    journal.close()
+    os.link(duplicate[-1], target)
+
+    report = organizer.sort_folder(tmp_path)
+
+    assert report['duplicates'] == 1
+    assert not source.exists()
+    assert sorted(path.name for path in (tmp_path / 'JPG').iterdir()) == sorted(['photo.jpg', target.name])
+    assert os.path.samefile(target, tmp_path / 'JPG' / 'photo.jpg')
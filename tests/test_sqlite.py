@@ -0,0 +1,110 @@
+import sqlite3
+from datetime import date
+
+import pytest
+
+from conftest import add
+from contact_manager import ContactManager, SqliteContactManager
+from contact_storage import SqliteContactStorage
+from notes_manager import NotesManager, SqliteNotesManager
+from notes_storage import SqliteNotesStorage
+from undo_history import UndoHistory
+
+PEOPLE = [('Іван Петренко', '+380502223344', 'ivan@example.com'),
+          ('Олена Коваль', '+380501112233', 'olena@mail.com'),
+          ('Петро Іваненко', '+380509998877', 'petro@example.com')]
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / 'assistant.db')
+
+
+def sqlite_book(db_path, history=None):
+    return SqliteContactManager(SqliteContactStorage(db_path, csv_path=None), autosave_delay=60, history=history)
+
+
+def names(manager, query):
+    return [contact.name for contact in manager._contacts_by_ids(manager._search(query))]
+
+
+def test_sqlite_contacts_match_memory_book(tmp_path, db_path):
+    memory = ContactManager(str(tmp_path / 'addressbook.csv'), autosave_delay=60)
+    stored = sqlite_book(db_path)
+    for manager in (memory, stored):
+        for name, phone, email in PEOPLE:
+            add(manager, name, phone, email)
+        with pytest.raises(ValueError):
+            add(manager, 'Дубль', '+380502223344', 'other@example.com')
+
+    for query in ('петр', 'ко', 'і', '2233', 'example', 'zz'):
+        assert names(stored, query) == names(memory, query), query
+    assert stored.find_by_email('OLENA@mail.com').name == 'Олена Коваль'
+    assert [contact.name for contact, _ in stored.fuzzy_contacts('Petrenko')][:1] == ['Іван Петренко']
+
+
+def test_sqlite_contacts_persist_and_undo(db_path):
+    history = UndoHistory()
+    stored = sqlite_book(db_path, history)
+    ivan = add(stored, *PEOPLE[0])
+    add(stored, *PEOPLE[1])
+    stored.update_contact(stored.get_contact(ivan.id), name='Іван Сидоренко', birthday=date(2000, 1, 2))
+    stored.remove_contact(stored.find_by_phone('+380501112233'))
+
+    reopened = sqlite_book(db_path)
+    assert [(contact.id, contact.name) for contact in reopened.contacts] == [(ivan.id, 'Іван Сидоренко')]
+    assert reopened.get_contact(ivan.id).birthday == date(2000, 1, 2)
+
+    history.undo()
+    history.undo()
+    assert sorted(contact.name for contact in sqlite_book(db_path).contacts) == ['Іван Петренко', 'Олена Коваль']
+    assert names(stored, 'сидоренко') == []
+
+
+def test_sqlite_notes_match_memory_notes(tmp_path, db_path):
+    memory = NotesManager(str(tmp_path / 'notes.csv'), autosave_delay=60)
+    stored = SqliteNotesManager(SqliteNotesStorage(db_path, csv_path=None), autosave_delay=60)
+    for manager in (memory, stored):
+        manager.create_note('Купити хліб і молоко', ['покупки', 'Дім'])
+        manager.create_note('Зателефонувати йому щодо ремонту', ['дім'])
+        manager.create_note('Прочитати книгу', ['читання'])
+        manager.update_note(2, 'Прочитати дві книги', ['читання', 'покупки'])
+
+    for query in ('хліб', 'книги', 'зателеф', 'йому', 'немає'):
+        assert [note.text for note in stored.search_text(query)] == \
+            [note.text for note in memory.search_text(query)], query
+    for tags, mode in ((['покупки'], 'and'), (['дім', 'покупки'], 'and'), (['дім', 'читання'], 'or')):
+        assert sorted(note.text for note in stored.notes_by_tags(tags, mode)) == \
+            sorted(note.text for note in memory.notes_by_tags(tags, mode)), tags
+    assert sorted(note.text for note in stored.notes_by_tags(['ку'], substring=True)) == \
+        ['Купити хліб і молоко', 'Прочитати дві книги']
+
+    stored.remove_note(0)
+    reopened = SqliteNotesManager(SqliteNotesStorage(db_path, csv_path=None), autosave_delay=60)
+    assert [note.text for note in reopened.notes] == ['Зателефонувати йому щодо ремонту', 'Прочитати дві книги']
+
+
+def test_sqlite_schema_has_no_unused_name_index(db_path):
+    sqlite_book(db_path)
+    with sqlite3.connect(db_path) as conn:
+        indexes = {name for (name,) in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    assert 'contacts_name_key' not in indexes
+    assert {'contacts_phone_key', 'contacts_email_key', 'contacts_birthday_md'} <= indexes
+
+
+def test_sqlite_tag_rows_page_like_memory_notes(tmp_path, db_path):
+    memory = NotesManager(str(tmp_path / 'notes.csv'), autosave_delay=60)
+    stored = SqliteNotesManager(SqliteNotesStorage(db_path, csv_path=None), autosave_delay=60)
+    for manager in (memory, stored):
+        manager.create_note('Купити хліб', ['покупки', 'Дім'])
+        manager.create_note('Полагодити кран', ['дім', 'ремонт'])
+        manager.create_note('Без тегів', [])
+        manager.create_note('Прочитати книгу', ['читання', 'Покупки'])
+
+    def rows(manager, limit):
+        pages = [manager._tag_rows(offset, limit) for offset in range(0, manager._tag_rows_total(), limit)]
+        return [(tag.casefold(), text) for page in pages for tag, text in page]
+
+    assert stored._tag_rows_total() == memory._tag_rows_total() == 6
+    for limit in (1, 4, 10):
+        assert rows(stored, limit) == rows(memory, limit), limit
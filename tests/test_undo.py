@@ -0,0 +1,38 @@
+from conftest import add
+from notes_manager import NotesManager
+from undo_history import UndoHistory
+
+
+def test_one_step_spans_contacts_and_notes(book, tmp_path):
+    notes = NotesManager(str(tmp_path / 'notes.csv'), autosave_delay=60, history=book.history)
+    contact = add(book, 'Іван Петренко', '+380502223344', 'ivan@example.com')
+
+    with book.history.step('пакет'):
+        book.update_contact(contact, name='Іван Перший')
+        book.update_contact(contact, name='Іван Другий')
+        notes.create_note('Подзвонити Івану', ['дзвінки'])
+
+    assert book.history.undo() == ('пакет', 2)
+    assert contact.name == 'Іван Петренко' and notes.notes == []
+    assert book.history.redo() == ('пакет', 2)
+    assert contact.name == 'Іван Другий'
+    assert [note.text for note in notes.notes] == ['Подзвонити Івану']
+
+    # Нова зміна після скасування забуває повторення
+    book.history.undo()
+    book.update_contact(contact, address='Львів')
+    assert not book.history.can_redo
+
+
+def test_oldest_steps_are_forgotten_over_memory_budget(book):
+    book.history = UndoHistory(max_bytes=1)
+    first = add(book, 'Іван Петренко', '+380502223344', 'ivan@example.com')
+    second = add(book, 'Олена Коваль', '+380501112233', 'olena@example.com')
+
+    # Останній крок лишається, навіть якщо сам перевищує межу
+    assert len(book.history) == 1
+    book.history.undo()
+    assert book.contacts == [first]
+    assert book.history.undo() is None
+    book.history.redo()
+    assert book.find_by_phone('+380501112233').id == second.id
@@ -0,0 +1,165 @@
+import sys
+from collections import deque
+from contextlib import contextmanager
+
+# Скільки пам'яті може займати історія змін за замовчуванням, байти
+DEFAULT_HISTORY_BYTES = 64 * 1024 * 1024
+# Приблизні накладні витрати одного запису кроку (ключ, пара станів, елемент словника)
+ENTRY_OVERHEAD = 200
+
+
+def state_size(state):
+    """
+    Оцінює пам'ять, яку займає знімок запису: кортеж полів і самі поля.
+    """
+    if state is None:
+        return 0
+    size = sys.getsizeof(state)
+    for field in state:
+        size += sum(map(sys.getsizeof, field)) if isinstance(field, tuple) else sys.getsizeof(field)
+    return size
+
+
+class UndoHistory:
+    """
+    Багаторівнева історія змін контактів і нотаток для скасування та повторення.
+
+    Знімок книги не копіюється: крок історії зберігає лише змінені записи у вигляді
+    незмінних кортежів (стан до і після команди), а всі інші записи лишаються спільними
+    з поточною книгою. Тож взяти знімок коштує O(1), а крок займає пам'ять, пропорційну
+    кількості змінених записів. Обсяг історії обмежений пам'яттю (max_bytes), а не кількістю
+    кроків: коли оцінка перевищує межу, найстаріші кроки забуваються.
+
+    Записи змінюють менеджери (target), які вміють відновити стан своїх записів за крок:
+    target.restore([(key, state), ...]), де state - кортеж полів або None, якщо запису немає.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_HISTORY_BYTES):
+        """
+        Args:
+            max_bytes (int, optional): Межа пам'яті історії, байти.
+        """
+        self.max_bytes = max_bytes
+        # Кроки: (назва, {(target, key): [стан до, стан після]}, оцінка розміру)
+        self._undo = deque()
+        self._redo = []
+        self._bytes = 0
+        self._step = None
+        self._depth = 0
+        self._applying = False
+
+    def __len__(self):
+        return len(self._undo)
+
+    @property
+    def can_undo(self):
+        return bool(self._undo)
+
+    @property
+    def can_redo(self):
+        return bool(self._redo)
+
+    @contextmanager
+    def step(self, label):
+        """
+        Об'єднує всі зміни всередині блоку в один крок історії (одна команда - один крок).
+        Вкладені блоки належать зовнішньому кроку.
+        Args:
+            label (str): Назва кроку, наприклад назва команди.
+        """
+        if self._depth == 0:
+            self._step = (label, {})
+        self._depth += 1
+        try:
+            yield
+        finally:
+            self._depth -= 1
+            if self._depth == 0:
+                label, changes = self._step
+                self._step = None
+                self._push(label, changes)
+
+    def record(self, target, key, before, after):
+        """
+        Записує зміну одного запису. Кілька змін запису в межах кроку зливаються:
+        зберігається стан до першої і після останньої.
+        Args:
+            target (object): Менеджер, якому належить запис.
+            key (object): Ідентифікатор запису.
+            before (tuple or None): Стан до зміни (None - запису не було).
+            after (tuple or None): Стан після зміни (None - запис видалено).
+        """
+        if self._applying:
+            return
+        if self._step is None:
+            self._push(None, {(target, key): [before, after]})
+            return
+        changes = self._step[1]
+        change = changes.get((target, key))
+        if change is None:
+            changes[(target, key)] = [before, after]
+        else:
+            change[1] = after
+
+    def _push(self, label, changes):
+        changes = {key: change for key, change in changes.items() if change[0] != change[1]}
+        if not changes:
+            return
+        size = sum(ENTRY_OVERHEAD + state_size(before) + state_size(after) for before, after in changes.values())
+        self._undo.append((label, changes, size))
+        self._bytes += size
+        # Нова зміна робить скасовані кроки недосяжними
+        self._bytes -= sum(step[2] for step in self._redo)
+        self._redo.clear()
+        # Останній крок лишається, навіть якщо сам перевищує межу
+        while self._bytes > self.max_bytes and len(self._undo) > 1:
+            self._bytes -= self._undo.popleft()[2]
+
+    def _apply(self, changes, index, order):
+        by_target = {}
+        for (target, key), change in order(list(changes.items())):
+            by_target.setdefault(target, []).append((key, change[index]))
+        self._applying = True
+        try:
+            for target, states in by_target.items():
+                target.restore(states)
+        finally:
+            self._applying = False
+
+    def undo(self):
+        """
+        Скасовує останній крок.
+        Returns:
+            tuple: (назва кроку, кількість записів) або None, якщо скасовувати нічого.
+        """
+        if not self._undo:
+            return None
+        step = self._undo.pop()
+        self._apply(step[1], 0, reversed)
+        self._redo.append(step)
+        return step[0], len(step[1])
+
+    def redo(self):
+        """
+        Повторює останній скасований крок.
+        Returns:
+            tuple: (назва кроку, кількість записів) або None, якщо повторювати нічого.
+        """
+        if not self._redo:
+            return None
+        step = self._redo.pop()
+        self._apply(step[1], 1, iter)
+        self._undo.append(step)
+        return step[0], len(step[1])
+
+    def clear(self):
+        """
+        Забуває всю історію (наприклад, після повторного завантаження книги).
+        """
+        self._undo.clear()
+        self._redo.clear()
+        self._bytes = 0
+
+    @property
+    def bytes(self):
+        return self._bytes